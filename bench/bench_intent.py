@@ -0,0 +1,60 @@
+# -------------------------------
+# bench/bench_intent.py
+# 메시지 의도 판별 속도 — 기존 handle_text 순차 검사 vs IntentRouter (정규식 1개)
+# 실행: python bench/bench_intent.py [--rounds 2000]
+# -------------------------------
+import os, re, sys, time, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.intent_module import router
+from modules.youtube_module import YT_CATEGORIES
+
+# data/chat_*.json과 텔레그램 대화에서 모은 실제 메시지
+CORPUS = [
+    "오늘 날씨 어때?", "홈트", "스트레칭", "상체", "도움말", "help", "내일날씨어때?",
+    "운동하자", "날씨", "하체", "요가", "코어", "유산소", "전신", "HIIT", "필라테스",
+    "복근", "스트렝스", "상관없음", "내 정보", "변경", "나연, 성남시 수정구, 달리기, 17시, 코치",
+    "오늘 너무 피곤해", "어제 운동 못했어 ㅠㅠ", "안녕", "고마워!", "오늘 비 와?",
+    "아침에 할 만한 스트레칭 추천해줘", "퇴근하고 하체 할래", "주말엔 등산 갈 거야",
+    "오늘 날씨 보고 운동하자", "내일 날씨 좋으면 달리기 할래", "알림 7시로 바꿔줘",
+    "톤 코치로 바꿔줘", "루틴 보여줘", "물 많이 마셨어", "배고파", "오늘 몇 번 운동했지?",
+]
+
+
+def legacy_route(text):
+    """변경 전 main.handle_text의 판별 순서 그대로"""
+    if text in ["도움말", "help", "Help"]:
+        return ("help", None)
+    if "홈트" in text:
+        return ("home_workout", None)
+    if any(k in text for k in YT_CATEGORIES):
+        return ("video", next((k for k in YT_CATEGORIES if k in text), "전신"))
+    if re.search(r"(오늘\s*날씨|날씨)(어때)?\??", text):
+        return ("weather", None)
+    return None
+
+
+def _rate(n, fn):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rounds", type=int, default=2000)
+    args = ap.parse_args()
+    msgs = CORPUS * args.rounds
+    n = len(msgs)
+
+    legacy = _rate(n, lambda: [legacy_route(t) for t in msgs])
+    routed = _rate(n, lambda: [router.route(t) for t in msgs])
+
+    print(f"messages={n} (corpus {len(CORPUS)} x {args.rounds})")
+    print(f"legacy (any/next + re.search) : {legacy / 1e3:8.1f} k msg/s  (날씨는 오늘/내일 구분 못함, 운동하자 없음)")
+    print(f"IntentRouter (trie regex)     : {routed / 1e3:8.1f} k msg/s  (x{routed / legacy:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+# -------------------------------
+# bench/bench_load.py
+# 종단 간 부하 테스트: 합성 텔레그램 Update를 목표 속도로 봇(main.start / main.handle_text)에 투입
+# 외부 호출(OWM / YouTube / Telegram)은 bench/stub_servers.py 로컬 서버로 (지연·오류 주입 가능)
+# 출력: 속도 단계별 처리량 + 의도(intent)별 p50/p95/p99 지연 — 지연이 무너지기 시작하는 지점 찾기용
+# 실행: python bench/bench_load.py [--rates 10 25 50 100 200] [--duration 10] [--users 500]
+#       [--mix start=1,help=1,weather=4,weather_tomorrow=1,workout=2,home_workout=2,video=3]
+#       [--latency owm=80 youtube=150 telegram=40] [--errors owm=0.01] [--poisson] [--json out.json]
+# 캐시를 끄고 재려면 WEATHER_CACHE_TTL=0 FORECAST_CACHE_TTL=0 python bench/bench_load.py ...
+# -------------------------------
+import os, sys, json, time, random, shutil, asyncio, argparse, tempfile, subprocess
+import urllib.request
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# 의도 → 보낼 문장 (intent_module.route가 같은 의도로 판별하는 문장들)
+TEXTS = {
+    "start": ["/start"],
+    "help": ["도움말", "뭐 할 수 있어?"],
+    "weather": ["날씨", "오늘 날씨 어때?"],
+    "weather_tomorrow": ["내일날씨어때?", "내일 날씨"],
+    "workout": ["운동하자"],
+    "home_workout": ["홈트"],
+    "video": ["상체", "하체", "전신", "코어", "유산소", "스트레칭", "요가", "HIIT", "필라테스", "복근", "상관없음"],
+}
+DEFAULT_MIX = "start=1,help=1,weather=4,weather_tomorrow=1,workout=2,home_workout=2,video=3"
+# regions_kr.json 색인에 있는 지역만 (geocoding API 호출 없이 좌표 확정)
+CITIES = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "수원", "성남시 수정구", "고양시 일산동구",
+          "제주", "전주", "창원", "포항", "춘천", "강릉", "청주", "천안", "김해", "용인시 수지구"]
+BASE_UID = 10_000_000
+
+
+def _mix(spec: str) -> dict:
+    out = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in TEXTS:
+            raise SystemExit(f"알 수 없는 의도: {name} (가능: {', '.join(TEXTS)})")
+        out[name] = float(weight or 1)
+    return out
+
+
+def _update_json(update_id: int, user_id: int, text: str) -> dict:
+    msg = {"message_id": update_id, "date": int(time.time()), "text": text,
+           "chat": {"id": user_id, "type": "private"},
+           "from": {"id": user_id, "is_bot": False, "first_name": f"u{user_id}"}}
+    if text.startswith("/"):
+        msg["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+    return {"update_id": update_id, "message": msg}
+
+
+def _percentiles(samples: list) -> dict:
+    s = sorted(samples)
+    if not s:
+        return {"n": 0}
+    pick = lambda q: round(s[min(len(s) - 1, int(q * len(s)))] * 1000, 1)
+    return {"n": len(s), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+# ===== 유저 DB =====
+def _populate(path: str, n_users: int, rng: random.Random) -> None:
+    from modules import user_module as um
+    db = {}
+    for i in range(n_users):
+        u = um._default_user(BASE_UID + i)
+        u.update(name=f"u{i}", location=rng.choice(CITIES), tone=rng.choice(sorted(um.TONE_CHOICES)))
+        db[str(BASE_UID + i)] = u
+    um._write_db(db, path)
+
+
+# ===== 부하 투입 =====
+class LoadRun:
+    """update_id → (의도, 투입 시각). 마지막 그룹 핸들러가 완료 시각을, 에러 핸들러가 실패를 기록."""
+
+    def __init__(self):
+        self.sent = {}
+        self.done = {}
+        self.failed = set()
+
+    async def on_done(self, update, context):
+        self.done[update.update_id] = time.perf_counter()
+
+    async def on_error(self, update, context):
+        if update is not None:
+            self.failed.add(update.update_id)
+
+    def finished(self) -> int:
+        # 핸들러가 실패해도 다음 그룹(완료 기록)은 실행됨 → 합집합으로 셈
+        return len(self.done.keys() | self.failed)
+
+    def report(self, rate: float, elapsed: float) -> dict:
+        by_intent = defaultdict(list)
+        errors = Counter()
+        for uid, (intent, t0) in self.sent.items():
+            if uid in self.failed:
+                errors[intent] += 1
+            elif uid in self.done:
+                by_intent[intent].append(self.done[uid] - t0)
+        finished = [t for uid, t in self.done.items() if uid in self.sent]
+        first = min(t0 for _, t0 in self.sent.values())
+        span = (max(finished) - first) if finished else elapsed
+        ok = sum(len(v) for v in by_intent.values())
+        return {
+            "target_rate": rate,
+            "sent": len(self.sent),
+            "completed": ok,
+            "errors": sum(errors.values()),
+            "timeouts": len(self.sent) - ok - sum(errors.values()),
+            "throughput": round(ok / span, 1) if span > 0 else 0.0,
+            "overall": _percentiles([x for v in by_intent.values() for x in v]),
+            "intents": {name: {**_percentiles(by_intent[name]), "errors": errors[name]}
+                        for name in TEXTS if name in by_intent or name in errors},
+        }
+
+
+async def _feed(app, run: LoadRun, rate: float, duration: float, users: int, mix: dict,
+                rng: random.Random, next_id: int, poisson: bool, drain: float) -> int:
+    from telegram import Update
+    names, weights = list(mix), list(mix.values())
+    start = time.perf_counter()
+    at = 0.0
+    while at < duration:
+        delay = start + at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        intent = rng.choices(names, weights)[0]
+        user_id = BASE_UID + rng.randrange(users)
+        update = Update.de_json(_update_json(next_id, user_id, rng.choice(TEXTS[intent])), app.bot)
+        run.sent[next_id] = (intent, time.perf_counter())
+        await app.update_queue.put(update)
+        next_id += 1
+        at += rng.expovariate(rate) if poisson else 1 / rate
+    deadline = time.perf_counter() + drain
+    while time.perf_counter() < deadline and run.finished() < len(run.sent):
+        await asyncio.sleep(0.02)
+    return next_id
+
+
+async def run_load(args, urls: dict) -> dict:
+    # config.env보다 먼저 — 외부 API 주소와 키를 로컬 stub으로
+    os.environ.update(BOT_TOKEN="123456789:LOADTEST", WEATHER_KEY="stub", YOUTUBE_API_KEY="stub",
+                      OWM_BASE_URL=urls["owm"], YOUTUBE_API_BASE=urls["youtube"] + "/youtube/v3",
+                      TELEGRAM_API_BASE=urls["telegram"], BOT_CONCURRENCY=str(args.concurrency))
+    from modules import user_module as um
+    from modules.http_module import close_http
+    import main as bot
+
+    rng = random.Random(args.seed)
+    tmp = tempfile.mkdtemp(prefix="bench_load_")
+    try:
+        path = os.path.join(tmp, "users.json")
+        _populate(path, args.users, rng)
+        um.open_store(path)
+
+        app = bot.build_application()
+        await app.initialize()
+        await app.start()
+        steps, next_id = [], 1
+        try:
+            if args.warmup > 0:                 # 캐시/영상 풀/커넥션 예열 (결과에 포함하지 않음)
+                next_id = await _feed(app, _attach(app, LoadRun()), args.rates[0], args.warmup, args.users,
+                                      _mix(args.mix), rng, next_id, args.poisson, args.drain)
+            for rate in args.rates:
+                run = _attach(app, LoadRun())
+                t0 = time.perf_counter()
+                next_id = await _feed(app, run, rate, args.duration, args.users, _mix(args.mix),
+                                      rng, next_id, args.poisson, args.drain)
+                step = run.report(rate, time.perf_counter() - t0)
+                step["in_flight_peak"] = app.update_processor.peak
+                steps.append(step)
+                _print_step(step, args.slo)
+        finally:
+            await app.stop()
+            await app.shutdown()
+            await close_http()
+            um.close_store()
+        return {"steps": steps}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _attach(app, run: LoadRun) -> LoadRun:
+    """완료 기록 핸들러(가장 마지막 그룹) + 에러 핸들러를 이번 단계의 LoadRun으로 교체"""
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    group = 10 ** 6
+    for handler in list(app.handlers.get(group, [])):
+        app.remove_handler(handler, group)
+    app.add_handler(TypeHandler(Update, run.on_done), group=group)
+    for callback in list(app.error_handlers):
+        app.remove_error_handler(callback)
+    app.add_error_handler(run.on_error)
+    app.update_processor.peak = 0
+    return run
+
+
+def _print_step(step: dict, slo: float) -> None:
+    o = step["overall"]
+    saturated = (step["throughput"] < 0.9 * step["target_rate"] or step["timeouts"]
+                 or o.get("p99_ms", 0) > slo)
+    print(f"\n목표 {step['target_rate']}/s → 처리 {step['throughput']}/s  "
+          f"(완료 {step['completed']}/{step['sent']}, 오류 {step['errors']}, 시간초과 {step['timeouts']}, "
+          f"동시 처리 최대 {step['in_flight_peak']})" + ("  ⚠️ 포화" if saturated else ""))
+    print(f"  {'intent':<18} {'n':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in list(step["intents"].items()) + [("(전체)", {**o, "errors": step["errors"]})]:
+        if s.get("n"):
+            print(f"  {name:<18} {s['n']:>6} {s['errors']:>5} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+        else:
+            print(f"  {name:<18} {0:>6} {s['errors']:>5} {'-':>9} {'-':>9} {'-':>9}")
+
+
+# ===== stub 서버 (별도 프로세스 — 봇과 CPU를 나눠 쓰지 않도록) =====
+def _start_stubs(args):
+    cmd = [sys.executable, os.path.join(ROOT, "bench", "stub_servers.py"), "--seed", str(args.seed)]
+    if args.latency:
+        cmd += ["--latency", *args.latency]
+    if args.errors:
+        cmd += ["--errors", *args.errors]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line:
+        proc.kill()
+        raise RuntimeError("stub 서버 시작 실패")
+    return proc, json.loads(line)
+
+
+def _stub_stats(urls: dict) -> dict:
+    out = {}
+    for name, url in urls.items():
+        try:
+            with urllib.request.urlopen(f"{url}/_stats", timeout=2) as res:
+                out[name] = json.load(res)
+        except OSError as e:
+            out[name] = {"error": str(e)}
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", type=float, nargs="+", default=[10, 25, 50, 100, 200], help="단계별 초당 메시지 수")
+    ap.add_argument("--duration", type=float, default=10, help="단계별 투입 시간(초)")
+    ap.add_argument("--warmup", type=float, default=2, help="측정 전 예열 시간(초, 첫 단계 속도)")
+    ap.add_argument("--drain", type=float, default=30, help="투입 후 남은 처리를 기다리는 최대 시간(초)")
+    ap.add_argument("--users", type=int, default=500, help="가상 유저(채팅) 수")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="의도별 비중")
+    ap.add_argument("--concurrency", type=int, default=int(os.getenv("BOT_CONCURRENCY", "32")))
+    ap.add_argument("--latency", nargs="*", default=["owm=80", "youtube=150", "telegram=40"],
+                    help="stub 응답 지연 서비스=ms")
+    ap.add_argument("--errors", nargs="*", default=[], help="stub 오류 비율 서비스=0~1")
+    ap.add_argument("--poisson", action="store_true", help="고정 간격 대신 포아송 도착")
+    ap.add_argument("--slo", type=float, default=1000, help="p99가 이 값(ms)을 넘으면 포화로 표시")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--json", help="결과를 JSON으로 저장")
+    args = ap.parse_args()
+
+    proc, urls = _start_stubs(args)
+    try:
+        print(f"stub: {urls}  users={args.users} concurrency={args.concurrency} mix={args.mix}")
+        result = asyncio.run(run_load(args, urls))
+        result["upstream"] = _stub_stats(urls)
+    finally:
+        proc.terminate()
+        proc.wait(5)
+    print("\nupstream 호출:", json.dumps(result["upstream"], ensure_ascii=False))
+    result["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
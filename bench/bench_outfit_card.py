@@ -0,0 +1,89 @@
+# -------------------------------
+# bench/bench_outfit_card.py
+# 복장 카드 렌더링 처리량 (초당 카드 수) — 기존 방식 vs OutfitCardRenderer
+# 실행: python bench/bench_outfit_card.py [--cards 200] [--size 1024]
+# -------------------------------
+import os, sys, time, shutil, asyncio, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont
+from modules.weather_module import OutfitCardRenderer
+
+LINES = [
+    "나연's Weather & Workout 🩵",
+    "☀️ 21.3°C / 맑음 / 체감 20.0°C",
+    "🍂 긴팔 트레이닝복",
+    "🌤 실외운동 (산책, 자전거, 달리기, 축구)",
+    "🌧️ 내일: 17.2°C / 약한 비",
+]
+
+
+def _make_templates(outfit_dir: str, size: int) -> None:
+    """실제 템플릿 크기의 그라데이션 PNG 6장 생성"""
+    for i, name in enumerate(OutfitCardRenderer.TEMPLATES):
+        img = Image.linear_gradient("L").resize((size, size)).convert("RGB")
+        img = Image.merge("RGB", (img.getchannel(0), img.getchannel(0).point(lambda v: (v + 40 * i) % 256), img.getchannel(0)))
+        img.save(os.path.join(outfit_dir, f"{name}.png"))
+
+
+# ===== 기존(변경 전) 방식: 매번 템플릿 디코딩 + 폰트 로드 시도 + temp/ 파일 저장 =====
+def legacy_render(img_path: str, temp_dir: str, user_name: str = "나연") -> str:
+    img = Image.open(img_path).convert("RGBA")
+    draw = ImageDraw.Draw(img)
+    try:
+        font_title = ImageFont.truetype("arialbd.ttf", 40)
+        font_info = ImageFont.truetype("arial.ttf", 26)
+    except Exception:
+        font_title = ImageFont.load_default()
+        font_info = ImageFont.load_default()
+    draw.rectangle([(30, 30), (img.width - 30, 240)], fill=(255, 255, 255, 230))
+    draw.text((50, 50), LINES[0], fill=(40, 40, 60), font=font_title)
+    for y, line in zip((100, 140, 180, 215), LINES[1:]):
+        draw.text((50, y), line, fill=(40, 40, 60), font=font_info)
+    output_path = os.path.join(temp_dir, f"{user_name}_outfit.png")
+    img.save(output_path)
+    return output_path
+
+
+def _rate(n: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--cards", type=int, default=200)
+    ap.add_argument("--size", type=int, default=1024, help="템플릿 한 변 픽셀")
+    ap.add_argument("--workers", type=int, default=2)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_cards_")
+    try:
+        outfit_dir = os.path.join(tmp, "outfits")
+        os.makedirs(outfit_dir)
+        _make_templates(outfit_dir, args.size)
+        paths = [os.path.join(outfit_dir, f"{n}.png") for n in OutfitCardRenderer.TEMPLATES]
+        pick = lambda i: paths[i % len(paths)]
+
+        legacy = _rate(args.cards, lambda: [legacy_render(pick(i), tmp) for i in range(args.cards)])
+
+        renderer = OutfitCardRenderer(outfit_dir, workers=args.workers)
+        renderer.template(paths[0])                               # 템플릿/폰트 선로드
+        sync = _rate(args.cards, lambda: [renderer.render(pick(i), LINES) for i in range(args.cards)])
+
+        async def burst():
+            await asyncio.gather(*(renderer.arender(pick(i), LINES) for i in range(args.cards)))
+        pooled = _rate(args.cards, lambda: asyncio.run(burst()))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"cards={args.cards} template={args.size}x{args.size}")
+    print(f"legacy (decode + font + temp file) : {legacy:8.1f} cards/s")
+    print(f"renderer.render (BytesIO)          : {sync:8.1f} cards/s  (x{sync / legacy:.1f})")
+    print(f"renderer.arender ({args.workers} threads)       : {pooled:8.1f} cards/s  (x{pooled / legacy:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# -------------------------------
+# bench/bench_startup.py
+# 콜드 스타트 측정: import 시간(-X importtime) + 프로세스 시작 → 첫 /health 응답까지
+# 실행: python bench/bench_startup.py [--runs 5] [--top 10] [--json out.json]
+# 회귀 지표: health_ms (중앙값). 봇은 빈 BOT_TOKEN으로 떠서 백그라운드 실패만 로그로 남김
+# -------------------------------
+import os, sys, json, time, socket, argparse, statistics, subprocess, tempfile
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> dict:
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # 빈 값으로 두면 load_dotenv(override=False)가 .env 값으로 덮어쓰지 않음
+    env["BOT_TOKEN"] = ""               # 실제 텔레그램에 붙지 않도록
+    env["ADMIN_ID"] = ""                # 관리자 알림 발송 안 함
+    return env
+
+
+# ===== import 시간 =====
+def import_times(module: str) -> list:
+    """[(누적 µs, 자체 µs, 모듈명, 깊이)] — python -X importtime 출력 파싱"""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, env=_env(), capture_output=True, text=True)
+    rows = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cum_us), int(self_us), name.strip(), depth))
+    return rows
+
+
+def import_report(module: str, top: int) -> dict:
+    rows = import_times(module)
+    total = next((cum for cum, _, name, _ in rows if name == module), 0)
+    direct = sorted((r for r in rows if r[3] == 1), reverse=True)[:top]
+    return {"module": module, "total_ms": round(total / 1000, 1),
+            "top": [{"name": name, "ms": round(cum / 1000, 1)} for cum, _, name, _ in direct]}
+
+
+# ===== 첫 /health =====
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_health(timeout: float = 30.0) -> float:
+    """uvicorn 프로세스 시작부터 /health 200 응답까지 (ms)"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    workdir = tempfile.TemporaryDirectory()     # data/는 빈 임시 폴더에 (실제 users.json 안 건드림)
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "server_app:app",
+                             "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+                            cwd=workdir.name, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn 종료됨 (exit {proc.returncode})")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as res:
+                    if res.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"{timeout}s 안에 /health 응답 없음")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        workdir.cleanup()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--json", help="결과를 JSON으로 저장 (회귀 비교용)")
+    args = ap.parse_args()
+
+    result = {"imports": [import_report(m, args.top) for m in ("server_app", "main")]}
+    for rep in result["imports"]:
+        print(f"import {rep['module']}: {rep['total_ms']}ms")
+        for item in rep["top"]:
+            print(f"  {item['ms']:>8.1f}ms  {item['name']}")
+
+    samples = [time_to_health() for _ in range(args.runs)]
+    result["health_ms"] = round(statistics.median(samples), 1)
+    result["health_samples_ms"] = [round(s, 1) for s in samples]
+    print(f"first /health: median {result['health_ms']}ms  (runs: {result['health_samples_ms']})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# -------------------------------
+# bench/bench_user_reads.py
+# 읽기 전용 경로(날씨 조회, 톤 인사)의 메시지당 파일 쓰기 횟수 측정
+# 실행: python bench/bench_user_reads.py [--users 2000] [--messages 500]
+# -------------------------------
+import os, sys, json, time, shutil, argparse, tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import user_module as um
+
+
+def _make_db(path: str, n_users: int) -> None:
+    db = {str(uid): um._default_user(uid) for uid in range(n_users)}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(db, f, ensure_ascii=False, indent=2)
+
+
+# ===== 기존(변경 전) 방식: 읽을 때마다 파일 전체 read + write =====
+def _legacy_get_user(path: str, user_id: int) -> dict:
+    db = um._read_db(path)
+    uid = str(user_id)
+    db[uid] = um._auto_update_structure(db.get(uid) or um._default_user(user_id), user_id)
+    um._write_db(db, path)
+    return db[uid]
+
+def legacy_weather_query(path, user_id):
+    _legacy_get_user(path, user_id)                       # handle_text 시작
+    return _legacy_get_user(path, user_id).get("location")  # get_user_data(.., "location")
+
+def legacy_tone_greeting(path, user_id):
+    return _legacy_get_user(path, user_id).get("tone")      # get_tone_message
+
+# ===== 현재 방식 =====
+def weather_query(path, user_id):
+    um.get_user(user_id)
+    return um.get_user_data(user_id, "location")
+
+def tone_greeting(path, user_id):
+    return um.get_user_data(user_id, "tone")
+
+
+def _run(label, fn, path, n_users, n_messages):
+    writes = 0
+    original, original_encoded = um._write_db, um._write_encoded
+
+    def counting_write(db, p=um.USERS_DB):
+        nonlocal writes
+        writes += 1
+        original(db, p)
+
+    def counting_encoded(entries, p=um.USERS_DB):
+        nonlocal writes
+        writes += 1
+        original_encoded(entries, p)
+
+    um._write_db, um._write_encoded = counting_write, counting_encoded
+    try:
+        start = time.perf_counter()
+        for i in range(n_messages):
+            fn(path, i % n_users)
+        um.flush_users()
+        elapsed = time.perf_counter() - start
+    finally:
+        um._write_db, um._write_encoded = original, original_encoded
+    return {
+        "path": label,
+        "writes_per_message": round(writes / n_messages, 3),
+        "us_per_message": round(elapsed / n_messages * 1e6, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--messages", type=int, default=500)
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_users_")
+    path = os.path.join(tmp, "users.json")
+    try:
+        _make_db(path, args.users)
+        # DB 오픈 시 마이그레이션 1회 → 첫 flush로 정리한 뒤 측정
+        um.open_store(path, flush_interval=0)
+        results = [
+            _run("legacy weather query", legacy_weather_query, path, args.users, args.messages),
+            _run("legacy tone greeting", legacy_tone_greeting, path, args.users, args.messages),
+            _run("weather query", weather_query, path, args.users, args.messages),
+            _run("tone greeting", tone_greeting, path, args.users, args.messages),
+        ]
+        um.close_store()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"users={args.users} messages={args.messages}")
+    for r in results:
+        print(f"{r['path']:<22} writes/msg={r['writes_per_message']:<6} {r['us_per_message']:>10} µs/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -------------------------------
+# bench/bench_user_shards.py
+# 여러 프로세스가 동시에 유저 정보를 저장할 때 초당 저장 수 (json / sqlite / sharded)
+# 각 프로세스는 서로 다른 유저를 update_user + record_activity (매 호출 디스크 반영)
+# 실행: python bench/bench_user_shards.py [--users 500] [--writes 100] [--procs 1 4 8]
+# -------------------------------
+import os, sys, json, time, shutil, argparse, tempfile, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import user_module as um
+
+WORKER = """
+import sys, time, json
+from modules import user_module as um
+path, backend, proc, writes, users, start_at = sys.argv[1:7]
+proc, writes, users, start_at = int(proc), int(writes), int(users), float(start_at)
+um.open_store(path, backend=backend, flush_interval=0)   # json: 매 변경마다 파일 저장 (write-through)
+time.sleep(max(0.0, start_at - time.time()))              # 모든 프로세스가 같은 시각에 시작
+t0 = time.time()
+for i in range(writes):
+    uid = (proc * 7919 + i) % users
+    if i % 2:
+        um.update_user(uid, "temp_limit", i % 10)
+    else:
+        um.record_activity(uid, "요가")
+t1 = time.time()
+um.close_store()
+print(json.dumps({"start": t0, "end": t1, "n": writes}))
+"""
+
+PATHS = {"json": "users.json", "sqlite": "users.db", "sharded": "users"}
+
+
+def _populate(path: str, backend: str, n_users: int) -> None:
+    db = {str(uid): um._default_user(uid) for uid in range(n_users)}
+    if backend == "json":
+        um._write_db(db, path)
+    elif backend == "sqlite":
+        from modules.user_sqlite import SqliteUserStore
+        s = SqliteUserStore(path)
+        for uid, u in db.items():
+            s.put(uid, u)
+        s.close()
+    else:
+        from modules.user_shards import ShardedUserStore
+        ShardedUserStore(path).put_many(db)
+
+
+def run(backend: str, procs: int, n_users: int, writes: int) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bench_shards_")
+    try:
+        path = os.path.join(tmp, PATHS[backend])
+        _populate(path, backend, n_users)
+        start_at = time.time() + 1.5                          # 프로세스 기동 시간은 제외
+        ps = [subprocess.Popen([sys.executable, "-c", WORKER, path, backend, str(p), str(writes),
+                                str(n_users), str(start_at)],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True)
+              for p in range(procs)]
+        results = [json.loads(p.communicate()[0].strip().splitlines()[-1]) for p in ps]
+        elapsed = max(r["end"] for r in results) - min(r["start"] for r in results)
+        total = sum(r["n"] for r in results)
+        return {"backend": backend, "procs": procs, "writes": total,
+                "elapsed_s": round(elapsed, 3), "writes_per_s": round(total / elapsed, 1)}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=500)
+    ap.add_argument("--writes", type=int, default=100, help="프로세스당 저장 횟수")
+    ap.add_argument("--procs", type=int, nargs="+", default=[1, 4, 8])
+    ap.add_argument("--backends", nargs="+", default=["json", "sqlite", "sharded"])
+    args = ap.parse_args()
+
+    print(f"users={args.users}  writes/proc={args.writes}")
+    print(f"{'backend':<8} {'procs':>5} {'elapsed':>9} {'writes/s':>10}")
+    for backend in args.backends:
+        for procs in args.procs:
+            r = run(backend, procs, args.users, args.writes)
+            print(f"{backend:<8} {procs:>5} {r['elapsed_s']:>8.2f}s {r['writes_per_s']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# -------------------------------
+# bench/bench_user_store.py
+# 유저 저장소 마이크로 벤치마크: 합성 유저 1k / 10k / 100k명 → 함수별 p50/p99 지연 + 최대 RSS
+# 측정: 로드, get_user, update_user, record_activity, update_notification, build_settings_summary, flush
+# 실행: python bench/bench_user_store.py [--users 1000 10000 100000] [--ops 2000] [--backend json]
+#       [--out bench_user_store.json] [--compare 이전결과.json]
+# 크기마다 새 프로세스에서 측정 (RSS 최대치가 이전 크기에 섞이지 않도록). 결과 JSON에 커밋 해시 포함
+# -------------------------------
+import os, sys, json, time, random, shutil, argparse, platform, tempfile, subprocess
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules import user_module as um
+
+OPS = ["get_user", "update_user", "record_activity", "update_notification", "build_settings_summary"]
+PATHS = {"json": "users.json", "sqlite": "users.db", "sharded": "users"}
+
+ACTIVITIES = ["요가", "필라테스", "러닝", "헬스", "홈트", "수영", "자전거", "스트레칭", "등산", "줄넘기"]
+CITIES = ["서울", "부산", "대구", "인천", "광주", "대전", "수원", "제주", "성남", "고양"]
+NAMES = ["나연", "민지", "서준", "하은", "지훈", "수아", "도윤", "예린", None]
+
+
+# ===== 합성 유저 =====
+def _synthetic_user(uid: int, rng: random.Random, today: date) -> dict:
+    """실제 유저 분포 흉내: 절반 가까이는 기록 없음, 나머지는 평균 30건 (최대 300건)"""
+    u = um._default_user(uid)
+    u.update(name=rng.choice(NAMES), age=rng.choice([None] + list(range(18, 61))),
+             location=rng.choice(CITIES), temp_limit=rng.randint(0, 15),
+             tone=rng.choice(sorted(um.TONE_CHOICES)),
+             favorites=rng.sample(ACTIVITIES, rng.randint(0, 4)))
+    for wd in um.WEEKDAYS:
+        u["routine"][wd] = [{"type": a, **({"minutes": rng.choice([20, 30, 45, 60])} if rng.random() < 0.7 else {})}
+                            for a in rng.sample(ACTIVITIES, rng.choice([0, 0, 1, 1, 2, 3]))]
+    n = u["notifications"]
+    n["weather_only"]["time"] = f"{rng.randint(5, 9):02d}:{rng.choice(['00', '30'])}"
+    if rng.random() < 0.4:
+        n["combo"].update(enabled=True, time=f"{rng.randint(6, 21):02d}:00",
+                          days=rng.sample(um.WEEKDAYS, rng.randint(1, 7)))
+    if rng.random() < 0.2:
+        n["workout_only"].update(enabled=True, time=f"{rng.randint(17, 22):02d}:30")
+
+    # 구버전(v1) 레코드처럼 history를 레코드 안에 → 저장소별 마이그레이션이 기록 로그로 옮김
+    size = 0 if rng.random() < 0.4 else min(300, int(rng.expovariate(1 / 30)) + 1)
+    history = []
+    for _ in range(size):
+        rec = {"date": (today - timedelta(days=rng.randint(0, 180))).isoformat(), "type": rng.choice(ACTIVITIES)}
+        if rng.random() < 0.5:
+            rec["duration"] = rng.choice([15, 20, 30, 45, 60, 90])
+        history.append(rec)
+    history.sort(key=lambda r: r["date"])
+    u["history"] = history
+    for rec in history:
+        u["usage_stats"][rec["type"]] = u["usage_stats"].get(rec["type"], 0) + 1
+    u["last_activity"] = dict(history[-1]) if history else None
+    u["schema_version"] = 1
+    return u
+
+
+def _populate(workdir: str, backend: str, n_users: int, seed: int) -> str:
+    """workdir에 backend 형식의 저장소 생성 (기록은 저장소별 기록 로그로 이동 완료 상태)"""
+    rng = random.Random(seed)
+    today = date.today()
+    db = {str(uid): _synthetic_user(uid, rng, today) for uid in range(100000, 100000 + n_users)}
+    path = os.path.join(workdir, PATHS[backend])
+    if backend == "json":
+        um._write_db(db, path)
+        um.UserStore(path, flush_interval=0).close()          # 열 때 마이그레이션 → 닫을 때 저장
+    elif backend == "sqlite":
+        from modules.user_sqlite import SqliteUserStore
+        store = SqliteUserStore(path)
+        with store.transaction():                               # 한 트랜잭션으로 (기록 수백만 줄)
+            for uid, u in db.items():
+                um._upgrade_record(u, uid, lambda rec, uid=uid: store.append_history(uid, rec))
+                store.put(uid, u)
+        store.close()
+    else:
+        from modules.user_shards import import_from_json
+        src = os.path.join(workdir, "users.json")
+        um._write_db(db, src)
+        import_from_json(src, path)
+        os.remove(src)
+    return path
+
+
+def _disk_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2 ** 20
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(path) for f in fs) / 2 ** 20
+
+
+# ===== 측정 (자식 프로세스) =====
+def _peak_rss_mb():
+    # Linux의 ru_maxrss는 exec 전(부모 프로세스) 최대치까지 이어받음 → 이 프로세스 값인 VmHWM 우선
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 2 ** 10, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:             # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)   # macOS는 바이트
+
+
+def _percentiles(samples_ns: list) -> dict:
+    s = sorted(samples_ns)
+    pick = lambda q: s[min(len(s) - 1, int(q * len(s)))] / 1000
+    return {"n": len(s), "p50_us": round(pick(0.50), 1), "p99_us": round(pick(0.99), 1),
+            "mean_us": round(sum(s) / len(s) / 1000, 1)}
+
+
+def worker(path: str, backend: str, n_users: int, n_ops: int, seed: int) -> dict:
+    rng = random.Random(seed + 1)
+    uids = [100000 + rng.randrange(n_users) for _ in range(n_ops)]
+    args = {
+        "get_user": lambda uid, i: (uid,),
+        "update_user": lambda uid, i: (uid, "temp_limit", i % 15),
+        "record_activity": lambda uid, i: (uid, ACTIVITIES[i % len(ACTIVITIES)], 30),
+        "update_notification": lambda uid, i: (uid, "combo", f"{i % 24:02d}:00"),
+        "build_settings_summary": lambda uid, i: (uid,),
+    }
+
+    t0 = time.perf_counter()
+    um.open_store(path, backend=backend)        # 운영과 같은 flush 설정 (json: 백그라운드 write-behind)
+    um.get_user(uids[0])
+    load_s = time.perf_counter() - t0
+    rss_load = _peak_rss_mb()
+
+    ops = {}
+    clock = time.perf_counter_ns
+    for name in OPS:
+        fn, make = getattr(um, name), args[name]
+        samples = []
+        for i, uid in enumerate(uids):
+            a = make(uid, i)
+            t = clock()
+            fn(*a)
+            samples.append(clock() - t)
+        ops[name] = _percentiles(samples)
+
+    t0 = time.perf_counter()
+    um.flush_users()
+    flush_s = time.perf_counter() - t0
+    um.close_store()
+    return {"load_s": round(load_s, 3), "flush_s": round(flush_s, 3), "ops": ops,
+            "peak_rss_after_load_mb": rss_load, "peak_rss_mb": _peak_rss_mb()}
+
+
+# ===== 실행 / 비교 =====
+def run(backend: str, n_users: int, n_ops: int, seed: int) -> dict:
+    tmp = tempfile.mkdtemp(prefix="bench_user_store_")
+    try:
+        t0 = time.perf_counter()
+        path = _populate(tmp, backend, n_users, seed)
+        gen_s = time.perf_counter() - t0
+        res = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", path, backend,
+                              str(n_users), str(n_ops), str(seed)],
+                             cwd=tmp, capture_output=True, text=True)
+        if res.returncode != 0:
+            raise RuntimeError(f"측정 프로세스 실패 ({backend}, {n_users}명):\n{res.stderr}")
+        result = json.loads(res.stdout.strip().splitlines()[-1])
+        return {"backend": backend, "users": n_users, "disk_mb": round(_disk_mb(path), 1),
+                "generate_s": round(gen_s, 1), **result}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _git_rev() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ("-dirty" if dirty else "") if rev else "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _print_run(r: dict) -> None:
+    rss = lambda v: f"{v:.0f}MB" if v is not None else "-"
+    print(f"\n[{r['backend']}] users={r['users']}  disk={r['disk_mb']}MB  load={r['load_s']}s  "
+          f"flush={r['flush_s']}s  peak RSS={rss(r['peak_rss_mb'])} (로드 후 {rss(r['peak_rss_after_load_mb'])})")
+    print(f"  {'op':<24} {'p50 µs':>10} {'p99 µs':>10}")
+    for name, s in r["ops"].items():
+        print(f"  {name:<24} {s['p50_us']:>10.1f} {s['p99_us']:>10.1f}")
+
+
+def compare(old: dict, new: dict) -> None:
+    """같은 (backend, users) 조합끼리 p50/p99 배율 (new / old, 1보다 크면 느려짐)"""
+    prev = {(r["backend"], r["users"]): r for r in old["runs"]}
+    print(f"\n비교: {old.get('commit')} → {new.get('commit')}  (new/old)")
+    for r in new["runs"]:
+        o = prev.get((r["backend"], r["users"]))
+        if o is None:
+            continue
+        print(f"[{r['backend']}] users={r['users']}  load x{r['load_s'] / max(o['load_s'], 1e-9):.2f}")
+        for name, s in r["ops"].items():
+            if name in o["ops"]:
+                po = o["ops"][name]
+                print(f"  {name:<24} p50 x{s['p50_us'] / max(po['p50_us'], 1e-9):.2f}"
+                      f"  p99 x{s['p99_us'] / max(po['p99_us'], 1e-9):.2f}")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        path, backend, n_users, n_ops, seed = sys.argv[2:7]
+        print(json.dumps(worker(path, backend, int(n_users), int(n_ops), int(seed))))
+        return
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--ops", type=int, default=2000, help="함수별 호출 횟수")
+    ap.add_argument("--backend", nargs="+", default=["json"], choices=sorted(PATHS))
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default="bench_user_store.json", help="결과 JSON (커밋 간 비교용)")
+    ap.add_argument("--compare", help="이전 결과 JSON과 비교")
+    args = ap.parse_args()
+
+    result = {"commit": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "python": platform.python_version(), "platform": platform.platform(),
+              "ops_per_function": args.ops, "seed": args.seed, "runs": []}
+    for backend in args.backend:
+        for n in args.users:
+            r = run(backend, n, args.ops, args.seed)
+            result["runs"].append(r)
+            _print_run(r)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# -------------------------------
+# bench/stub_servers.py
+# 부하 테스트용 로컬 가짜 서버: OWM(/weather, /forecast, /geo) · YouTube(search) · Telegram Bot API
+# 서비스마다 포트 1개, 응답 지연(±50% 흔들림)과 오류 비율을 주입할 수 있음
+# 실행: python bench/stub_servers.py [--latency owm=80 youtube=150 telegram=40] [--errors owm=0.02]
+#       → 첫 줄에 {"owm": "http://127.0.0.1:..", ...} 출력 후 계속 실행 (Ctrl+C로 종료)
+#       봇 쪽은 OWM_BASE_URL / YOUTUBE_API_BASE(+/youtube/v3) / TELEGRAM_API_BASE 로 연결
+# -------------------------------
+import sys, json, time, random, asyncio, argparse
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from aiohttp import web
+
+SERVICES = ("owm", "youtube", "telegram")
+DESCS = [("Clear", "맑음"), ("Clouds", "구름조금"), ("Clouds", "흐림"), ("Rain", "약한 비"), ("Snow", "눈")]
+
+
+class Stub:
+    """서비스 1개 분량의 지연/오류 주입 + 호출 횟수"""
+
+    def __init__(self, name: str, latency_ms: float = 0, error_rate: float = 0, seed: int = 0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = Counter()
+        self.errors = 0
+
+    async def delay(self, endpoint: str) -> bool:
+        """응답 전에 지연. 오류를 돌려줘야 하면 True"""
+        self.calls[endpoint] += 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms * self.rng.uniform(0.5, 1.5) / 1000)
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    def stats(self) -> dict:
+        return {"calls": dict(self.calls), "errors": self.errors}
+
+
+def _stats_route(stub: Stub):
+    async def handler(request):
+        return web.json_response(stub.stats())
+    return handler
+
+
+# ===== OpenWeatherMap =====
+def _owm_item(rng: random.Random) -> dict:
+    main, desc = rng.choice(DESCS)
+    temp = round(rng.uniform(-5, 30), 2)
+    return {"weather": [{"main": main, "description": desc}],
+            "main": {"temp": temp, "feels_like": round(temp - rng.uniform(0, 3), 2), "humidity": rng.randint(30, 90)}}
+
+
+def owm_app(stub: Stub) -> web.Application:
+    async def weather(request):
+        if await stub.delay("weather"):
+            return web.json_response({"cod": 500, "message": "stub error"}, status=500)
+        return web.json_response({**_owm_item(stub.rng), "name": request.query.get("q", "stub"),
+                                  "dt": int(time.time()), "timezone": 32400})
+
+    async def forecast(request):
+        if await stub.delay("forecast"):
+            return web.json_response({"cod": 500, "message": "stub error"}, status=500)
+        # 실제 피드처럼 다음 3시간 경계(UTC)부터 3시간 간격 40개
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        start = now + timedelta(hours=3 - now.hour % 3)
+        items = []
+        for i in range(40):
+            t = start + timedelta(hours=3 * i)
+            items.append({"dt": int(t.timestamp()), "dt_txt": t.strftime("%Y-%m-%d %H:%M:%S"), **_owm_item(stub.rng)})
+        return web.json_response({"cod": "200", "cnt": len(items), "list": items,
+                                  "city": {"name": request.query.get("q", "stub"), "timezone": 32400}})
+
+    async def geo(request):
+        if await stub.delay("geo"):
+            return web.json_response({"cod": 500, "message": "stub error"}, status=500)
+        q = request.query.get("q", "")
+        return web.json_response([{"name": q, "local_names": {"ko": q},
+                                   "lat": round(stub.rng.uniform(33, 38), 4), "lon": round(stub.rng.uniform(126, 129), 4)}])
+
+    app = web.Application()
+    app.router.add_get("/data/2.5/weather", weather)
+    app.router.add_get("/data/2.5/forecast", forecast)
+    app.router.add_get("/geo/1.0/direct", geo)
+    app.router.add_get("/_stats", _stats_route(stub))
+    return app
+
+
+# ===== YouTube Data API =====
+def youtube_app(stub: Stub) -> web.Application:
+    async def search(request):
+        if await stub.delay("search"):
+            return web.json_response({"error": {"code": 500, "message": "stub error"}}, status=500)
+        q = request.query.get("q", "")
+        n = int(request.query.get("maxResults", 15))
+        items = []
+        for _ in range(n):
+            vid = "".join(stub.rng.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(11))
+            items.append({"id": {"kind": "youtube#video", "videoId": vid},
+                          "snippet": {"title": f"{q} {vid}",
+                                      "thumbnails": {"medium": {"url": f"https://img.youtube.com/vi/{vid}/mqdefault.jpg"}}}})
+        return web.json_response({"kind": "youtube#searchListResponse", "items": items})
+
+    app = web.Application()
+    app.router.add_get("/youtube/v3/search", search)
+    app.router.add_get("/_stats", _stats_route(stub))
+    return app
+
+
+# ===== Telegram Bot API =====
+BOT_USER = {"id": 123456789, "is_bot": True, "first_name": "stub", "username": "stub_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": False}
+
+
+def telegram_app(stub: Stub) -> web.Application:
+    message_id = 0
+
+    async def method(request):
+        nonlocal message_id
+        name = request.match_info["method"]
+        params = dict(await request.post()) if request.can_read_body else {}
+        if not params and request.content_type == "application/json":
+            params = await request.json()
+        if await stub.delay(name):
+            return web.json_response({"ok": False, "error_code": 500, "description": "stub error"}, status=500)
+        if name == "getMe":
+            return web.json_response({"ok": True, "result": BOT_USER})
+        if name in ("sendMessage", "sendPhoto"):
+            message_id += 1
+            chat_id = int(params.get("chat_id", 0))
+            msg = {"message_id": message_id, "date": int(time.time()), "from": BOT_USER,
+                   "chat": {"id": chat_id, "type": "private"}}
+            if name == "sendMessage":
+                msg["text"] = params.get("text", "")
+            else:
+                msg["photo"] = [{"file_id": "stub", "file_unique_id": "stub", "width": 320, "height": 180}]
+                msg["caption"] = params.get("caption", "")
+            return web.json_response({"ok": True, "result": msg})
+        return web.json_response({"ok": True, "result": True})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", method)
+    app.router.add_get("/_stats", _stats_route(stub))
+    return app
+
+
+APPS = {"owm": owm_app, "youtube": youtube_app, "telegram": telegram_app}
+
+
+async def start(latency: dict = None, errors: dict = None, host: str = "127.0.0.1", seed: int = 0):
+    """세 서버를 빈 포트로 띄움 → (base URL dict, stubs dict, 정리용 runners)"""
+    latency, errors = latency or {}, errors or {}
+    urls, stubs, runners = {}, {}, []
+    for i, name in enumerate(SERVICES):
+        stub = stubs[name] = Stub(name, latency.get(name, 0), errors.get(name, 0), seed + i)
+        runner = web.AppRunner(APPS[name](stub), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        urls[name] = f"http://{host}:{port}"
+        runners.append(runner)
+    return urls, stubs, runners
+
+
+def _pairs(items) -> dict:
+    """["owm=80", "telegram=40"] → {"owm": 80.0, "telegram": 40.0}"""
+    out = {}
+    for item in items or []:
+        name, _, value = item.partition("=")
+        if name not in SERVICES:
+            raise SystemExit(f"알 수 없는 서비스: {name} (가능: {', '.join(SERVICES)})")
+        out[name] = float(value)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency", nargs="*", default=[], help="서비스=지연ms (예: owm=80 youtube=150 telegram=40)")
+    ap.add_argument("--errors", nargs="*", default=[], help="서비스=오류비율 (예: owm=0.02)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    async def serve():
+        urls, _, runners = await start(_pairs(args.latency), _pairs(args.errors), seed=args.seed)
+        print(json.dumps(urls), flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
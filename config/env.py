@@ -1,7 +1,7 @@
 # -------------------------------
 # config/env.py
 # -------------------------------
-import os
+import os, hashlib
 from dotenv import load_dotenv, find_dotenv
 
 # ✅ 1. .env 파일 자동 탐색
@@ -17,14 +17,64 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 WEATHER_KEY = os.getenv("WEATHER_KEY")
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-# 로드된 키 목록 자동 감지
-loaded = [k for k, v in {
-    "BOT_TOKEN": BOT_TOKEN,
-    "WEATHER_KEY": WEATHER_KEY,
-    "YOUTUBE_API_KEY": YOUTUBE_API_KEY
-}.items() if v]
-
-if len(loaded) == 3:
-    print(f"✅ .env 로드 성공 — {', '.join(loaded)} 인식 완료")
-else:
-    print(f"⚠️ [주의] .env 파일 로드 실패 또는 누락된 키 있음 → {', '.join(loaded)}만 감지됨")
+# ✅ 알림 기준 시간대 (notifications의 HH:MM 해석)
+TIMEZONE = os.getenv("TIMEZONE", "Asia/Seoul")
+
+# ✅ 4. 유저 저장소 설정
+# USER_BACKEND: "json" (data/users.json, 기본) | "sqlite" (data/users.db)
+#               | "sharded" (data/users/ab/<uid>.json, 여러 프로세스가 동시에 쓰는 배포용)
+USER_BACKEND = os.getenv("USER_BACKEND", "json").lower()
+USERS_SQLITE_PATH = os.getenv("USERS_SQLITE_PATH", os.path.join("data", "users.db"))
+USERS_SHARD_DIR = os.getenv("USERS_SHARD_DIR", os.path.join("data", "users"))
+# 메모리에 상주한 유저 DB를 몇 초마다 / 몇 명 변경 시 파일로 내려쓸지
+USER_FLUSH_INTERVAL = float(os.getenv("USER_FLUSH_INTERVAL", "5"))
+USER_FLUSH_THRESHOLD = int(os.getenv("USER_FLUSH_THRESHOLD", "50"))
+
+# ✅ 5. 날씨 캐시 (초 단위 TTL, 도시 수 상한)
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))      # 현재 날씨 10분
+FORECAST_CACHE_TTL = float(os.getenv("FORECAST_CACHE_TTL", "3600"))   # 예보 1시간
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "256"))
+
+# ✅ 6. 공용 비동기 HTTP 클라이언트
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5"))                  # 호출별 기본 타임아웃(초)
+HTTP_MAX_CONCURRENCY = int(os.getenv("HTTP_MAX_CONCURRENCY", "50"))    # 동시 요청 상한
+HTTP_LIMIT_PER_HOST = int(os.getenv("HTTP_LIMIT_PER_HOST", "20"))      # 호스트별 keep-alive 커넥션 수
+
+# ✅ 7. 유튜브 영상 풀 (search 1회 = 100 quota unit)
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "8000"))       # 하루 사용 상한 (기본 한도 10000 중)
+YOUTUBE_POOL_REFRESH = float(os.getenv("YOUTUBE_POOL_REFRESH", "21600"))  # 카테고리별 갱신 주기(초)
+YOUTUBE_POOL_SIZE = int(os.getenv("YOUTUBE_POOL_SIZE", "50"))             # 카테고리별 보관 영상 수
+
+# ✅ 8. 알림 일괄 발송 (텔레그램 한도: 전체 초당 30건, 채팅당 초당 1건)
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "25"))              # 전체 초당 발송 수
+BROADCAST_CHAT_RATE = float(os.getenv("BROADCAST_CHAT_RATE", "1"))     # 채팅당 초당 발송 수
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "64"))  # 동시에 준비/발송하는 알림 수
+
+# ✅ 9. 텔레그램 업데이트 수신 방식
+# BOT_MODE: "polling" (기본, getUpdates) | "webhook" (server_app의 /telegram/{secret}로 수신)
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+# 외부에서 접근 가능한 서버 주소 (Render는 RENDER_EXTERNAL_URL 자동 제공)
+WEBHOOK_URL = (os.getenv("WEBHOOK_URL") or os.getenv("RENDER_EXTERNAL_URL") or "").rstrip("/")
+# 경로 + X-Telegram-Bot-Api-Secret-Token 헤더에 쓰는 비밀값 (없으면 토큰에서 고정값 생성)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or (
+    hashlib.sha256(BOT_TOKEN.encode()).hexdigest()[:32] if BOT_TOKEN else "")
+BOT_CONCURRENCY = int(os.getenv("BOT_CONCURRENCY", "32"))   # 동시에 처리하는 업데이트 수 (같은 채팅은 순서대로)
+
+# ✅ 10. 외부 API 주소 (부하 테스트 때 bench/stub_servers.py 같은 로컬 서버로 바꿔 끼움)
+OWM_BASE_URL = os.getenv("OWM_BASE_URL", "http://api.openweathermap.org").rstrip("/")
+YOUTUBE_API_BASE = os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
+
+# 로드된 키 목록 확인 — import 시 출력하지 않고 봇/서버 시작 시 1번 호출
+def report_env() -> list:
+    loaded = [k for k, v in {
+        "BOT_TOKEN": BOT_TOKEN,
+        "WEATHER_KEY": WEATHER_KEY,
+        "YOUTUBE_API_KEY": YOUTUBE_API_KEY
+    }.items() if v]
+
+    if len(loaded) == 3:
+        print(f"✅ .env 로드 성공 — {', '.join(loaded)} 인식 완료")
+    else:
+        print(f"⚠️ [주의] .env 파일 로드 실패 또는 누락된 키 있음 → {', '.join(loaded)}만 감지됨")
+    return loaded
@@ -1,21 +1,26 @@
 # -------------------------------
 # NYFITCOACH_BOT/_main.py (2025 완성형 통합버전 - 1/2)
 # -------------------------------
-import os, re, asyncio, random, datetime, requests, nest_asyncio
+import os, asyncio, random, datetime
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ApplicationBuilder, CommandHandler, MessageHandler, filters, ContextTypes
 
 # ========= 환경설정 =========
-from config.env import BOT_TOKEN, WEATHER_KEY
-from modules.user_module import get_user, update_user, get_user_data, load_data
-from modules.weather_module import get_weather
-from modules.coach_module import build_coach_message
-from modules.youtube_module import get_random_video
+from config.env import BOT_TOKEN, BOT_CONCURRENCY, WEBHOOK_URL, WEBHOOK_SECRET, TELEGRAM_API_BASE, report_env
+from modules.user_module import get_user_data, flush_users
+from modules.user_context import install_user_context, user_ctx
+from modules.weather_module import (aget_weather, aget_tomorrow_weather, aget_today_and_tomorrow,
+                                    abuild_outfit_card, recommend_outfit)
+from modules.youtube_module import aget_random_video, video_pool, YT_CATEGORIES
+from modules.http_module import close_http
+from modules.scheduler_module import NotificationScheduler
+from modules.broadcast_module import Broadcaster
+from modules.intent_module import route
+from modules.update_processor import ChatOrderedProcessor
+from modules.metrics_module import HANDLER
+from modules.user_module import WEEKDAYS
 
 TOKEN = BOT_TOKEN
-nest_asyncio.apply()
-asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-os.makedirs("data", exist_ok=True)
 
 # ========= 도움말 (자동 업데이트용) =========
 def get_help_text():
@@ -44,17 +49,8 @@ TONE_STYLES = {
         "encourage": ["힘들 땐 쉬어가도 괜찮아 💜", "조급해하지 마. 네가 잘하고 있어 🌱", "하루하루가 다 의미 있는 발걸음이야 🌸"]
     }
 }
-def get_tone_message(user_id, category="greetings"):
-    tone = get_user_data(user_id, "tone") or "friendly"
-    return random.choice(TONE_STYLES[tone][category])
-
-YT_CATEGORIES = ["상체","하체","전신","코어","유산소","스트레칭","요가","HIIT","필라테스","복근","스트렝스","상관없음"]
-
-CITY_MAP = {
-    "성남시 수정구": "Seongnam", "성남시 중원구": "Seongnam", "성남시 분당구": "Seongnam",
-    "서울": "Seoul", "부산": "Busan", "대구": "Daegu", "인천": "Incheon",
-    "광주": "Gwangju", "대전": "Daejeon", "울산": "Ulsan", "제주": "Jeju"
-}
+def get_tone_message(ctx, category="greetings"):
+    return random.choice(TONE_STYLES[ctx.tone][category])
 
 def recommend_exercise_by_weather(desc, temp):
     indoor_keywords = ["비","눈","소나기","천둥","thunder"]
@@ -92,8 +88,8 @@ def build_profile_progress(user: dict):
     return "\n".join(msg), []
 
 # ========= /start =========
+@HANDLER.wrap("start")
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    get_user(update.effective_user.id)
     await update.message.reply_text(
         get_help_text() + "\n\n안녕! 나는 운동코치봇 🏃‍♀️\n"
         "이름, 지역, 운동, 시간, 말투(톤)를 알려줘!\n"
@@ -101,50 +97,147 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 # ========= 메시지 처리 =========
+@HANDLER.wrap("handle_text")
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    user_id = update.effective_user.id
+    ctx = user_ctx(update, context)   # 업데이트 시작 시 1번 로드된 유저 (그룹 -1)
     text = (update.message.text or "").strip()
-    get_user(user_id)
 
-    # 도움말 자동 호출
-    if text in ["도움말", "help", "Help"]:
+    intent = route(text)   # 도움말/홈트/영상/날씨/운동하자 한 번에 판별
+    if intent is None or intent.name == "help":
         await update.message.reply_text(get_help_text())
         return
 
-    if "홈트" in text:
+    if intent.name == "home_workout":
         await update.message.reply_text(get_help_text() + "\n\n홈트 카테고리 골라줘 💪\n" + " / ".join(YT_CATEGORIES))
         return
 
-    if any(k in text for k in YT_CATEGORIES):
-        key = next((k for k in YT_CATEGORIES if k in text), "전신")
-        vid = get_random_video(key)
+    if intent.name == "video":
+        key = intent.arg
+        vid = await aget_random_video(key)
         await update.message.reply_photo(
             photo=vid["thumbnail"],
             caption=f"🎬 {key} 추천 영상!\n{vid['title']}\n👉 {vid['link']}"
         )
         return
 
-    if re.search(r"(오늘\s*날씨|날씨)(어때)?\??", text):
-        city = get_user_data(user_id, "location") or "서울"
-        city_en = CITY_MAP.get(city.strip(), city)
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city_en}&appid={WEATHER_KEY}&units=metric&lang=kr"
-        data = requests.get(url).json()
-        temp, desc = data["main"]["temp"], data["weather"][0]["description"]
-        cat, sug = recommend_exercise_by_weather(desc, temp)
-        msg = f"📍 {city}\n🌡 {temp}°C / {desc}\n\n{cat}\n{sug}"
-        await update.message.reply_text(msg)
+    city = ctx.location
+    if intent.name == "weather_tomorrow":
+        t = await aget_tomorrow_weather(city)
+        await update.message.reply_text(f"📍 {city} 내일(정오)\n{t['icon']} {t['temp']}°C / {t['desc']}")
         return
 
-    await update.message.reply_text(get_help_text())
+    w = await aget_weather(city)  # 도시별 TTL 캐시 + 비동기 HTTP
+    temp, desc = w["temp"], w["desc"]
+    cat, sug = recommend_exercise_by_weather(desc, temp)
+    if intent.name == "weather":
+        msg = f"📍 {city}\n🌡 {temp}°C / {desc}\n\n{cat}\n{sug}"
+    else:  # workout
+        is_outdoor = recommend_outfit(temp, desc)["is_outdoor"]
+        from modules.coach_module import build_coach_message   # 문장 풀은 첫 코칭 때 로드
+        coach = build_coach_message(ctx.tone, w["main"], temp, is_outdoor)
+        msg = f"{coach}\n\n📍 {city} {temp}°C / {desc}\n{cat}\n{sug}"
+    await update.message.reply_text(msg)
+
+# ========= 예약 알림 =========
+@HANDLER.wrap("notification")
+async def prepare_notification(job):
+    """(uid, 알림종류) → (chat_id, 보낼 메시지 목록). 날씨는 카드와 코치 멘트가 같이 씀 (외부 호출 최대 1번).
+    weather_only: 복장 카드 / combo: 카드 + 코치 멘트 / workout_only: 오늘 루틴 + 영상"""
+    uid, ntype = job
+    u = get_user_data(uid)
+    city = u.get("location") or "서울"
+    name = u.get("name") or "친구"
+    if ntype in ("weather_only", "combo"):
+        weather = await aget_today_and_tomorrow(city)
+        photo, caption = await abuild_outfit_card(name, city, weather)
+        w = weather[0]
+        messages = [("send_photo", {"photo": photo, "caption": caption})]
+        if ntype == "combo":
+            from modules.coach_module import build_coach_message
+            is_outdoor = recommend_outfit(w["temp"], w["desc"])["is_outdoor"]
+            messages.append(("send_message", {"text": build_coach_message(u.get("tone"), w["main"], w["temp"], is_outdoor)}))
+        return int(uid), messages
+    today = WEEKDAYS[datetime.datetime.now().weekday()]
+    acts = (u.get("routine") or {}).get(today) or []
+    routine = ", ".join(a["type"] for a in acts) or "자유 운동"
+    vid = await aget_random_video(acts[0]["type"] if acts else "전신")
+    return int(uid), [("send_message", {"text": f"⏰ 오늘 루틴: {routine}\n🎬 {vid['title']}\n👉 {vid['link']}"})]
+
+async def dispatch_notifications(broadcaster, jobs, when):
+    """스케줄러가 넘겨준 (uid, 알림종류) 목록을 속도 제한에 맞춰 일괄 발송"""
+    jobs = [j for j in jobs if j[0].isdigit()]   # 웹(이름 기반) 유저는 텔레그램 chat_id가 없음
+    progress = lambda s: print(f"📣 {when:%H:%M} 알림 {s['done']}/{s['total']} ({s['per_sec']}건/s)")
+    s = await broadcaster.broadcast(jobs, prepare_notification, on_progress=progress)
+    print(f"⏰ {when:%H:%M} 알림 {s['sent']}/{s['total']}건 발송 "
+          f"(실패 {s['failed']}, 재시도 {s['retries']}, {s['elapsed']}s, {s['per_sec']}건/s)")
 
 # ========= 실행 =========
-async def main():
-    app = ApplicationBuilder().token(TOKEN).build()
+def build_application():
+    """핸들러가 등록된 Application (polling/webhook 공통)"""
+    app = (ApplicationBuilder().token(TOKEN)
+           .base_url(f"{TELEGRAM_API_BASE}/bot").base_file_url(f"{TELEGRAM_API_BASE}/file/bot")
+           .concurrent_updates(ChatOrderedProcessor(BOT_CONCURRENCY))   # 채팅별 순서 유지 + 동시 처리
+           .build())
+    install_user_context(app)   # 모든 핸들러에 UserContext (로드 1번 / 저장 1번)
     app.add_handler(CommandHandler("start", start))
     app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text))
-    print("🤖 NYFITCOACH_BOT 실행 중...")
-    await app.run_polling(close_loop=False)
+    return app
+
+def start_services(app):
+    """유튜브 영상 풀 갱신 + 예약 알림 백그라운드 시작 → 정리용 코루틴 함수 반환"""
+    pool_task = asyncio.create_task(video_pool.run())  # 유튜브 영상 풀 백그라운드 갱신
+    broadcaster = Broadcaster(app.bot)
+    scheduler = NotificationScheduler()
+    scheduler.load()
+    scheduler.attach()
+    sched_task = asyncio.create_task(
+        scheduler.run(lambda jobs, when: dispatch_notifications(broadcaster, jobs, when)))
+
+    async def stop():
+        sched_task.cancel()
+        scheduler.detach()
+        pool_task.cancel()
+        flush_users()  # 봇 종료 시 대기 중인 유저 변경사항 저장
+        await close_http()
+    return stop
+
+async def main():
+    """polling 모드 (단독 실행 또는 server_app의 BOT_MODE=polling)"""
+    import nest_asyncio
+    nest_asyncio.apply()        # FastAPI(uvicorn) 루프 안에서 run_polling 실행
+    report_env()
+    app = build_application()
+    print("🤖 NYFITCOACH_BOT 실행 중... (polling)")
+    stop = start_services(app)
+    try:
+        await app.run_polling(close_loop=False)
+    finally:
+        await stop()
+
+async def start_webhook(base_url: str = WEBHOOK_URL, secret: str = WEBHOOK_SECRET):
+    """
+    webhook 모드: 텔레그램에 {base_url}/telegram/{secret} 등록 후 (app, stop) 반환.
+    server_app이 받은 업데이트를 app.update_queue에 넣으면 ChatOrderedProcessor가 처리.
+    """
+    if not (base_url and secret):
+        raise RuntimeError("webhook 모드에는 WEBHOOK_URL(또는 RENDER_EXTERNAL_URL)과 BOT_TOKEN이 필요")
+    report_env()
+    app = build_application()
+    await app.initialize()
+    await app.start()
+    await app.bot.set_webhook(f"{base_url}/telegram/{secret}", secret_token=secret,
+                              allowed_updates=Update.ALL_TYPES)
+    print(f"🤖 NYFITCOACH_BOT 실행 중... (webhook: {base_url}/telegram/***)")
+    stop_services = start_services(app)
+
+    async def stop():
+        await stop_services()
+        await app.stop()
+        await app.shutdown()
+    return app, stop
 
 if __name__ == "__main__":
+    if os.name == "nt":
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(main())
 
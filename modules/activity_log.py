@@ -0,0 +1,130 @@
+# -------------------------------
+# modules/activity_log.py
+# NYFITCOACH_BOT - 운동 기록 로그 (월별 JSONL 세그먼트, append-only)
+# data/history/2025-11.jsonl         ← 한 줄 = 기록 1건
+# data/history/rollup/2025-08.json   ← 압축된 옛 기록 (일별 집계, 달마다 1개)
+# -------------------------------
+import os, json, glob, threading
+from collections import defaultdict
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+
+class ActivityLog:
+    """유저 레코드 밖에 쌓이는 기록 로그. append는 버퍼링 후 flush()에서 파일 끝에 추가."""
+
+    def __init__(self, directory: str):
+        self.dir = directory
+        self.rollup_dir = os.path.join(directory, "rollup")
+        self._buf: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()       # 버퍼
+        self._io = threading.Lock()         # 세그먼트 파일 (추가 vs 압축 중 다시 쓰기)
+
+    def _segment(self, month: str) -> str:
+        return os.path.join(self.dir, f"{month}.jsonl")
+
+    # ----- 쓰기 -----
+    def append(self, uid: str, rec: Dict[str, Any]) -> None:
+        with self._lock:
+            self._buf.append({"uid": uid, **rec})
+
+    def flush(self) -> int:
+        """버퍼를 월별 세그먼트에 추가. 기록한 줄 수 반환."""
+        with self._lock:
+            buf, self._buf = self._buf, []
+        if not buf:
+            return 0
+        os.makedirs(self.dir, exist_ok=True)
+        by_month = defaultdict(list)
+        for rec in buf:
+            by_month[rec["date"][:7]].append(json.dumps(rec, ensure_ascii=False))
+        with self._io:
+            for month, lines in by_month.items():
+                with open(self._segment(month), "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+        return len(buf)
+
+    # ----- 읽기 -----
+    def months(self) -> List[str]:
+        return sorted(os.path.basename(p)[:-6] for p in glob.glob(os.path.join(self.dir, "*.jsonl")))
+
+    def read(self, uid: Optional[str] = None, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """세그먼트의 원본 기록 (since: 'YYYY-MM-DD' 이후만). 압축된 달은 rollups()로."""
+        self.flush()
+        for month in self.months():
+            if since and month < since[:7]:
+                continue
+            with open(self._segment(month), encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    rec = json.loads(line)
+                    if (uid is None or rec["uid"] == uid) and (not since or rec["date"] >= since):
+                        yield rec
+
+    def rollups(self, uid: str) -> Dict[str, Dict[str, Any]]:
+        """압축된 달의 일별 집계 {date: {type: {"count", "minutes"}}}"""
+        out = {}
+        for path in sorted(glob.glob(os.path.join(self.rollup_dir, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                for date, users in json.load(f).items():
+                    if uid in users:
+                        out[date] = users[uid]
+        return out
+
+    def daily_rows(self) -> Iterator[Tuple[str, str, str, int, int]]:
+        """압축된 모든 달의 (uid, date, type, count, minutes) — 다른 저장소로 옮길 때"""
+        for path in sorted(glob.glob(os.path.join(self.rollup_dir, "*.json"))):
+            with open(path, encoding="utf-8") as f:
+                for date, users in json.load(f).items():
+                    for uid, types in users.items():
+                        for kind, v in types.items():
+                            yield uid, date, kind, v["count"], v["minutes"]
+
+    # ----- 압축 -----
+    def compact(self, before: str) -> List[str]:
+        """before('YYYY-MM-DD') 이전 기록을 일별 집계로 바꾸고 원본 삭제. 집계를 만든 달 반환.
+        SQLite 저장소(history_daily)와 같은 날 단위 — before가 든 달은 그 전날까지만 옮기고 나머지는 남김.
+        'YYYY-MM'을 주면 그 달 1일 기준과 같음."""
+        self.flush()
+        done = []
+        with self._io:
+            for month in self.months():
+                if month > before[:7]:
+                    break
+                keep, moved = [], []
+                with open(self._segment(month), encoding="utf-8") as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        rec = json.loads(line)
+                        (moved if rec["date"] < before else keep).append((line, rec))
+                if not moved:
+                    continue
+                self._roll_up(month, [rec for _, rec in moved])
+                if keep:
+                    tmp = self._segment(month) + ".tmp"
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        f.writelines(line if line.endswith("\n") else line + "\n" for line, _ in keep)
+                    os.replace(tmp, self._segment(month))
+                else:
+                    os.remove(self._segment(month))
+                done.append(month)
+        return done
+
+    def _roll_up(self, month: str, records: List[Dict[str, Any]]) -> None:
+        path = os.path.join(self.rollup_dir, f"{month}.json")
+        daily: Dict[str, Dict[str, Dict[str, Dict[str, int]]]] = {}
+        if os.path.exists(path):            # 이미 압축된 날/달에 늦게 들어온 기록 → 합산
+            with open(path, encoding="utf-8") as f:
+                daily = json.load(f)
+        for rec in records:
+            slot = (daily.setdefault(rec["date"], {})
+                         .setdefault(rec["uid"], {})
+                         .setdefault(rec["type"], {"count": 0, "minutes": 0}))
+            slot["count"] += 1
+            slot["minutes"] += rec.get("duration") or 0
+        os.makedirs(self.rollup_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(daily, f, ensure_ascii=False)
+        os.replace(tmp, path)
@@ -0,0 +1,122 @@
+# -------------------------------
+# modules/alert_module.py
+# NYFITCOACH_BOT - 관리자 알림 큐 (비동기 발송 + 가입 알림 묶기)
+# 특징: 호출하는 쪽(/health 등)은 큐에 넣기만 하고 바로 반환, 발송은 백그라운드 태스크가 담당
+# -------------------------------
+import time, asyncio
+from typing import Awaitable, Callable, Optional
+
+
+class AlertQueue:
+    """
+    push(text): 일반 알림 — 큐가 가득 차면 버리고 dropped만 셈 (다음 알림에 표시)
+    add_users(diff, total, latest): 유저 증감 — window초 동안 모았다가
+        "최근 5분간 새 유저 +N명" 한 통으로 발송
+    run(): 큐를 비우는 백그라운드 루프, 발송 1건마다 timeout초 제한
+    close(): 남은 알림을 timeout 안에서 최대한 보내고 종료
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], window: float = 300,
+                 maxsize: int = 100, timeout: float = 5,
+                 clock: Callable[[], float] = time.monotonic):
+        self._send = send
+        self.window = window
+        self.timeout = timeout
+        self._clock = clock
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+        self._window_end: Optional[float] = None
+        self._joined = 0
+        self._left = 0
+        self._total = 0
+        self._latest = None
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    # ----- 넣기 (블로킹 없음) -----
+    def push(self, text: str) -> bool:
+        try:
+            self._queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def _poke(self) -> None:
+        """run()이 다음 마감 시각을 다시 계산하도록 깨움"""
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass                            # 큐에 이미 뭔가 있으면 곧 깨어남
+
+    def add_users(self, diff: int, total: int, latest: Optional[str] = None) -> None:
+        if diff > 0:
+            self._joined += diff
+            self._latest = latest or self._latest
+        elif diff < 0:
+            self._left -= diff
+        else:
+            return
+        self._total = total
+        if self._window_end is None:
+            self._window_end = self._clock() + self.window
+            self._poke()
+
+    def _take_summary(self) -> Optional[str]:
+        if not (self._joined or self._left):
+            self._window_end = None
+            return None
+        minutes = max(1, round(self.window / 60))
+        lines = ["[NYFitCoach 알림]"]
+        if self._joined:
+            lines.append(f"🟢 최근 {minutes}분간 새 유저 +{self._joined}명 (총 {self._total}명)")
+            if self._latest:
+                lines.append(f"최근 가입자: {self._latest}")
+        if self._left:
+            lines.append(f"🔴 최근 {minutes}분간 유저 {self._left}명 감소 (현재 {self._total}명)")
+        self._joined = self._left = 0
+        self._latest = None
+        self._window_end = None
+        return "\n".join(lines)
+
+    # ----- 발송 -----
+    async def _deliver(self, text: str) -> None:
+        if self.dropped:
+            text += f"\n(큐가 가득 차 알림 {self.dropped}건 생략)"
+            self.dropped = 0
+        try:
+            await asyncio.wait_for(self._send(text), self.timeout)
+            self.sent += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠️ [alert] 관리자 알림 실패: {e!r}")
+
+    async def run(self) -> None:
+        while True:
+            wait = None if self._window_end is None else max(0.0, self._window_end - self._clock())
+            try:
+                text = await asyncio.wait_for(self._queue.get(), wait)
+            except asyncio.TimeoutError:
+                text = self._take_summary()
+            if text:
+                await self._deliver(text)
+
+    async def close(self, timeout: float = 5) -> None:
+        """남은 알림(묶음 포함)을 timeout초 안에서 발송"""
+        async def _drain():
+            pending = []
+            while not self._queue.empty():
+                text = self._queue.get_nowait()
+                if text:
+                    pending.append(text)
+            summary = self._take_summary()
+            for text in pending + ([summary] if summary else []):
+                await self._deliver(text)
+        try:
+            await asyncio.wait_for(_drain(), timeout)
+        except asyncio.TimeoutError:
+            print("⚠️ [alert] 종료 전 알림 발송 시간 초과")
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "sent": self.sent,
+                "failed": self.failed, "dropped": self.dropped}
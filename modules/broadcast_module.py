@@ -0,0 +1,161 @@
+# -------------------------------
+# modules/broadcast_module.py
+# NYFITCOACH_BOT - 알림 일괄 발송 (토큰 버킷 속도 제한 + RetryAfter 재시도)
+# 특징: 전체/채팅별 한도를 지키면서 메시지 준비(날씨·코치·카드)는 동시에 진행
+# -------------------------------
+import time, asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
+
+from config.env import BROADCAST_RATE, BROADCAST_CHAT_RATE, BROADCAST_CONCURRENCY
+
+Message = Tuple[str, Dict[str, Any]]   # (bot 메서드 이름, 인자) 예: ("send_photo", {"photo": ..., "caption": ...})
+
+
+class TokenBucket:
+    """
+    초당 rate개, 최대 capacity개까지 모아두는 토큰 버킷.
+    reserve()는 토큰을 미리 예약하고 기다려야 할 초를 돌려줌 (토큰이 음수가 될 수 있음)
+    → 호출 순서대로 줄을 서므로 asyncio 안에서 잠금이 필요 없음.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._last = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def reserve(self) -> float:
+        self._refill()
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """RetryAfter를 받으면 그만큼 버킷 전체를 멈춤"""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+    @property
+    def idle(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+def _retry_seconds(e: RetryAfter) -> float:
+    wait = e.retry_after
+    return wait.total_seconds() if hasattr(wait, "total_seconds") else float(wait)
+
+
+class Broadcaster:
+    """
+    bot(telegram.Bot 또는 같은 메서드를 가진 가짜 Bot)으로 여러 채팅에 발송.
+    - 전체 버킷(global_rate) + 채팅별 버킷(chat_rate): 채팅 대기 후 전체 토큰을 받음
+    - RetryAfter: 전체 버킷을 그 시간만큼 멈추고 같은 메시지 재시도
+    - 네트워크 오류: 지수 백오프로 재시도
+    - 재시도는 둘을 합쳐 메시지당 max_retries회까지 (계속 429면 그 메시지는 실패 처리)
+    - 차단(Forbidden)/잘못된 요청(BadRequest): 재시도 없이 실패 처리
+    """
+
+    def __init__(self, bot, global_rate: float = BROADCAST_RATE,
+                 chat_rate: float = BROADCAST_CHAT_RATE,
+                 concurrency: int = BROADCAST_CONCURRENCY,
+                 max_retries: int = 3, backoff: float = 0.5):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[Any, TokenBucket] = {}
+        self.retries = 0
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, capacity=1)
+        return bucket
+
+    def _prune(self) -> None:
+        """다 찬(쉬고 있는) 채팅 버킷은 버려서 메모리가 유저 수만큼 쌓이지 않게"""
+        for chat_id in [c for c, b in self._chats.items() if b.idle]:
+            del self._chats[chat_id]
+
+    async def send(self, chat_id, method: str, **kwargs) -> Any:
+        """메시지 1건 발송 (속도 제한 + 재시도). 최종 실패 시 예외."""
+        attempt = 0
+        while True:
+            await self._chat_bucket(chat_id).acquire()
+            await self._global.acquire()
+            try:
+                return await getattr(self.bot, method)(chat_id=chat_id, **kwargs)
+            except RetryAfter as e:
+                if attempt >= self.max_retries:
+                    raise
+                wait = _retry_seconds(e)
+                self._global.pause(wait)
+                self._chat_bucket(chat_id).pause(wait)
+            except (Forbidden, BadRequest):
+                raise
+            except NetworkError:
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+            attempt += 1
+            self.retries += 1
+            if hasattr(kwargs.get("photo"), "seek"):
+                kwargs["photo"].seek(0)     # BytesIO는 다시 처음부터 읽게
+
+    async def broadcast(self, jobs: Iterable[Any],
+                        prepare: Callable[[Any], Awaitable[Tuple[Any, List[Message]]]],
+                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                        progress_every: int = 100) -> Dict[str, Any]:
+        """
+        jobs마다 prepare(job) → (chat_id, [메시지...])를 만들어 순서대로 발송.
+        최대 concurrency개의 job이 동시에 준비/발송 (준비는 한도와 무관하게 겹침).
+        진행 상황은 progress_every건마다 on_progress(stats)로 알림.
+        """
+        jobs = list(jobs)
+        stats = {"total": len(jobs), "done": 0, "sent": 0, "failed": 0,
+                 "messages": 0, "retries": 0, "elapsed": 0.0, "per_sec": 0.0}
+        start = time.perf_counter()
+        retries0 = self.retries
+        sem = asyncio.Semaphore(self.concurrency)
+
+        def _tick():
+            stats["elapsed"] = round(time.perf_counter() - start, 3)
+            stats["per_sec"] = round(stats["messages"] / stats["elapsed"], 1) if stats["elapsed"] else 0.0
+            stats["retries"] = self.retries - retries0
+
+        async def _one(job):
+            async with sem:
+                try:
+                    chat_id, messages = await prepare(job)
+                    for method, kwargs in messages:
+                        await self.send(chat_id, method, **kwargs)
+                        stats["messages"] += 1
+                    stats["sent"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"⚠️ [broadcast] {job} 발송 실패: {e}")
+                stats["done"] += 1
+                if on_progress and stats["done"] % progress_every == 0:
+                    _tick()
+                    on_progress(dict(stats))
+
+        await asyncio.gather(*(_one(job) for job in jobs))
+        self._prune()
+        _tick()
+        return stats
@@ -0,0 +1,160 @@
+# -------------------------------
+# modules/cache_module.py
+# NYFITCOACH_BOT - TTL + LRU 캐시 (동시 miss는 한 번만 로드)
+# -------------------------------
+import time, asyncio, threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _OwnerCancelled(Exception):
+    """aget_or_load에서 불러오던 코루틴이 취소됨 — 같이 기다리던 쪽은 다시 시도"""
+
+
+class TTLCache:
+    """
+    key별로 ttl초 동안 값을 보관, maxsize 초과 시 가장 오래 안 쓴 항목부터 제거.
+    get_or_load(): 같은 key로 동시에 miss가 나면 첫 요청만 loader를 부르고
+    나머지는 그 결과를 기다려 공유 (실패는 캐시하지 않음).
+    aget_or_load(): 같은 동작의 asyncio 버전 (loader는 코루틴 함수).
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, name: str = "",
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.maxsize = max(1, maxsize)
+        self.name = name
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key → (만료시각, 값)
+        self._inflight: Dict[Hashable, Future] = {}
+        self._ainflight: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    # ----- 기본 조회/저장 -----
+    def _lookup(self, key: Hashable):
+        """잠금 안에서 호출. (hit 여부, 값)"""
+        item = self._data.get(key)
+        if item is None:
+            return False, None
+        expires, value = item
+        if expires <= self._clock():
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """신선한 값이 있으면 반환 (hit/miss 집계 안 함 — 없으면 다른 경로로 대신할 때)"""
+        with self._lock:
+            hit, value = self._lookup(key)
+            return value if hit else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    # ----- 로드 + 요청 합치기 -----
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit, value = self._lookup(key)
+            if hit:
+                self.hits += 1
+                return value
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                self.misses += 1
+                fut = self._inflight[key] = Future()
+                owner = True
+        if not owner:
+            return fut.result()
+        try:
+            value = loader()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            self.set(key, value)
+            fut.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            with self._lock:
+                hit, value = self._lookup(key)
+                if hit:
+                    self.hits += 1
+                    return value
+                fut = self._ainflight.get(key)
+                if fut is not None and not fut.done():
+                    self.coalesced += 1
+                    owner = False
+                else:
+                    self.misses += 1
+                    fut = self._ainflight[key] = asyncio.get_running_loop().create_future()
+                    owner = True
+            if not owner:
+                try:
+                    return await asyncio.shield(fut)
+                except _OwnerCancelled:
+                    continue            # 불러오던 쪽만 취소됨 → 기다리던 쪽 중 하나가 다시 불러옴
+            try:
+                value = await loader()
+            except asyncio.CancelledError:
+                fut.set_exception(_OwnerCancelled())    # 기다리는 쪽까지 취소하지 않음
+                fut.exception()
+                raise
+            except BaseException as e:
+                fut.set_exception(e)
+                fut.exception()             # 기다리는 쪽이 없어도 경고 안 나게 소비
+                raise
+            else:
+                self.set(key, value)
+                fut.set_result(value)
+                return value
+            finally:
+                with self._lock:
+                    if self._ainflight.get(key) is fut:
+                        del self._ainflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
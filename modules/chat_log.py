@@ -0,0 +1,106 @@
+# -------------------------------
+# modules/chat_log.py
+# NYFITCOACH_BOT - 웹 채팅 기록 (유저별 JSONL, append-only)
+# data/chat_나연.jsonl   ← 한 줄 = 메시지 1건 {"time", "role", "text"}
+# 최근 N개는 파일 끝에서 거꾸로 읽어 전체를 파싱하지 않음
+# -------------------------------
+import os, json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+BLOCK = 8192
+
+
+class ChatLog:
+    """
+    append(): 메시지 1줄을 파일 끝에 추가 (기존 내용은 다시 쓰지 않음)
+    tail(): 끝에서부터 n개 + 그 시작 위치(byte) → 다음 "이전 대화" 페이지는 end=시작 위치로
+    migrate(): 예전 data/chat_{이름}.json (리스트 통째 저장) → JSONL 1회 변환
+    """
+
+    def __init__(self, directory: str = "data"):
+        self.dir = directory
+
+    def path(self, user_name: str) -> str:
+        return os.path.join(self.dir, f"chat_{user_name}.jsonl")
+
+    def _legacy_path(self, user_name: str) -> str:
+        return os.path.join(self.dir, f"chat_{user_name}.json")
+
+    # ----- 쓰기 -----
+    def append(self, user_name: str, role: str, text: str) -> Dict[str, Any]:
+        rec = {"time": datetime.now().isoformat(), "role": role, "text": text}
+        os.makedirs(self.dir, exist_ok=True)
+        with open(self.path(user_name), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        return rec
+
+    def clear(self, user_name: str) -> None:
+        for p in (self.path(user_name), self._legacy_path(user_name)):
+            if os.path.exists(p):
+                os.remove(p)
+
+    # ----- 읽기 -----
+    def tail(self, user_name: str, n: int, end: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """end(byte) 앞의 마지막 n개 메시지와 첫 메시지의 시작 위치. 위치가 0이면 더 이전 없음."""
+        path = self.path(user_name)
+        if n <= 0 or not os.path.exists(path):
+            return [], 0
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            end = size if end is None else min(end, size)
+            pos, buf, newlines = end, b"", 0
+            while pos > 0 and newlines <= n:        # 잘린 첫 줄 + n줄이 모일 때까지 블록 단위로 뒤로
+                step = min(BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step)
+                newlines += chunk.count(b"\n")
+                buf = chunk + buf
+        lines = buf.split(b"\n")
+        end -= len(lines.pop())                     # 마지막 줄이 덜 써졌으면(줄바꿈 없음) 제외
+        if pos > 0:
+            lines = lines[1:]                       # 블록 경계에서 잘린 줄
+        lines = lines[-n:]
+        start = end - sum(len(l) + 1 for l in lines)
+        msgs = []
+        for line in lines:
+            try:
+                msgs.append(json.loads(line))
+            except ValueError:
+                continue
+        return msgs, start
+
+    # ----- 마이그레이션 -----
+    def migrate(self, user_name: str) -> bool:
+        """예전 JSON 파일이 있으면 JSONL로 변환하고 원본은 .json.bak으로. 변환했으면 True."""
+        legacy = self._legacy_path(user_name)
+        if not os.path.exists(legacy):
+            return False
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [chat_log] {legacy} 변환 실패: {e}")
+            return False
+        path = self.path(user_name)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for rec in data if isinstance(data, list) else []:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if os.path.exists(path):                # 변환 전에 새 형식으로 쌓인 메시지는 뒤에 이어붙임
+                with open(path, "r", encoding="utf-8") as cur:
+                    f.write(cur.read())
+        os.replace(tmp, path)
+        os.replace(legacy, legacy + ".bak")
+        return True
+
+    def migrate_all(self) -> int:
+        if not os.path.isdir(self.dir):
+            return 0
+        names = [f[5:-5] for f in os.listdir(self.dir) if f.startswith("chat_") and f.endswith(".json")]
+        return sum(self.migrate(name) for name in names)
+
+
+chat_log = ChatLog()
@@ -0,0 +1,252 @@
+# -------------------------------
+# modules/geo_module.py
+# NYFITCOACH_BOT - 지역명 → 좌표 (로컬 행정구역 색인 + 원격 결과 영구 캐시)
+# data/regions_kr.json        ← 시도/시군구 대표 좌표 (번들)
+# data/geocode_cache.json     ← 색인에 없어서 OWM geocoding으로 찾은 결과
+# -------------------------------
+import os, re, json, threading
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import quote
+
+from config.env import WEATHER_KEY, OWM_BASE_URL
+from modules.metrics_module import UPSTREAM
+from modules import http_module
+from modules.location_module import clean_city_text
+
+REGIONS_PATH = os.path.join("data", "regions_kr.json")
+GEOCODE_CACHE_PATH = os.path.join("data", "geocode_cache.json")
+
+
+class Place(NamedTuple):
+    name: str       # 예: "경기도 성남시 수정구"
+    lat: float
+    lon: float
+    source: str     # local | cache | remote
+
+
+# ===== 정규화 =====
+# 토큰 끝의 행정구역 접미사 제거: "서울특별시" → "서울", "성남시" → "성남", "수정구" → "수정"
+_SUFFIX_RE = re.compile(r"(?:특별자치시|특별자치도|특별시|광역시|도|시|군|구)$")
+_SUFFIX_CHARS = set("도시군구")
+_NOISE_RE = re.compile(r"[^\w\s]")
+# 옛/긴 도 이름 → 짧은 이름 (전북특별자치도 = 전라북도 = 전북)
+_ALIASES = {"전라북": "전북", "전라남": "전남", "경상북": "경북", "경상남": "경남",
+            "충청북": "충북", "충청남": "충남"}
+
+
+def _tokens(text: str) -> List[str]:
+    out = []
+    for tok in _NOISE_RE.sub(" ", text).lower().split():
+        stripped = _SUFFIX_RE.sub("", tok)
+        if len(stripped) < 2:               # "대구", "중구"처럼 접미사를 떼면 한 글자만 남는 이름은 그대로
+            stripped = tok
+        out.append(_ALIASES.get(stripped, stripped))
+    return out
+
+
+# ===== 트라이 =====
+class _Node:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: List[int] = []
+
+
+class RegionIndex:
+    """
+    행정구역명을 정규화한 키로 트라이에 넣고 검색.
+    - 키: 전체 경로와 뒤쪽 부분 경로 모두 ("경기성남수정", "성남수정", "수정")
+    - 긴 입력("경기도 성남시 수정구 수정로 157"): 토큰 경계에서 끝나는 가장 긴 접두어
+    - 짧은 입력("해운"): 그 접두어로 시작하는 가장 얕은(상위) 지역
+    - 오타("헤운대"): 편집 거리 1 이내
+    같은 키는 파일 순서가 앞선 지역 우선 (예: "중구" → 서울 중구).
+    """
+
+    def __init__(self, regions: List[list]):
+        self.places: List[Place] = []
+        self.root = _Node()
+        for i, (name, lat, lon) in enumerate(regions):
+            self.places.append(Place(name, lat, lon, "local"))
+            toks = _tokens(name)
+            for start in range(len(toks)):
+                self._insert("".join(toks[start:]), i)
+
+    @classmethod
+    def load(cls, path: str = REGIONS_PATH) -> "RegionIndex":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(json.load(f)["regions"])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ [geo] 지역 색인 로드 실패: {e}")
+            return cls([])
+
+    def _insert(self, key: str, idx: int) -> None:
+        node = self.root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+        if idx not in node.entries:
+            node.entries.append(idx)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    def lookup(self, text: str) -> Optional[Place]:
+        toks = _tokens(clean_city_text(text or ""))
+        if not toks:
+            return None
+        for start in range(len(toks)):                       # "내가 부산" → 앞 토큰을 건너뛰며 재시도
+            idx, node, consumed = self._walk(toks[start:])
+            if idx is not None:
+                return self.places[idx]
+            if start == 0:
+                full_node, full_consumed = node, consumed
+        if full_consumed:                                    # 입력 전체가 더 긴 키의 접두어 ("해운")
+            idx = self._shallowest(full_node)
+            if idx is not None:
+                return self.places[idx]
+        q = "".join(toks)
+        return self._fuzzy(q) if len(q) >= 3 else None       # 두 글자 오타 보정은 엉뚱한 곳으로 감
+
+    def _walk(self, toks: List[str]):
+        """토큰 경계에서 끝나는 가장 긴 키 → (지역 번호 | None, 멈춘 노드, 입력을 다 썼는지)"""
+        q = "".join(toks)
+        bounds, pos = set(), 0
+        for t in toks:
+            pos += len(t)
+            bounds.add(pos)
+        node, best, i = self.root, None, 0
+        while i < len(q):
+            nxt = node.children.get(q[i])
+            if nxt is None:
+                if q[i] in _SUFFIX_CHARS and node.entries:   # 띄어쓰기 없이 붙은 "성남시수정"의 "시"
+                    i += 1
+                    continue
+                break
+            node, i = nxt, i + 1
+            if node.entries and (i == len(q) or i in bounds or q[i] in _SUFFIX_CHARS):
+                best = node.entries[0]
+        return best, node, i == len(q)
+
+    def _shallowest(self, node: _Node) -> Optional[int]:
+        level = [node]
+        while level:
+            found = [e for n in level for e in n.entries]
+            if found:
+                return min(found)
+            level = [c for n in level for c in n.children.values()]
+        return None
+
+    def _fuzzy(self, q: str, max_dist: int = 1) -> Optional[Place]:
+        """편집 거리 max_dist 이내의 키 중 가장 가까운 지역 (트라이 위에서 DP 한 줄씩)"""
+        best = (max_dist + 1, len(self.places))         # (거리, 파일 순서) 작은 쪽이 우선
+        stack = [(self.root, list(range(len(q) + 1)))]
+        while stack:
+            node, row = stack.pop()
+            if node.entries and (row[-1], node.entries[0]) < best:
+                best = (row[-1], node.entries[0])
+            if min(row) > max_dist:
+                continue
+            for ch, child in node.children.items():
+                new = [row[0] + 1]
+                for j in range(1, len(q) + 1):
+                    new.append(min(new[j - 1] + 1, row[j] + 1, row[j - 1] + (q[j - 1] != ch)))
+                stack.append((child, new))
+        return self.places[best[1]] if best[0] <= max_dist else None
+
+
+# ===== 원격 geocoding 결과 영구 캐시 =====
+class GeocodeCache:
+    """질의 문자열 → 좌표. 새 결과가 생길 때만 파일 전체를 원자적으로 다시 씀 (드묾)."""
+
+    def __init__(self, path: str = GEOCODE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._misses = set()            # 못 찾은 질의는 이번 실행 동안만 기억
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def key(text: str) -> str:
+        return " ".join(_tokens(clean_city_text(text or "")))
+
+    def get(self, text: str) -> Optional[Place]:
+        item = self._data.get(self.key(text))
+        return Place(item["name"], item["lat"], item["lon"], "cache") if item else None
+
+    def known_missing(self, text: str) -> bool:
+        return self.key(text) in self._misses
+
+    def put(self, text: str, place: Optional[Place]) -> None:
+        key = self.key(text)
+        with self._lock:
+            if place is None:
+                self._misses.add(key)
+                return
+            self._data[key] = {"name": place.name, "lat": place.lat, "lon": place.lon}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _geo_url(text: str) -> str:
+    return f"{OWM_BASE_URL}/geo/1.0/direct?q={quote(text)}&limit=1&appid={WEATHER_KEY}"
+
+
+def _parse_geo(data, text: str) -> Optional[Place]:
+    if not data:
+        return None
+    item = data[0]
+    name = (item.get("local_names") or {}).get("ko") or item.get("name") or text
+    return Place(name, round(item["lat"], 4), round(item["lon"], 4), "remote")
+
+
+region_index = RegionIndex.load()
+geocode_cache = GeocodeCache()
+
+
+def resolve_local(text: str) -> Optional[Place]:
+    """네트워크 없이: 번들 색인 → 영구 캐시"""
+    return region_index.lookup(text) or geocode_cache.get(text)
+
+
+def geocode(text: str) -> Optional[Place]:
+    """로컬에서 못 찾을 때만 OWM geocoding 1회 (결과는 영구 캐시)"""
+    place = resolve_local(text)
+    if place is not None or geocode_cache.known_missing(text) or not (text or "").strip():
+        return place
+    import requests
+    try:
+        with UPSTREAM.time("owm", "geo"):
+            res = requests.get(_geo_url(clean_city_text(text)), timeout=5)
+            res.raise_for_status()
+        place = _parse_geo(res.json(), text)
+    except Exception as e:
+        print(f"⚠️ [geo] geocoding 실패 ({text}): {e}")
+        return None
+    geocode_cache.put(text, place)
+    return place
+
+
+async def ageocode(text: str) -> Optional[Place]:
+    """geocode의 비동기 버전"""
+    place = resolve_local(text)
+    if place is not None or geocode_cache.known_missing(text) or not (text or "").strip():
+        return place
+    try:
+        with UPSTREAM.time("owm", "geo"):
+            data = await http_module.get_json(_geo_url(clean_city_text(text)))
+        place = _parse_geo(data, text)
+    except Exception as e:
+        print(f"⚠️ [geo] geocoding 실패 ({text}): {e}")
+        return None
+    geocode_cache.put(text, place)
+    return place
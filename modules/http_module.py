@@ -0,0 +1,107 @@
+# -------------------------------
+# modules/http_module.py
+# NYFITCOACH_BOT - 공용 비동기 HTTP 클라이언트 (aiohttp)
+# 특징: 호스트별 keep-alive 커넥션 풀 + 호출별 타임아웃 + 동시 요청 상한
+# aiohttp는 첫 요청 때 import (서버 기동 시간 단축)
+# -------------------------------
+import asyncio
+from typing import Any, Dict, Optional
+
+from config.env import HTTP_TIMEOUT, HTTP_MAX_CONCURRENCY, HTTP_LIMIT_PER_HOST
+
+
+async def _close_on_shutdown(session):
+    """시작해 두면 이벤트 루프 종료 시(shutdown_asyncgens) finally가 그 루프에서 실행됨"""
+    try:
+        yield
+    finally:
+        await session.close()
+
+
+class AsyncHttpClient:
+    """
+    이벤트 루프마다 ClientSession 1개를 재사용 (루프가 바뀌면 새로 생성, 이전 세션은 자기 루프에서 닫힘).
+    모든 요청은 세마포어로 동시 실행 수를 제한하고, 기본/호출별 타임아웃을 적용.
+    """
+
+    def __init__(self, timeout: float = HTTP_TIMEOUT,
+                 max_concurrency: int = HTTP_MAX_CONCURRENCY,
+                 limit_per_host: int = HTTP_LIMIT_PER_HOST):
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self._session = None                # aiohttp.ClientSession
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._guard = None                  # _close_on_shutdown 제너레이터 (참조 유지용)
+
+    async def _ensure(self):
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            if self._session is not None and not self._session.closed:
+                self._discard(self._session, self._loop)
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            # 루프가 끝날 때(asyncio.run → shutdown_asyncgens) 그 루프 위에서 세션을 닫음
+            self._guard = _close_on_shutdown(self._session)
+            await self._guard.__anext__()
+        return self._session
+
+    @staticmethod
+    def _discard(session, loop) -> None:
+        """다른 루프의 세션: 그 루프가 (다른 스레드에서) 돌고 있으면 거기서 닫기.
+        이미 끝난 루프면 _close_on_shutdown이 닫았음"""
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    def _timeout(self, timeout: Optional[float]):
+        # timeout=None을 그대로 넘기면 aiohttp는 "무제한"으로 읽음 → 기본값을 항상 명시
+        import aiohttp
+        return aiohttp.ClientTimeout(total=self.timeout if timeout is None else timeout)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       timeout: Optional[float] = None) -> Any:
+        """GET → JSON (HTTP 4xx/5xx는 aiohttp.ClientResponseError)"""
+        session = await self._ensure()
+        async with self._sem:
+            async with session.get(url, params=params, timeout=self._timeout(timeout)) as res:
+                res.raise_for_status()
+                return await res.json(content_type=None)
+
+    async def post(self, url: str, data: Optional[Dict[str, Any]] = None,
+                   json: Optional[Any] = None, timeout: Optional[float] = None) -> int:
+        """POST → 상태코드"""
+        session = await self._ensure()
+        async with self._sem:
+            async with session.post(url, data=data, json=json, timeout=self._timeout(timeout)) as res:
+                await res.read()
+                return res.status
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# ===== 기본 클라이언트 =====
+http = AsyncHttpClient()
+
+async def get_json(url: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+    return await http.get_json(url, params=params, timeout=timeout)
+
+async def post(url: str, data: Optional[Dict[str, Any]] = None, json: Optional[Any] = None,
+               timeout: Optional[float] = None) -> int:
+    return await http.post(url, data=data, json=json, timeout=timeout)
+
+async def close_http() -> None:
+    """서버/봇 종료 시 커넥션 풀 정리"""
+    await http.close()
@@ -0,0 +1,81 @@
+# -------------------------------
+# modules/intent_module.py
+# NYFITCOACH_BOT - 메시지 → 의도 라우터 (텔레그램 main.py / 웹 web_app.py 공용)
+# 특징: 모든 트리거를 트라이 형태의 정규식 하나로 컴파일, 한 번 훑어서 의도 + 인자 반환
+# -------------------------------
+import re
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from modules.youtube_module import YT_CATEGORIES
+
+
+class Intent(NamedTuple):
+    name: str                  # help | home_workout | video | weather_tomorrow | weather | workout
+    arg: Optional[str] = None  # video → 카테고리
+
+
+# 여러 트리거가 한 메시지에 있으면 이 순서가 우선 (예: "요가 홈트" → home_workout)
+PRIORITY = ("help", "home_workout", "video", "weather_tomorrow", "weather", "workout")
+HELP_WORDS = {"도움말", "help"}     # 메시지 전체가 이 단어일 때만 help
+
+# 트리거 문구 → 의도 (문구 안의 공백은 "공백 0개 이상"으로 매칭: "내일날씨", "내일 날씨")
+TRIGGERS = {
+    "홈트": "home_workout",
+    "내일 날씨": "weather_tomorrow",
+    "날씨": "weather",              # "오늘 날씨", "날씨 어때?" 포함
+    "운동 하자": "workout",
+}
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """["스트레칭", "스트렝스"] → "스트(?:레칭|렝스)" — 위치마다 갈래를 한 글자씩만 비교"""
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        end = "" in node
+        alts = [(r"\s*" if ch == " " else re.escape(ch)) + build(sub)
+                for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 and not end else "(?:" + "|".join(alts) + ")"
+        return body + ("?" if end else "")
+
+    return build(trie)
+
+
+class IntentRouter:
+    def __init__(self, categories: Iterable[str] = YT_CATEGORIES):
+        self._intents: Dict[str, Intent] = {}   # 공백 뺀 소문자 문구 → Intent
+        phrases = []
+        for c in categories:
+            phrases.append(c.lower())
+            self._intents[c.lower()] = Intent("video", c)
+        for phrase, name in TRIGGERS.items():
+            phrases.append(phrase)
+            self._intents[phrase.replace(" ", "")] = Intent(name)
+        self._pattern = re.compile(_trie_regex(phrases), re.IGNORECASE)
+        self._rank = {name: i for i, name in enumerate(PRIORITY)}
+
+    def route(self, text: str) -> Optional[Intent]:
+        """가장 우선순위 높은 의도 (없으면 None)"""
+        text = text or ""
+        if text.strip().lower() in HELP_WORDS:
+            return Intent("help")
+        best, best_rank = None, len(PRIORITY)
+        for m in self._pattern.finditer(text):
+            intent = self._intents["".join(m.group().lower().split())]
+            rank = self._rank[intent.name]
+            if rank < best_rank:
+                best, best_rank = intent, rank
+                if rank == 1:               # help 다음 순위(홈트)면 더 볼 필요 없음
+                    break
+        return best
+
+
+router = IntentRouter()
+route = router.route
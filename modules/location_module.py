@@ -1,13 +1,14 @@
+import re
+
 # 사용자별 도시를 메모리에 기억 (v1: 메모리, v2: 파일 저장으로 확장 예정)
 user_city: dict[int, str] = {}
 
 CLEAN_WORDS = ["여긴", "여기는", "사는 곳은", "도시는", "도시", "이야", "야", "입니다", "에요"]
+# 단어별 replace 반복 대신 정규식 1개 (긴 단어 먼저 → "도시는"이 "도시"보다 우선)
+_CLEAN_RE = re.compile("|".join(map(re.escape, sorted(CLEAN_WORDS, key=len, reverse=True))))
 
 def clean_city_text(text: str) -> str:
-    s = text.strip()
-    for w in CLEAN_WORDS:
-        s = s.replace(w, "")
-    return s.strip()
+    return _CLEAN_RE.sub("", text.strip()).strip()
 
 def set_city(user_id: int, text: str) -> str:
     city = clean_city_text(text)
@@ -0,0 +1,183 @@
+# -------------------------------
+# modules/metrics_module.py
+# NYFITCOACH_BOT - Prometheus 지표 (히스토그램 / 카운터 / 게이지, 텍스트 포맷 0.0.4)
+# 특징: 외부 패키지 없이 구간마다 잠금 2번 + bisect 1번 → 운영에서 켜 둬도 되는 수준 (구간당 ~2µs)
+# server_app의 /metrics가 render() 결과를 그대로 반환
+# -------------------------------
+import time, asyncio, threading, functools
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# 초 단위 — 메모리 조회(µs)부터 외부 API 타임아웃(5s)까지
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+# ===== 구간 측정 (히스토그램 + 오류 카운터 + 진행 중 게이지) =====
+class _Span:
+    __slots__ = ("slot", "lock", "buckets", "start")
+
+    def __init__(self, slot: list, lock, buckets: Tuple[float, ...]):
+        self.slot = slot
+        self.lock = lock
+        self.buckets = buckets
+
+    def __enter__(self):
+        with self.lock:
+            self.slot[4] += 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        i = bisect_left(self.buckets, elapsed)
+        slot = self.slot
+        with self.lock:
+            slot[0][i] += 1
+            slot[1] += elapsed
+            slot[2] += 1
+            slot[4] -= 1
+            if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+                slot[3] += 1
+        return False
+
+
+class Timer:
+    """
+    STORE_IO = Timer("nyfit_store_io", "유저 저장소 파일 I/O", ("op",))
+    with STORE_IO.time("read"): ...        # 동기/비동기 구간 모두 (await 포함 가능)
+    @HANDLER.wrap("start")                 # 함수 전체 (코루틴 함수면 await까지)
+    → {name}_seconds (히스토그램), {name}_errors_total, {name}_in_flight
+    라벨마다 [버킷별 개수, 합, 개수, 오류, 진행 중] 한 덩어리 → 구간당 잠금 2번
+    라벨 수는 적게 (핸들러/서비스 이름 정도)
+    """
+
+    def __init__(self, name: str, doc: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: "Registry" = None):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], list] = {}     # 라벨 값 튜플 → 한 덩어리
+        self.buckets = tuple(sorted(buckets))
+        (registry or REGISTRY).register(self)
+
+    def _slot(self, labels: Tuple[str, ...]) -> list:
+        slot = self._values.get(labels)
+        if slot is None:
+            with self._lock:
+                slot = self._values.setdefault(labels, [[0] * (len(self.buckets) + 1), 0.0, 0, 0, 0])
+        return slot
+
+    def time(self, *labels: str) -> _Span:
+        return _Span(self._slot(labels), self._lock, self.buckets)
+
+    def wrap(self, *labels: str):
+        def deco(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def awrapper(*args, **kwargs):
+                    with self.time(*labels):
+                        return await fn(*args, **kwargs)
+                return awrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.time(*labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    # ----- 조회 (테스트/디버그용) -----
+    def count(self, *labels: str) -> int:
+        return self._slot(labels)[2]
+
+    def error_count(self, *labels: str) -> int:
+        return self._slot(labels)[3]
+
+    def in_flight(self, *labels: str) -> int:
+        return self._slot(labels)[4]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2], v[3], v[4])) for k, v in self._values.items())
+        n = self.name
+        hist = [f"# HELP {n}_seconds {self.doc} (초)", f"# TYPE {n}_seconds histogram"]
+        errors = [f"# HELP {n}_errors_total {self.doc} 중 예외 수", f"# TYPE {n}_errors_total counter"]
+        in_flight = [f"# HELP {n}_in_flight {self.doc} 진행 중인 수", f"# TYPE {n}_in_flight gauge"]
+        for k, (counts, total, count, err, active) in items:
+            labels = _labels(self.labelnames, k)
+            acc = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                le = 'le="' + _num(bound) + '"'
+                hist.append(f"{n}_seconds_bucket{_labels(self.labelnames, k, le)} {acc}")
+            hist += [f"{n}_seconds_sum{labels} {_num(total)}", f"{n}_seconds_count{labels} {count}"]
+            errors.append(f"{n}_errors_total{labels} {err}")
+            in_flight.append(f"{n}_in_flight{labels} {active}")
+        return hist + errors + in_flight
+
+
+# ===== 레지스트리 =====
+class Registry:
+    def __init__(self):
+        self._metrics: List[Timer] = []
+        self._collectors: List[Callable[[], Dict[str, Tuple[str, str, float]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, *metrics: Timer) -> None:
+        with self._lock:
+            names = {m.name for m in self._metrics}
+            for m in metrics:
+                if m.name in names:
+                    raise ValueError(f"이미 등록된 지표: {m.name}")
+                self._metrics.append(m)
+                names.add(m.name)
+
+    def collector(self, fn: Callable[[], Dict[str, Tuple[str, str, float]]]) -> None:
+        """scrape 때마다 부르는 값 {이름: (종류, 설명, 값)} — 유저 수처럼 이미 다른 곳에 있는 값용"""
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines = []
+        for m in list(self._metrics):
+            lines.extend(m.render())
+        for fn in list(self._collectors):
+            try:
+                values = fn()
+            except Exception as e:
+                print(f"⚠️ [metrics_module] 수집 실패 ({getattr(fn, '__name__', fn)}): {e}")
+                continue
+            for name, (kind, doc, value) in values.items():
+                lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}", f"{name} {_num(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ===== 공용 지표 =====
+HANDLER = Timer("nyfit_handler", "텔레그램 핸들러 처리", ("handler",))
+STORE_IO = Timer("nyfit_store_io", "users.json 읽기/쓰기", ("op",))
+UPSTREAM = Timer("nyfit_upstream", "외부 API 호출", ("service", "endpoint"))
+OUTFIT_CARD = Timer("nyfit_outfit_card", "복장 카드 생성", ("stage",))
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,162 @@
+# -------------------------------
+# modules/scheduler_module.py
+# NYFITCOACH_BOT - 알림 스케줄러 (분 단위 타이밍 휠)
+# 특징: (요일, 분) → 유저 인덱스를 변경 시점에만 갱신, 매 분 해당 슬롯만 꺼내 발송
+# -------------------------------
+import asyncio, threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from config.env import TIMEZONE
+from modules import user_module
+from modules.user_module import WEEKDAYS
+
+Job = Tuple[str, str]  # (uid, 알림 종류)
+NOTIFY_TYPES = ("weather_only", "combo", "workout_only")
+
+
+def _minute_of_day(hhmm: str) -> Optional[int]:
+    if not user_module.is_valid_time_24h(hhmm or ""):
+        return None
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+class NotificationScheduler:
+    """
+    타이밍 휠 두 개:
+      _daily[분]          — 매일 나가는 알림 (weather_only, workout_only)
+      _weekly[(요일, 분)] — 요일 지정 알림 (combo.days)
+    _slots[uid]에 유저가 들어간 슬롯을 기억해 두고, 알림 설정이 바뀌면 그 유저만 다시 색인.
+    매 분 due()는 슬롯 2개만 보므로 전체 유저 스캔이 없음 (06:30에 수천 명이어도 set 1개).
+    """
+
+    def __init__(self, tz: str = TIMEZONE):
+        self.tz = ZoneInfo(tz)
+        self._daily: Dict[int, Set[Job]] = defaultdict(set)
+        self._weekly: Dict[Tuple[int, int], Set[Job]] = defaultdict(set)
+        self._slots: Dict[str, List[Tuple[Any, Job]]] = {}
+        self._lock = threading.Lock()
+        self._last_minute: Optional[datetime] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.dispatched = 0
+
+    # ----- 색인 -----
+    def index_user(self, uid: str, user: Dict[str, Any]) -> None:
+        """유저 1명의 알림 설정을 다시 색인 (이전 슬롯 제거 후 추가)"""
+        with self._lock:
+            self._unindex(uid)
+            notifs = user.get("notifications") or {}
+            if notifs.get("none"):
+                return
+            slots = []
+            for ntype in NOTIFY_TYPES:
+                n = notifs.get(ntype) or {}
+                minute = _minute_of_day(n.get("time"))
+                if not n.get("enabled") or minute is None:
+                    continue
+                job = (uid, ntype)
+                if "days" in n:
+                    for wd in n["days"] or []:
+                        if wd in WEEKDAYS:
+                            key = (WEEKDAYS.index(wd), minute)
+                            self._weekly[key].add(job)
+                            slots.append((key, job))
+                else:
+                    self._daily[minute].add(job)
+                    slots.append((minute, job))
+            if slots:
+                self._slots[uid] = slots
+
+    def _unindex(self, uid: str) -> None:
+        for key, job in self._slots.pop(uid, []):
+            table = self._weekly if isinstance(key, tuple) else self._daily
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(job)
+                if not bucket:
+                    del table[key]
+
+    def remove_user(self, uid: str) -> None:
+        with self._lock:
+            self._unindex(uid)
+
+    def load(self, users: Optional[Dict[str, Any]] = None) -> int:
+        """전체 색인 (시작 시 1회). 색인된 유저 수 반환."""
+        users = user_module.load_data() if users is None else users
+        for uid, u in users.items():
+            self.index_user(uid, u)
+        return len(self._slots)
+
+    def _on_change(self, uid: str, user: Dict[str, Any], parts) -> None:
+        if parts is None or any(p.startswith("notifications") for p in parts):
+            self.index_user(uid, user)
+
+    def attach(self) -> None:
+        """user_module 변경 알림 구독 → update_notification/toggle_notifications 즉시 반영"""
+        user_module.on_user_change(self._on_change)
+
+    def detach(self) -> None:
+        user_module.remove_user_listener(self._on_change)
+
+    # ----- 조회 -----
+    def due(self, when: datetime) -> List[Job]:
+        """when(현지 시각)의 분에 나가야 할 알림"""
+        minute = when.hour * 60 + when.minute
+        with self._lock:
+            jobs = set(self._daily.get(minute, ()))
+            jobs |= self._weekly.get((when.weekday(), minute), set())
+        return sorted(jobs)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "users": len(self._slots),
+                "daily_slots": len(self._daily),
+                "weekly_slots": len(self._weekly),
+                "dispatched": self.dispatched,
+            }
+
+    # ----- 실행 -----
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def pending_minutes(self, now: datetime) -> List[datetime]:
+        """마지막 처리 이후 지나간 분 목록 (루프가 밀려도 건너뛰지 않음, 최대 10분)"""
+        current = now.replace(second=0, microsecond=0)
+        if self._last_minute is None or current <= self._last_minute:
+            minutes = [current] if self._last_minute is None else []
+        else:
+            start = max(self._last_minute + timedelta(minutes=1), current - timedelta(minutes=9))
+            minutes = []
+            while start <= current:
+                minutes.append(start)
+                start += timedelta(minutes=1)
+        if minutes:
+            self._last_minute = minutes[-1]
+        return minutes
+
+    async def tick(self, dispatch: Callable[[List[Job], datetime], Awaitable[Any]],
+                   now: Optional[datetime] = None) -> int:
+        sent = 0
+        for minute in self.pending_minutes(now or self.now()):
+            jobs = self.due(minute)
+            if jobs:
+                sent += len(jobs)
+                self.dispatched += len(jobs)
+                task = asyncio.create_task(dispatch(jobs, minute))   # 발송이 다음 tick을 막지 않게
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        return sent
+
+    async def run(self, dispatch: Callable[[List[Job], datetime], Awaitable[Any]]) -> None:
+        """매 분 정각 직후 깨어나 해당 슬롯만 발송"""
+        while True:
+            try:
+                await self.tick(dispatch)
+            except Exception as e:
+                print(f"⚠️ [scheduler] 알림 처리 실패: {e}")
+            now = self.now()
+            await asyncio.sleep(60 - now.second - now.microsecond / 1e6 + 0.05)
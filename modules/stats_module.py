@@ -0,0 +1,107 @@
+# -------------------------------
+# modules/stats_module.py
+# NYFITCOACH_BOT - 서버 상태용 유저 통계 (메모리 상주, 변경 시점에만 갱신)
+# 특징: /, /info, /status, /health가 파일을 읽지 않고 O(1)로 응답
+# -------------------------------
+import json, threading
+from collections import deque
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from modules import user_module
+
+
+def _active_on(user: Dict[str, Any], day: str) -> bool:
+    last = user.get("last_activity")
+    return isinstance(last, dict) and last.get("date") == day
+
+
+class UserStats:
+    """
+    등록 유저 수 / 오늘 활동 유저 수 / 최근 가입자(링 버퍼)를 메모리에 유지.
+    - load(): 시작 시 1회 전체 집계
+    - attach(): user_module 쓰기 경로(on_user_change)로 새 유저·활동을 바로 반영
+    - refresh_if_modified(): 다른 프로세스가 users.json을 고쳤을 때만 (파일 버전 변경) 다시 집계
+      이 프로세스 저장소가 쓴 버전이면 건너뜀 (attach()로 이미 반영됨)
+    유저 삭제 기능은 없으므로 집계는 합집합으로만 늘어남 (늦게 읽은 파일이 값을 되돌리지 않음).
+    """
+
+    def __init__(self, recent_size: int = 10):
+        self._lock = threading.Lock()
+        self._uids = set()
+        self._recent = deque(maxlen=recent_size)
+        self._day = date.today().isoformat()
+        self._active = set()
+        self._sig = None            # 마지막으로 본 users.json 버전 (user_module.file_signature)
+
+    # ----- 갱신 -----
+    def _add(self, uid: str, user: Dict[str, Any]) -> None:
+        """잠금 안에서 호출"""
+        if uid not in self._uids:
+            self._uids.add(uid)
+            self._recent.append(uid)
+        if _active_on(user, self._day):
+            self._active.add(uid)
+
+    def _roll_day(self) -> None:
+        today = date.today().isoformat()
+        if today != self._day:
+            self._day = today
+            self._active = set()
+
+    def load(self, users: Optional[Dict[str, Any]] = None) -> int:
+        users = user_module.load_index() if users is None else users
+        with self._lock:
+            self._roll_day()
+            for uid, u in users.items():
+                self._add(uid, u)
+        return len(self._uids)
+
+    def _on_change(self, uid: str, user: Dict[str, Any], parts) -> None:
+        with self._lock:
+            self._roll_day()
+            self._add(uid, user)
+
+    def attach(self) -> None:
+        user_module.on_user_change(self._on_change)
+
+    def detach(self) -> None:
+        user_module.remove_user_listener(self._on_change)
+
+    def refresh_if_modified(self, path: str = user_module.USERS_DB, own_sig=None) -> bool:
+        """파일이 바뀌었을 때만 다시 읽어 합침. 읽었으면 True.
+        own_sig: 이 프로세스 저장소가 마지막으로 쓴(또는 병합한) 버전 — 같으면 쓰기 경로에서 이미 반영됨"""
+        sig = user_module.file_signature(path)
+        if sig is None or sig == self._sig:
+            return False
+        if sig == own_sig:
+            self._sig = sig
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ [stats] {path} 읽기 실패: {e}")
+            return False
+        self._sig = sig
+        if isinstance(data, dict):
+            self.load(data)
+        return True
+
+    # ----- 조회 (파일 I/O 없음) -----
+    @property
+    def registered(self) -> int:
+        return len(self._uids)
+
+    @property
+    def today_active(self) -> int:
+        with self._lock:
+            self._roll_day()
+            return len(self._active)
+
+    def recent(self, n: int = 3) -> List[str]:
+        with self._lock:
+            return list(self._recent)[-n:] if n > 0 else []
+
+
+user_stats = UserStats()
@@ -0,0 +1,93 @@
+# -------------------------------
+# modules/update_processor.py
+# NYFITCOACH_BOT - 텔레그램 업데이트 동시 처리 (채팅별 순서 보장 + 유저별 잠금)
+# 특징: 다른 채팅은 최대 max_running개까지 동시에, 같은 채팅은 도착 순서대로 1개씩
+#       같은 유저의 업데이트는 채팅이 달라도 한 번에 하나 (user_module.user_lock)
+# -------------------------------
+import asyncio
+from typing import Any, Awaitable, Dict, List, Optional
+
+from telegram.ext import BaseUpdateProcessor
+
+from modules.user_module import user_lock
+
+# PTB 기본 세마포어는 채팅 순서를 기다리는 업데이트까지 자리를 차지함
+# → 한 유저가 메시지를 몰아 보내면 다른 유저가 막힘. 그래서 기본 세마포어는 사실상 무제한으로 두고
+#   채팅 잠금을 잡은 뒤에 실제 실행 수를 제한
+_UNBOUNDED = 2 ** 30
+
+
+def chat_key(update: object) -> Optional[int]:
+    """같은 순서로 처리해야 하는 단위 (채팅 → 유저 → 없음)"""
+    chat = getattr(update, "effective_chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(update, "effective_user", None)
+    return user.id if user is not None else None
+
+
+class ChatOrderedProcessor(BaseUpdateProcessor):
+    """
+    ApplicationBuilder().concurrent_updates(ChatOrderedProcessor(32))
+    - 채팅마다 asyncio.Lock (대기자 FIFO) → 같은 채팅의 업데이트는 도착 순서대로
+    - 그다음 보낸 유저의 user_lock → 유저 레코드 읽기 → await → 쓰기가 같은 유저의 다른 채팅 업데이트와 섞이지 않음
+    - 잠금을 잡은 업데이트만 running 세마포어 경쟁 → 동시에 도는 핸들러 ≤ max_running
+    - 대기자가 없어진 채팅의 잠금은 바로 삭제 (채팅 수만큼 쌓이지 않음)
+    """
+
+    __slots__ = ("max_running", "_running", "_chats", "in_flight", "peak")
+
+    def __init__(self, max_running: int = 32):
+        if max_running < 1:
+            raise ValueError("max_running은 1 이상이어야 함")
+        super().__init__(_UNBOUNDED)
+        self.max_running = max_running
+        self._running: Optional[asyncio.Semaphore] = None
+        self._chats: Dict[Any, List] = {}       # chat_id → [Lock, 대기+실행 중인 업데이트 수]
+        self.in_flight = 0                      # 지금 핸들러가 도는 업데이트 수
+        self.peak = 0
+
+    async def initialize(self) -> None:
+        self._running = asyncio.Semaphore(self.max_running)   # 실행 중인 루프에 묶음
+
+    async def shutdown(self) -> None:
+        self._chats.clear()
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        if self._running is None:
+            await self.initialize()
+        key = chat_key(update)
+        if key is None:
+            return await self._run_as_user(update, coroutine)
+        slot = self._chats.get(key)
+        if slot is None:
+            slot = self._chats[key] = [asyncio.Lock(), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                await self._run_as_user(update, coroutine)
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._chats[key]
+
+    async def _run_as_user(self, update: object, coroutine: Awaitable[Any]) -> None:
+        # 잠금 순서: 채팅 → 유저 → 실행 슬롯 (대기 중에는 실행 슬롯을 차지하지 않음)
+        user = getattr(update, "effective_user", None)
+        if user is None:
+            return await self._run(coroutine)
+        async with user_lock(user.id):
+            await self._run(coroutine)
+
+    async def _run(self, coroutine: Awaitable[Any]) -> None:
+        async with self._running:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            try:
+                await coroutine
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {"max_running": self.max_running, "in_flight": self.in_flight,
+                "peak": self.peak, "chats_waiting": len(self._chats)}
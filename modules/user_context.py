@@ -0,0 +1,122 @@
+# -------------------------------
+# modules/user_context.py
+# NYFITCOACH_BOT - 업데이트 1건 동안 쓰는 유저 스냅샷
+# 특징: 핸들러 시작 시 1번 로드, 값 변경은 모아 두었다가 핸들러가 끝나면 1번 저장
+# -------------------------------
+from typing import Any, Dict, List, Optional
+
+from modules import user_module
+from modules.user_module import part_of
+
+CONTEXT_KEY = "user_ctx"   # context.user_data 안의 키: (CONTEXT_KEY, update_id)
+
+
+class UserContext:
+    """
+    ctx = UserContext(user_id)       # get_user 1회 (없으면 생성)
+    ctx.location / ctx.tone ...      # 메모리 조회, 저장소 왕복 없음
+    ctx.set("tone", "coach")         # 바로 저장하지 않고 모아둠
+    ctx.commit()                     # 모은 변경을 잠금 1번 + 저장 1번으로 반영
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.uid = str(user_id)
+        self._user = user_module.get_user(user_id)
+        self._changes: Dict[str, Any] = {}
+
+    # ----- 조회 -----
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._changes:
+            return self._changes[key]
+        value = self._user.get(key)
+        return default if value is None else value
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.get("name")
+
+    @property
+    def age(self) -> Optional[int]:
+        return self.get("age")
+
+    @property
+    def location(self) -> str:
+        return self.get("location", "서울")
+
+    @property
+    def tone(self) -> str:
+        tone = self.get("tone", "friendly")
+        return tone if tone in user_module.TONE_CHOICES else "friendly"
+
+    @property
+    def temp_limit(self) -> int:
+        return int(self.get("temp_limit", 5))
+
+    @property
+    def favorites(self) -> List[str]:
+        return list(self.get("favorites", []))
+
+    @property
+    def notifications(self) -> Dict[str, Any]:
+        return self.get("notifications", {})
+
+    def routine(self, weekday: str) -> List[Dict[str, Any]]:
+        return list(self.get("routine", {}).get(user_module.normalize_weekday(weekday), []))
+
+    # ----- 변경 (commit 때 반영) -----
+    def set(self, key: str, value: Any) -> None:
+        self._changes[key] = value
+
+    def update(self, **kwargs) -> None:
+        self._changes.update(kwargs)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._changes)
+
+    def commit(self) -> bool:
+        """모은 변경을 한 번에 저장. 저장했으면 True."""
+        if not self._changes:
+            return False
+        changes, self._changes = self._changes, {}
+        # 로드 이후 다른 곳에서 바뀐 값 위에 이번 변경만 덮어씀 (키 단위 last-writer-wins)
+        self._user = user_module.mutate_user(self.user_id, lambda u: u.update(changes),
+                                             {part_of(k) for k in changes})
+        return True
+
+
+# ===== python-telegram-bot 연결 =====
+# user_data는 유저 단위라 같은 유저의 업데이트(개인 채팅 + 그룹)가 동시에 돌 수 있음 → update_id별로 보관
+def _key(update):
+    return CONTEXT_KEY, update.update_id
+
+
+def user_ctx(update, context) -> UserContext:
+    """핸들러 안에서 현재 업데이트의 UserContext (install_user_context(app) 필요)"""
+    ctx = context.user_data.get(_key(update)) if context.user_data is not None else None
+    if ctx is None:
+        raise LookupError("UserContext가 없음 — install_user_context(app)를 먼저 호출")
+    return ctx
+
+
+async def _open_context(update, context) -> None:
+    if update.effective_user is not None and context.user_data is not None:
+        context.user_data[_key(update)] = UserContext(update.effective_user.id)
+
+
+async def _commit_context(update, context) -> None:
+    ctx = context.user_data.pop(_key(update), None) if context.user_data is not None else None
+    if ctx is not None:
+        ctx.commit()
+
+
+def install_user_context(app) -> None:
+    """
+    그룹 -1: 업데이트마다 UserContext 생성 (일반 핸들러(그룹 0)보다 먼저)
+    그룹  1: 핸들러가 끝난 뒤 모은 변경 commit
+    """
+    from telegram import Update
+    from telegram.ext import TypeHandler
+    app.add_handler(TypeHandler(Update, _open_context), group=-1)
+    app.add_handler(TypeHandler(Update, _commit_context), group=1)
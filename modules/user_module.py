@@ -1,34 +1,307 @@
 # modules/user_module.py
 # NYFITCOACH_BOT 2025 - USER MODULE (Full Upgrade Ver.)
 # 기능: 사용자 정보 / 루틴 / 알림 / 즐겨찾기 / 히스토리 관리
-# 특징: 자동갱신 + 데이터보존 + 안전저장
-import os, json, re
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+# 특징: 자동갱신 + 데이터보존 + 안전저장 + 메모리 상주(write-behind)
+#       모든 변경은 mutate_user() 한 곳 (프로세스 안: 저장소 잠금, 프로세스 간: 파일 잠금 + 충돌 시 재적용)
+import os, json, re, atexit, asyncio, threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, date as _date, timedelta
+from typing import Callable, Dict, Any, Iterator, List, Optional, Set
+
+from modules.activity_log import ActivityLog
+from modules.metrics_module import STORE_IO
+from config.env import USER_BACKEND, USERS_SQLITE_PATH, USERS_SHARD_DIR, USER_FLUSH_INTERVAL, USER_FLUSH_THRESHOLD
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:             # Windows
+    fcntl = None
+    import msvcrt
 
 # ===== 경로 설정 =====
 DATA_DIR = "data"
 USERS_DB = os.path.join(DATA_DIR, "users.json")
-os.makedirs(DATA_DIR, exist_ok=True)
 
 # ===== 내부 기본 함수 =====
-def _read_db() -> Dict[str, Any]:
+def _read_db(path: str = USERS_DB) -> Dict[str, Any]:
     """DB 로드 (없으면 자동 생성)."""
-    if not os.path.exists(USERS_DB):
-        with open(USERS_DB, "w", encoding="utf-8") as f:
-            json.dump({}, f, ensure_ascii=False, indent=2)
-    try:
-        with open(USERS_DB, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {}
+    with STORE_IO.time("read"):
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({}, f, ensure_ascii=False, indent=2)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return {}
 
-def _write_db(db: Dict[str, Any]) -> None:
+def _write_db(db: Dict[str, Any], path: str = USERS_DB) -> None:
     """안전하게 DB 저장 (임시파일 후 교체)."""
-    tmp = USERS_DB + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(db, f, ensure_ascii=False, indent=2)
-    os.replace(tmp, USERS_DB)
+    with STORE_IO.time("write"):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(db, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+def _encode_record(uid: str, record: Dict[str, Any]) -> str:
+    """유저 1명 → users.json 안의 한 항목 (json.dump(db, indent=2)와 같은 모양)"""
+    body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+    return f"  {json.dumps(uid, ensure_ascii=False)}: {body}"
+
+def _write_encoded(entries: List[str], path: str = USERS_DB) -> None:
+    """_encode_record 항목들을 이어 붙여 저장 (임시파일 후 교체)."""
+    with STORE_IO.time("write"):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            if entries:
+                f.write("{\n")
+                f.write(",\n".join(entries))
+                f.write("\n}")
+            else:
+                f.write("{}")
+        os.replace(tmp, path)
+
+def file_signature(path: str):
+    """파일 버전 비교용 (os.replace로 바뀌면 inode/mtime이 달라짐). 없으면 None."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+@contextmanager
+def _file_lock(path: str):
+    """프로세스 간 advisory 잠금 (봇/서버와 web_app이 같은 users.json을 쓸 때)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+# ===== 메모리 상주 저장소 =====
+class UserStore:
+    """
+    users.json을 한 번만 읽어 메모리에 두고, 변경된 유저만 dirty로 표시.
+    - 읽기: 메모리 조회 (파일 I/O 없음)
+    - 쓰기: dirty 표시 후 flush_interval 초마다 또는 dirty가 flush_threshold명 이상이면
+      백그라운드 스레드가 파일로 내려씀
+    - 종료 시 flush()/close() 호출 (FastAPI shutdown, 봇 종료, atexit)
+    - flush는 잠금 안에서 dirty 유저만 직렬화(_encoded 갱신)하고, 파일 쓰기는 잠금 밖에서
+      → 쓰는 동안에도 mutate_user가 막히지 않음 (대신 파일 크기만큼 문자열을 메모리에 보관)
+    - 운동 기록은 레코드 밖 ActivityLog(data/history/*.jsonl)에 append
+    - 다른 프로세스와 공유: flush는 users.json.lock 파일 잠금 안에서,
+      마지막으로 읽은/쓴 뒤 파일이 바뀌었으면 다시 읽고 dirty 유저는 디스크 값에
+      이번 flush 전까지의 변경 함수(mutation)를 순서대로 재적용 (버전 비교 + 재시도 대신 재적용)
+    """
+
+    def __init__(self, path: str = USERS_DB,
+                 flush_interval: float = USER_FLUSH_INTERVAL,
+                 flush_threshold: int = USER_FLUSH_THRESHOLD):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_threshold = max(1, flush_threshold)
+        self.lock = threading.RLock()       # 메모리 DB 보호 (봇 루프 + flush 스레드)
+        self._io_lock = threading.RLock()   # 파일 쓰기 직렬화 — 잡는 순서는 항상 _io_lock → lock
+        self._lock_path = path + ".lock"
+        self.history = ActivityLog(os.path.join(os.path.dirname(path) or ".", "history"))
+        with _file_lock(self._lock_path):
+            self._db: Dict[str, Any] = _read_db(path)
+            self._disk_sig = file_signature(path)
+        # uid → 직렬화해 둔 항목 (레코드는 제자리에서 바뀌므로 잠금 밖에서 dump하지 않음)
+        self._encoded: Dict[str, str] = {uid: _encode_record(uid, u) for uid, u in self._db.items()}
+        # uid → 마지막 flush 이후 적용한 변경 함수들 (None = 재적용 불가, 메모리 값 그대로 저장)
+        self._pending: Dict[str, Optional[List[Callable]]] = {}
+        self.merge_count = 0
+        # 스키마 마이그레이션은 DB를 열 때 한 번만 (이후 읽기는 순수 조회)
+        self._dirty: Set[str] = {
+            uid for uid, u in self._db.items()
+            if _upgrade_record(u, uid, lambda rec, uid=uid: self.history.append(uid, rec))
+        }
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self.flush_count = 0
+        self._thread = None
+        if flush_interval > 0:
+            self._thread = threading.Thread(target=self._flush_loop, name="user-store-flush", daemon=True)
+            self._thread.start()
+
+    # ----- 조회 -----
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        return self._db.get(uid)
+
+    def all(self) -> Dict[str, Any]:
+        return self._db
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    # ----- 변경 -----
+    def transaction(self, uid: Optional[str] = None):
+        """get → 수정 → put 구간 (메모리 DB라 잠금만 잡으면 됨, 프로세스 간 충돌은 flush에서 해결)
+        write-through(flush_interval 0)면 put 안에서 flush하므로 _io_lock부터 잡음 (flush와 같은 순서)"""
+        return self._write_through() if self.flush_interval <= 0 else self.lock
+
+    @contextmanager
+    def _write_through(self):
+        with self._io_lock, self.lock:
+            yield
+
+    def put(self, uid: str, record: Dict[str, Any], parts=None, mutation: Optional[Callable] = None) -> None:
+        """parts(바뀐 섹션 힌트)는 SQLite 저장소용 — JSON은 통째로 저장하므로 무시
+        mutation: 같은 변경을 다른 레코드에 다시 적용하는 함수 (flush 때 충돌하면 사용)"""
+        with self.lock:
+            self._db[uid] = record
+            if mutation is None:
+                self._pending[uid] = None
+            elif uid not in self._pending:
+                self._pending[uid] = [mutation]
+            elif self._pending[uid] is not None:
+                self._pending[uid].append(mutation)
+        self.mark_dirty(uid)                # flush는 lock을 놓은 뒤 (트랜잭션 안이면 _io_lock을 이미 잡고 있음)
+
+    def mark_dirty(self, uid: str) -> None:
+        with self.lock:
+            self._dirty.add(uid)
+            pending = len(self._dirty)
+        if self.flush_interval <= 0:
+            self.flush()                    # interval 0 → 즉시 저장 (write-through)
+        elif pending >= self.flush_threshold:
+            self._wake.set()                # 임계치 도달 → flush 스레드 깨우기
+
+    # ----- 운동 기록 -----
+    def append_history(self, uid: str, rec: Dict[str, Any]) -> None:
+        self.history.append(uid, rec)
+
+    def read_history(self, uid: str, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for rec in self.history.read(uid, since):
+            yield {k: v for k, v in rec.items() if k != "uid"}
+
+    def compact_history(self, before: str) -> None:
+        """before('YYYY-MM-DD') 이전 기록을 일별 집계로 (SQLite와 같은 날 단위)"""
+        self.history.compact(before)
+
+    # ----- 저장 -----
+    def flush(self) -> bool:
+        """dirty 유저가 있으면 파일로 저장. 저장했으면 True.
+        다른 프로세스가 그 사이 파일을 바꿨으면 먼저 병합 (dirty가 없어도 메모리 갱신)."""
+        with self._io_lock:
+            self.history.flush()            # 집계보다 원본 로그 먼저
+            with _file_lock(self._lock_path):
+                with self.lock:
+                    refreshed = []
+                    if file_signature(self.path) != self._disk_sig:
+                        refreshed = self._merge(_read_db(self.path))
+                    wrote = bool(self._dirty)
+                    if wrote:
+                        for uid in self._dirty:
+                            self._encoded[uid] = _encode_record(uid, self._db[uid])
+                        self._dirty.clear()
+                        self._pending.clear()
+                        entries = list(self._encoded.values())
+                if wrote:                   # 전체 파일 쓰기는 잠금 밖 (쓰기끼리는 _io_lock으로 직렬화)
+                    _write_encoded(entries, self.path)
+                self._disk_sig = file_signature(self.path)
+        for uid in refreshed:               # 다른 프로세스가 바꾼 유저 → 스케줄러/통계에 알림
+            _notify(uid, self._db[uid], None)
+        if wrote:
+            self.flush_count += 1
+        return wrote
+
+    def _merge(self, disk: Dict[str, Any]) -> List[str]:
+        """디스크 값 기준으로 메모리 DB 갱신. dirty 유저는 대기 중인 변경 재적용. 바뀐 uid 반환"""
+        self.merge_count += 1
+        changed = []
+        for uid, rec in disk.items():
+            _upgrade_record(rec, uid)
+            if uid in self._dirty:
+                ops = self._pending.get(uid)
+                if ops is None:             # 재적용 불가(통째 교체) → 메모리 값 유지
+                    continue
+                for op in ops:
+                    op(rec)
+            elif rec == self._db.get(uid):
+                continue
+            else:
+                changed.append(uid)
+                self._encoded[uid] = _encode_record(uid, rec)
+            self._db[uid] = rec
+        return changed
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ [user_module] 유저 DB 저장 실패: {e}")
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_STORE = None  # UserStore | SqliteUserStore
+_STORE_LOCK = threading.Lock()
+
+def _open(backend: str, path: Optional[str], **kwargs):
+    if backend == "sqlite":
+        from modules.user_sqlite import SqliteUserStore
+        return SqliteUserStore(path or USERS_SQLITE_PATH)
+    if backend == "sharded":
+        from modules.user_shards import ShardedUserStore
+        return ShardedUserStore(path or USERS_SHARD_DIR)
+    return UserStore(path or USERS_DB, **kwargs)
+
+def _store():
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = _open(USER_BACKEND, None)
+    return _STORE
+
+def open_store(path: Optional[str] = None, backend: str = USER_BACKEND, **kwargs):
+    """저장소 (재)오픈. 기존 저장소는 flush 후 닫음. backend: "json" | "sqlite" | "sharded" """
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+        _STORE = _open(backend, path, **kwargs)
+    return _STORE
+
+def store_disk_sig():
+    """JSON 저장소가 마지막으로 쓰거나 병합한 users.json 버전 (다른 백엔드/미오픈이면 None)"""
+    return getattr(_STORE, "_disk_sig", None)
+
+def flush_users() -> bool:
+    """대기 중인 변경사항 즉시 저장 (서버/봇 종료 시 호출)."""
+    return _STORE.flush() if _STORE is not None else False
+
+def close_store() -> None:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+            _STORE = None
+
+atexit.register(close_store)
 
 # ===== 기본 데이터 구조 =====
 WEEKDAYS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
@@ -52,11 +325,12 @@ def _default_user(user_id: int) -> Dict[str, Any]:
         },
         "routine": {wd: [] for wd in WEEKDAYS},
         "last_activity": None,
-        "history": [],
         "usage_stats": {},
+        "activity": {"days": {}, "count_7d": 0, "count_30d": 0, "streak": 0},
+        "schema_version": SCHEMA_VERSION,
     }
 
-# ===== 자동 갱신 엔진 =====
+# ===== 스키마 마이그레이션 =====
 def _auto_update_structure(u: Dict[str, Any], user_id: int) -> Dict[str, Any]:
     """누락된 필드 자동 추가 (기존 데이터 손상 없이 갱신)."""
     base = _default_user(user_id)
@@ -70,34 +344,141 @@ def _auto_update_structure(u: Dict[str, Any], user_id: int) -> Dict[str, Any]:
                     u[key][subkey] = subval
     return u
 
+def _migrate_v1(u: Dict[str, Any], user_id: Any, append_history) -> None:
+    """v1: _default_user 구조로 누락 필드 채우기"""
+    _auto_update_structure(u, user_id)
+
+def _migrate_v2(u: Dict[str, Any], user_id: Any, append_history) -> None:
+    """v2: 레코드 안 history 리스트 → 기록 로그로 이동, 롤링 집계만 남김"""
+    history = u.pop("history", None) or []
+    u["activity"] = {"days": {}, "count_7d": 0, "count_30d": 0, "streak": 0}
+    for rec in sorted(history, key=lambda r: r.get("date") or ""):
+        if append_history:
+            append_history(rec)
+        _roll_activity(u["activity"], rec["date"])
+
+# (버전, 변환함수) — 새 스키마 변경은 여기에 순서대로 추가
+_MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+]
+SCHEMA_VERSION = _MIGRATIONS[-1][0]
+
+def _upgrade_record(u: Dict[str, Any], uid: str, append_history=None) -> bool:
+    """레코드를 최신 스키마로 올림. 변경되었으면 True.
+    append_history: 레코드에서 빠져나가는 기록을 받을 콜백 (v2)"""
+    version = u.get("schema_version", 0)
+    if version >= SCHEMA_VERSION:
+        return False
+    user_id = int(uid) if uid.isdigit() else uid
+    for target, migrate in _MIGRATIONS:
+        if version < target:
+            migrate(u, user_id, append_history)
+    u["schema_version"] = SCHEMA_VERSION
+    return True
+
+# ===== 변경 알림 =====
+# 스케줄러/통계처럼 유저 변경을 따라가야 하는 쪽이 등록: cb(uid, user, parts)
+# parts: 바뀐 섹션 (None = 새 유저 또는 전체 저장)
+_listeners: List[Any] = []
+
+def on_user_change(callback) -> None:
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+def remove_user_listener(callback) -> None:
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+def _notify(uid: str, u: Dict[str, Any], parts=None) -> None:
+    for cb in list(_listeners):
+        try:
+            cb(uid, u, parts)
+        except Exception as e:
+            print(f"⚠️ [user_module] 변경 알림 실패: {e}")
+
+def _save(store, uid: str, u: Dict[str, Any], parts=None, mutation: Optional[Callable] = None) -> None:
+    store.put(uid, u, parts=parts, mutation=mutation)
+    _notify(uid, u, parts)
+
+# ===== 변경 API =====
+def mutate_user(user_id: int, fn: Callable[[Dict[str, Any]], Any], parts=None) -> Dict[str, Any]:
+    """
+    원자적 read-modify-write. fn(u)는 레코드를 직접 고치는 함수 (반환값 무시).
+    - 프로세스 안: 저장소 트랜잭션(JSON: 잠금, SQLite: BEGIN IMMEDIATE) 안에서 읽고 고치고 저장
+    - 프로세스 간(JSON): flush 때 다른 프로세스 변경과 충돌하면 fn을 디스크 값에 다시 적용
+      → fn은 u만 보고 결정적으로 동작해야 함 (시각·입력값은 바깥에서 계산해 클로저로)
+    parts: 바뀐 섹션 힌트 (SQLite 부분 갱신용). 새 유저면 전체 저장.
+    비동기 핸들러: await 전에 읽은 값으로 계산해 쓰지 말고, 계산을 fn 안에 넣을 것
+      (fn은 await 없이 한 번에 실행 → 같은 유저의 다른 코루틴/스레드와 섞이지 않음)
+    """
+    store = _store()
+    uid = str(user_id)
+    with store.transaction(uid):
+        u = store.get(uid)
+        created = u is None
+        if created:
+            u = _default_user(user_id)
+        fn(u)
+        _save(store, uid, u, None if created else parts, mutation=fn)
+    return u
+
+# ===== 유저별 비동기 잠금 =====
+# 텔레그램 업데이트 1건 = 읽기(UserContext, 그룹 -1) → await(외부 API) → 쓰기(commit, 그룹 1)
+# 같은 유저가 여러 채팅(개인 + 그룹)에서 보낸 업데이트는 이 잠금으로 한 번에 하나씩, 다른 유저끼리는 동시에
+# (ChatOrderedProcessor가 업데이트 전체를 감쌈 — 핸들러 안에서 다시 잡으면 안 됨)
+_user_locks: Dict[str, list] = {}   # uid → [asyncio.Lock, 사용 중인 수] (다 쓰면 삭제)
+
+@asynccontextmanager
+async def user_lock(user_id):
+    """유저별 asyncio 잠금 (같은 이벤트 루프 안의 코루틴끼리, 도착 순서대로)"""
+    uid = str(user_id)
+    slot = _user_locks.get(uid)
+    if slot is None:
+        slot = _user_locks[uid] = [asyncio.Lock(), 0]
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0:
+            del _user_locks[uid]
+
 # ===== 메인 CRUD =====
+_SECTIONS = {"notifications", "routine", "favorites", "usage_stats"}
+
+def part_of(key: str) -> str:
+    """필드명 → 저장소 섹션 (SQLite에서 갱신할 테이블)"""
+    return key if key in _SECTIONS else "profile"
+
 def load_data() -> Dict[str, Any]:
-    return _read_db()
+    return _store().all()
+
+def load_index() -> Dict[str, Any]:
+    """통계용 요약 (sharded는 폴더별 _index.json만 읽음, 나머지는 전체 레코드)"""
+    store = _store()
+    return store.index() if hasattr(store, "index") else store.all()
 
 def get_user(user_id: int) -> Dict[str, Any]:
-    """유저 불러오기 + 없으면 생성 + 자동 구조갱신"""
-    db = _read_db()
+    """유저 불러오기 (없을 때만 생성·저장, 있으면 I/O 없는 순수 조회)"""
+    store = _store()
     uid = str(user_id)
-    if uid not in db:
-        db[uid] = _default_user(user_id)
-    else:
-        db[uid] = _auto_update_structure(db[uid], user_id)
-    _write_db(db)
-    return db[uid]
+    u = store.get(uid)
+    if u is None:
+        u = mutate_user(user_id, _touch)
+    return u
+
+def _touch(u: Dict[str, Any]) -> None:
+    """없으면 만들기만 하는 변경 (다른 프로세스가 먼저 만들었으면 그쪽 값 유지)"""
 
 def update_user(user_id: int, key: str, value: Any) -> Dict[str, Any]:
     """특정 key 업데이트"""
-    db = _read_db()
-    uid = str(user_id)
-    if uid not in db:
-        db[uid] = _default_user(user_id)
-    db[uid][key] = value
-    db[uid] = _auto_update_structure(db[uid], user_id)
-    _write_db(db)
-    return db[uid]
+    return mutate_user(user_id, lambda u: u.__setitem__(key, value), (part_of(key),))
 
 def get_user_data(user_id: int, key: Optional[str] = None) -> Any:
-    u = get_user(user_id)
+    """읽기 전용 조회 — 없는 유저도 생성하지 않고 기본값으로 응답"""
+    u = _store().get(str(user_id)) or _default_user(user_id)
     return u if key is None else u.get(key)
 
 # ===== 유틸 =====
@@ -156,99 +537,117 @@ def build_settings_summary(user_id: int) -> str:
 
 # ===== 기본정보 설정 =====
 def set_basic_profile(user_id: int, **kwargs) -> Dict[str, Any]:
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
+    changes = {}
     for k, v in kwargs.items():
         if k == "tone" and v not in TONE_CHOICES:
             continue
         if k == "temp_limit":
             v = int(v)
-        u[k] = v
-    db[uid] = _auto_update_structure(u, user_id)
-    _write_db(db)
-    return db[uid]
+        changes[k] = v
+    return mutate_user(user_id, lambda u: u.update(changes), {part_of(k) for k in kwargs})
 
 # ===== 즐겨찾기 =====
 def update_favorites(user_id: int, favs: List[str]) -> List[str]:
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
     new = []
     for f in favs:
         f = f.strip()
         if f and f not in new:
             new.append(f)
-    u["favorites"] = new[:20]
-    db[uid] = _auto_update_structure(u, user_id)
-    _write_db(db)
+    mutate_user(user_id, lambda u: u.__setitem__("favorites", new[:20]), ("favorites",))
     return new
 
 # ===== 루틴 =====
 def update_routine(user_id: int, weekday: str, new_routine: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
     wd = normalize_weekday(weekday)
-    u["routine"][wd] = [{"type": i["type"], **({"minutes": int(i["minutes"])} if "minutes" in i else {})} for i in new_routine]
-    db[uid] = _auto_update_structure(u, user_id)
-    _write_db(db)
+    items = [{"type": i["type"], **({"minutes": int(i["minutes"])} if "minutes" in i else {})} for i in new_routine]
+    u = mutate_user(user_id, lambda u: u["routine"].__setitem__(wd, list(items)), (f"routine:{wd}",))
     return u["routine"][wd]
 
 # ===== 알림 =====
 def update_notification(user_id: int, ntype: str, time: Optional[str]=None,
                         enabled: Optional[bool]=None, days: Optional[List[str]]=None):
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
-    notif = u["notifications"].get(ntype, {})
-    if time is not None:
-        if time == "" or time is False:
-            notif["time"] = None
-            notif["enabled"] = False
-        elif is_valid_time_24h(time):
-            notif["time"] = time
-            notif["enabled"] = True
-    if enabled is not None:
-        notif["enabled"] = enabled
-    if days is not None:
-        notif["days"] = [normalize_weekday(d) for d in days]
-    u["notifications"][ntype] = notif
-    u = _auto_update_structure(u, user_id)
-    db[uid] = u
-    _write_db(db)
-    return notif
+    def apply(u):
+        notif = u["notifications"].get(ntype, {})
+        if time is not None:
+            if time == "" or time is False:
+                notif["time"] = None
+                notif["enabled"] = False
+            elif is_valid_time_24h(time):
+                notif["time"] = time
+                notif["enabled"] = True
+        if enabled is not None:
+            notif["enabled"] = enabled
+        if days is not None:
+            notif["days"] = [normalize_weekday(d) for d in days]
+        u["notifications"][ntype] = notif
+    return mutate_user(user_id, apply, (f"notifications:{ntype}",))["notifications"][ntype]
 
 def toggle_notifications(user_id: int, mode: str):
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
-    if mode == "none_on":
-        u["notifications"]["none"] = True
-        for k in ("weather_only","combo","workout_only"):
-            u["notifications"][k]["enabled"] = False
-    else:
-        u["notifications"]["none"] = False
-    db[uid] = _auto_update_structure(u, user_id)
-    _write_db(db)
-    return u["notifications"]
+    def apply(u):
+        if mode == "none_on":
+            u["notifications"]["none"] = True
+            for k in ("weather_only","combo","workout_only"):
+                u["notifications"][k]["enabled"] = False
+        else:
+            u["notifications"]["none"] = False
+    parts = ("notifications",) if mode == "none_on" else ("notifications:none",)
+    return mutate_user(user_id, apply, parts)["notifications"]
 
 # ===== 기록 =====
 def record_activity(user_id: int, activity: str, duration: Optional[int]=None):
-    db = _read_db()
-    uid = str(user_id)
-    u = db.get(uid, _default_user(user_id))
     date = datetime.now().strftime("%Y-%m-%d")
     rec = {"date": date, "type": activity}
     if duration:
         rec["duration"] = int(duration)
-    u["last_activity"] = rec
-    u["history"].append(rec)
-    u["usage_stats"][activity] = u["usage_stats"].get(activity, 0) + 1
-    db[uid] = _auto_update_structure(u, user_id)
-    _write_db(db)
+
+    def apply(u):                    # 충돌 시 다른 레코드에 재적용될 수 있음 → 날짜는 바깥에서 고정
+        u["last_activity"] = dict(rec)
+        u["usage_stats"][activity] = u["usage_stats"].get(activity, 0) + 1
+        _roll_activity(u["activity"], date)
+    _store().append_history(str(user_id), rec)   # 원본 기록은 append-only 로그 (재적용 대상 아님)
+    mutate_user(user_id, apply, ("profile", f"usage_stats:{activity}"))
     return rec
 
+def _roll_activity(act: Dict[str, Any], day: str) -> None:
+    """최근 30일 일별 횟수 + 7/30일 합계 + 연속 일수 갱신 (레코드 크기 고정)"""
+    days = act["days"]
+    last = max(days) if days else None
+    if day != last and (last is None or day > last):
+        prev = (_date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        act["streak"] = act["streak"] + 1 if last == prev else 1
+    days[day] = days.get(day, 0) + 1
+    newest = max(days)
+    cut30 = (_date.fromisoformat(newest) - timedelta(days=29)).isoformat()
+    cut7 = (_date.fromisoformat(newest) - timedelta(days=6)).isoformat()
+    for d in [d for d in days if d < cut30]:
+        del days[d]
+    act["count_30d"] = sum(days.values())
+    act["count_7d"] = sum(n for d, n in days.items() if d >= cut7)
+
+def get_activity_summary(user_id: int, today: Optional[str] = None) -> Dict[str, int]:
+    """오늘 기준 7/30일 횟수와 현재 연속 일수 (레코드만 보고 계산, 로그 I/O 없음)"""
+    act = get_user_data(user_id, "activity") or {"days": {}, "streak": 0}
+    today_d = _date.fromisoformat(today) if today else _date.today()
+    cut7 = (today_d - timedelta(days=6)).isoformat()
+    cut30 = (today_d - timedelta(days=29)).isoformat()
+    days = act["days"]
+    last = max(days) if days else None
+    alive = last is not None and last >= (today_d - timedelta(days=1)).isoformat()
+    return {
+        "count_7d": sum(n for d, n in days.items() if d >= cut7),
+        "count_30d": sum(n for d, n in days.items() if d >= cut30),
+        "streak": act["streak"] if alive else 0,
+    }
+
+def get_history(user_id: int, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """기록 로그에서 원본 기록 조회 (since: 'YYYY-MM-DD')"""
+    return list(_store().read_history(str(user_id), since))
+
+def compact_history(keep_days: int = 90) -> None:
+    """keep_days보다 오래된 원본 기록을 일별 집계로 압축"""
+    before = (_date.today() - timedelta(days=keep_days)).isoformat()
+    _store().compact_history(before)
+
 # ===== 톤 =====
 def set_tone(user_id: int, tone: str) -> str:
     if tone not in TONE_CHOICES:
@@ -0,0 +1,246 @@
+# -------------------------------
+# modules/user_shards.py
+# NYFITCOACH_BOT - 유저별 파일 저장소 (USER_BACKEND=sharded)
+# data/users/3f/12345.json     ← 유저 1명 = 파일 1개 (uid 해시 앞 2자리로 256개 폴더에 분산)
+# data/users/3f/_index.json    ← 폴더별 요약 (이름 / 마지막 활동일 / 가입 순서) → 서버 통계용
+# data/users/3f/.lock          ← 폴더별 프로세스 간 잠금
+# 특징: 다른 폴더의 유저는 여러 프로세스가 동시에 저장, 파일마다 임시파일 → os.replace로 원자적 교체
+# 이전: python -m modules.user_shards [data/users.json] [data/users]
+# -------------------------------
+import os, sys, json, time, hashlib, threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from modules import user_module as um
+from modules.activity_log import ActivityLog
+
+INDEX_NAME = "_index.json"
+LOCK_NAME = ".lock"
+
+
+def shard_of(uid: str) -> str:
+    """uid → 폴더 이름 (md5 앞 2자리, 00~ff)"""
+    return hashlib.md5(uid.encode("utf-8")).hexdigest()[:2]
+
+
+def _filename(uid: str) -> str:
+    # 웹 유저는 이름이 uid → 파일명으로 안전하게 (되돌릴 수 있게 퍼센트 인코딩)
+    return quote(uid, safe="") + ".json"
+
+
+def _atomic_write(path: str, data: Any) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _index_entry(u: Dict[str, Any], created: float) -> Dict[str, Any]:
+    """UserStats가 보는 필드만 (last_activity.date, 가입 순서)"""
+    last = u.get("last_activity")
+    day = last.get("date") if isinstance(last, dict) else None
+    return {"name": u.get("name"), "last_activity": {"date": day} if day else None, "created": created}
+
+
+class ShardedUserStore:
+    """
+    UserStore / SqliteUserStore와 같은 인터페이스 (get / put / all / transaction / flush / close / *_history).
+    - get: 유저 파일 1개 읽기 (잠금 없음 — 교체가 원자적이라 항상 완성된 파일)
+    - transaction(uid): 그 유저 폴더의 스레드 잠금 + 파일 잠금 → get/수정/put이 프로세스 간에도 원자적
+    - put: 유저 파일 교체 + 요약(_index.json)은 이름/활동일이 바뀐 경우만 다시 씀
+    운동 기록은 UserStore와 같은 ActivityLog(data/history)에 append — 레코드처럼 바로 파일로 (버퍼에 남기지 않음).
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.lock = threading.RLock()                   # 폴더 잠금 표 보호 / 전체 작업용
+        self._shard_locks: Dict[str, threading.RLock] = {}
+        self._held = threading.local()                  # 이 스레드가 잡고 있는 폴더 (중첩 허용)
+        self._index_cache: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        self.history = ActivityLog(os.path.join(os.path.dirname(os.path.abspath(root)), "history"))
+        self.write_count = 0
+
+    # ----- 경로 -----
+    def _dir(self, shard: str) -> str:
+        return os.path.join(self.root, shard)
+
+    def _path(self, uid: str) -> str:
+        return os.path.join(self._dir(shard_of(uid)), _filename(uid))
+
+    def shards(self) -> List[str]:
+        return sorted(d for d in os.listdir(self.root) if len(d) == 2 and os.path.isdir(self._dir(d)))
+
+    # ----- 잠금 -----
+    @contextmanager
+    def transaction(self, uid: Optional[str] = None):
+        """uid의 폴더 잠금 (uid 없으면 이 프로세스 안에서만 전체 잠금)"""
+        if uid is None:
+            with self.lock:
+                yield
+            return
+        with self._shard(shard_of(uid)):
+            yield
+
+    @contextmanager
+    def _shard(self, shard: str):
+        held = getattr(self._held, "shards", None)
+        if held is None:
+            held = self._held.shards = set()
+        if shard in held:
+            yield
+            return
+        with self.lock:
+            tlock = self._shard_locks.setdefault(shard, threading.RLock())
+        with tlock:
+            os.makedirs(self._dir(shard), exist_ok=True)
+            with um._file_lock(os.path.join(self._dir(shard), LOCK_NAME)):
+                held.add(shard)
+                try:
+                    yield
+                finally:
+                    held.discard(shard)
+
+    # ----- 조회 -----
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(uid), "r", encoding="utf-8") as f:
+                u = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            print(f"⚠️ [user_shards] {uid} 파일 손상: {e}")
+            return None
+        if u.get("schema_version", 0) < um.SCHEMA_VERSION:
+            with self.transaction(uid):
+                um._upgrade_record(u, uid, lambda rec: self.append_history(uid, rec))
+                self.put(uid, u)
+        return u
+
+    def all(self) -> Dict[str, Any]:
+        """전체 유저 (가입 순서). 시작 시 집계·이전용 — 평소 조회는 get()"""
+        out = {}
+        for uid in self.index():
+            u = self.get(uid)
+            if u is not None:
+                out[uid] = u
+        return out
+
+    def index(self) -> Dict[str, Any]:
+        """uid → {name, last_activity, created} (가입 순서) — 유저 파일을 열지 않는 통계용"""
+        merged = {}
+        for shard in self.shards():
+            merged.update(self._read_index(shard))
+        return dict(sorted(merged.items(), key=lambda kv: kv[1].get("created") or 0))
+
+    def count(self) -> int:
+        return sum(len(self._read_index(shard)) for shard in self.shards())
+
+    @property
+    def dirty_count(self) -> int:
+        return 0
+
+    def _read_index(self, shard: str) -> Dict[str, Any]:
+        """폴더 요약 (파일이 바뀌었을 때만 다시 읽음)"""
+        path = os.path.join(self._dir(shard), INDEX_NAME)
+        sig = um.file_signature(path)
+        cached = self._index_cache.get(shard)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        self._index_cache[shard] = (sig, index)
+        return index
+
+    # ----- 저장 -----
+    def put(self, uid: str, record: Dict[str, Any], parts: Optional[Iterable[str]] = None,
+            mutation=None) -> None:
+        """parts / mutation은 다른 저장소 호환용 (유저 파일은 항상 통째로, 이미 폴더 잠금 안)"""
+        shard = shard_of(uid)
+        with self._shard(shard):
+            _atomic_write(self._path(uid), record)
+            self.write_count += 1
+            self._update_index(shard, {uid: record})
+
+    def put_many(self, records: Dict[str, Dict[str, Any]]) -> int:
+        """대량 저장 (이전용): 폴더마다 잠금 1번 + 요약 쓰기 1번"""
+        by_shard = defaultdict(dict)
+        t0 = time.time()
+        created = {}                    # 원래 파일 순서 = 가입 순서로 보존
+        for i, (uid, u) in enumerate(records.items()):
+            by_shard[shard_of(uid)][uid] = u
+            created[uid] = t0 + i * 1e-6
+        for shard, group in by_shard.items():
+            with self._shard(shard):
+                for uid, u in group.items():
+                    _atomic_write(self._path(uid), u)
+                self.write_count += len(group)
+                self._update_index(shard, group, created)
+        return len(records)
+
+    def _update_index(self, shard: str, records: Dict[str, Dict[str, Any]],
+                      created: Optional[Dict[str, float]] = None) -> None:
+        """폴더 잠금 안에서 호출. 요약이 실제로 바뀐 경우만 씀."""
+        index = self._read_index(shard)
+        changed = False
+        now = time.time()
+        for uid, u in records.items():
+            old = index.get(uid)
+            entry = _index_entry(u, old["created"] if old else (created or {}).get(uid, now))
+            if entry != old:
+                index = dict(index) if not changed else index
+                index[uid] = entry
+                changed = True
+        if changed:
+            path = os.path.join(self._dir(shard), INDEX_NAME)
+            _atomic_write(path, index)
+            self._index_cache[shard] = (um.file_signature(path), index)
+
+    def mark_dirty(self, uid: str) -> None:
+        """put 시점에 바로 파일로 저장되므로 할 일 없음 (UserStore 호환용)."""
+
+    def flush(self) -> bool:
+        self.history.flush()
+        return False
+
+    def close(self) -> None:
+        self.flush()
+
+    # ----- 운동 기록 -----
+    def append_history(self, uid: str, rec: Dict[str, Any]) -> None:
+        """put과 같은 정책: 호출이 끝나면 디스크에 있음 (flush 스레드가 없으므로)"""
+        with self.transaction(uid):
+            self.history.append(uid, rec)
+            self.history.flush()
+
+    def read_history(self, uid: str, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        for rec in self.history.read(uid, since):
+            yield {k: v for k, v in rec.items() if k != "uid"}
+
+    def compact_history(self, before: str) -> None:
+        """before('YYYY-MM-DD') 이전 기록을 일별 집계로 (SQLite와 같은 날 단위)"""
+        self.history.compact(before)
+
+
+# ===== users.json → 유저별 파일 일회성 이전 =====
+def import_from_json(json_path: str = um.USERS_DB, root: str = None) -> int:
+    """기존 users.json을 유저별 파일로 옮김 (원본은 그대로 둠). 옮긴 유저 수 반환."""
+    from config.env import USERS_SHARD_DIR
+    store = ShardedUserStore(root or USERS_SHARD_DIR)
+    try:
+        db = um._read_db(json_path)
+        for uid, u in db.items():
+            um._upgrade_record(u, uid, lambda rec, uid=uid: store.append_history(uid, rec))
+        return store.put_many(db)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    n = import_from_json(*sys.argv[1:3])
+    print(f"✅ users.json → 유저별 파일 이전 완료: {n}명 (USER_BACKEND=sharded로 전환)")
@@ -0,0 +1,320 @@
+# -------------------------------
+# modules/user_sqlite.py
+# NYFITCOACH_BOT - SQLite 유저 저장소 (USER_BACKEND=sqlite)
+# 특징: WAL 모드 + 섹션별 테이블 → 변경된 행만 갱신
+# 이전: python -m modules.user_sqlite [data/users.json] [data/users.db]
+# -------------------------------
+import os, sys, json, sqlite3, threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from modules import user_module as um
+from modules.activity_log import ActivityLog
+
+# ===== 테이블 정의 =====
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    uid                TEXT PRIMARY KEY,
+    name               TEXT,
+    age                INTEGER,
+    location           TEXT,
+    temp_limit         INTEGER,
+    tone               TEXT,
+    last_activity      TEXT,
+    last_activity_date TEXT,
+    schema_version     INTEGER NOT NULL DEFAULT 0,
+    extra              TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_users_location ON users(location);
+CREATE INDEX IF NOT EXISTS idx_users_last_activity ON users(last_activity_date);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    uid     TEXT NOT NULL,
+    ntype   TEXT NOT NULL,
+    enabled INTEGER NOT NULL DEFAULT 0,
+    time    TEXT,
+    days    TEXT,
+    PRIMARY KEY (uid, ntype)
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_time ON notifications(time, enabled);
+
+CREATE TABLE IF NOT EXISTS routine (
+    uid     TEXT NOT NULL,
+    weekday TEXT NOT NULL,
+    items   TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (uid, weekday)
+);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    uid   TEXT NOT NULL,
+    pos   INTEGER NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (uid, pos)
+);
+
+CREATE TABLE IF NOT EXISTS usage_stats (
+    uid      TEXT NOT NULL,
+    activity TEXT NOT NULL,
+    count    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (uid, activity)
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid      TEXT NOT NULL,
+    date     TEXT NOT NULL,
+    type     TEXT NOT NULL,
+    duration INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_history_uid ON history(uid, date);
+
+CREATE TABLE IF NOT EXISTS history_daily (
+    uid     TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    type    TEXT NOT NULL,
+    count   INTEGER NOT NULL DEFAULT 0,
+    minutes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (uid, date, type)
+);
+"""
+
+# users 테이블 컬럼으로 직접 저장하는 필드 (나머지 알 수 없는 필드는 extra JSON)
+PROFILE_FIELDS = ("name", "age", "location", "temp_limit", "tone")
+_SECTION_FIELDS = {"user_id", "notifications", "routine", "favorites", "usage_stats",
+                   "history", "last_activity", "schema_version"}
+
+
+def _dumps(v: Any) -> str:
+    return json.dumps(v, ensure_ascii=False)
+
+
+class SqliteUserStore:
+    """
+    UserStore와 같은 인터페이스 (get / put / all / flush / close / *_history).
+    put(uid, u, parts)에 바뀐 섹션만 넘기면 해당 행만 갱신:
+      "profile", "notifications[:타입]", "routine[:요일]", "favorites", "usage_stats[:활동]"
+    운동 기록은 history 테이블(append-only), 오래된 기록은 history_daily로 압축.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._upgrade_all()
+
+    # ----- 조회 -----
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self._conn.execute(
+                "SELECT name, age, location, temp_limit, tone, last_activity, schema_version, extra "
+                "FROM users WHERE uid = ?", (uid,)).fetchone()
+            if row is None:
+                return None
+            return self._assemble(uid, row)
+
+    def all(self) -> Dict[str, Any]:
+        with self.lock:
+            uids = [r[0] for r in self._conn.execute("SELECT uid FROM users ORDER BY rowid")]
+            return {uid: self.get(uid) for uid in uids}
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    @property
+    def dirty_count(self) -> int:
+        return 0
+
+    def _assemble(self, uid: str, row) -> Dict[str, Any]:
+        name, age, location, temp_limit, tone, last_activity, version, extra = row
+        u = {"user_id": int(uid) if uid.isdigit() else uid}
+        u.update(json.loads(extra))
+        u.update(name=name, age=age, location=location, temp_limit=temp_limit, tone=tone)
+        q = self._conn.execute
+        u["favorites"] = [v for (v,) in q("SELECT value FROM favorites WHERE uid = ? ORDER BY pos", (uid,))]
+        notifs: Dict[str, Any] = {}
+        for ntype, enabled, time, days in q(
+                "SELECT ntype, enabled, time, days FROM notifications WHERE uid = ?", (uid,)):
+            if ntype == "none":
+                notifs["none"] = bool(enabled)
+                continue
+            notifs[ntype] = {"enabled": bool(enabled), "time": time}
+            if days is not None:
+                notifs[ntype]["days"] = json.loads(days)
+        u["notifications"] = notifs
+        u["routine"] = {wd: json.loads(items) for wd, items in q(
+            "SELECT weekday, items FROM routine WHERE uid = ?", (uid,))}
+        u["last_activity"] = json.loads(last_activity) if last_activity else None
+        u["usage_stats"] = dict(q("SELECT activity, count FROM usage_stats WHERE uid = ?", (uid,)))
+        u["schema_version"] = version
+        return u
+
+    # ----- 저장 -----
+    @contextmanager
+    def transaction(self, uid: Optional[str] = None):
+        """get → 수정 → put을 한 트랜잭션으로. BEGIN IMMEDIATE = 다른 프로세스의 쓰기도 대기.
+        이미 트랜잭션 안이면 바깥 트랜잭션에 합류."""
+        with self.lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def put(self, uid: str, record: Dict[str, Any], parts: Optional[Iterable[str]] = None,
+            mutation=None) -> None:
+        """mutation은 UserStore 호환용 (SQLite는 transaction() 안에서 바로 반영되므로 불필요)"""
+        with self.transaction():
+            exists = self._conn.execute("SELECT 1 FROM users WHERE uid = ?", (uid,)).fetchone()
+            if parts is None or not exists:
+                self._write_full(uid, record)
+                return
+            for part in parts:
+                section, _, key = part.partition(":")
+                getattr(self, f"_write_{section}")(uid, record, key or None)
+
+    def mark_dirty(self, uid: str) -> None:
+        """SQLite는 put 시점에 바로 커밋되므로 할 일 없음 (UserStore 호환용)."""
+
+    def flush(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        with self.lock:
+            self._conn.close()
+
+    def _write_full(self, uid: str, u: Dict[str, Any]) -> None:
+        for table in ("notifications", "routine", "favorites", "usage_stats"):
+            self._conn.execute(f"DELETE FROM {table} WHERE uid = ?", (uid,))
+        self._write_profile(uid, u)
+        self._write_notifications(uid, u)
+        self._write_routine(uid, u)
+        self._write_favorites(uid, u)
+        self._write_usage_stats(uid, u)
+
+    def _write_profile(self, uid: str, u: Dict[str, Any], key: str = None) -> None:
+        extra = {k: v for k, v in u.items() if k not in PROFILE_FIELDS and k not in _SECTION_FIELDS}
+        last = u.get("last_activity")
+        self._conn.execute(
+            "INSERT INTO users (uid, name, age, location, temp_limit, tone, last_activity, "
+            "last_activity_date, schema_version, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(uid) DO UPDATE SET name = excluded.name, age = excluded.age, "
+            "location = excluded.location, temp_limit = excluded.temp_limit, tone = excluded.tone, "
+            "last_activity = excluded.last_activity, last_activity_date = excluded.last_activity_date, "
+            "schema_version = excluded.schema_version, extra = excluded.extra",
+            (uid, *(u.get(f) for f in PROFILE_FIELDS), _dumps(last) if last else None,
+             last.get("date") if isinstance(last, dict) else None,
+             u.get("schema_version", 0), _dumps(extra)))
+
+    def _write_notifications(self, uid: str, u: Dict[str, Any], key: str = None) -> None:
+        notifs = u.get("notifications") or {}
+        for ntype in ([key] if key else notifs):
+            n = notifs.get(ntype)
+            if ntype == "none":
+                row = (uid, "none", int(bool(n)), None, None)
+            else:
+                n = n or {}
+                days = n.get("days")
+                row = (uid, ntype, int(bool(n.get("enabled"))), n.get("time"),
+                       _dumps(days) if days is not None else None)
+            self._conn.execute("INSERT OR REPLACE INTO notifications VALUES (?, ?, ?, ?, ?)", row)
+
+    def _write_routine(self, uid: str, u: Dict[str, Any], key: str = None) -> None:
+        routine = u.get("routine") or {}
+        for wd in ([key] if key else routine):
+            self._conn.execute("INSERT OR REPLACE INTO routine VALUES (?, ?, ?)",
+                               (uid, wd, _dumps(routine.get(wd, []))))
+
+    def _write_favorites(self, uid: str, u: Dict[str, Any], key: str = None) -> None:
+        self._conn.execute("DELETE FROM favorites WHERE uid = ?", (uid,))
+        self._conn.executemany("INSERT INTO favorites VALUES (?, ?, ?)",
+                               [(uid, i, f) for i, f in enumerate(u.get("favorites") or [])])
+
+    def _write_usage_stats(self, uid: str, u: Dict[str, Any], key: str = None) -> None:
+        stats = u.get("usage_stats") or {}
+        for activity in ([key] if key else stats):
+            self._conn.execute("INSERT OR REPLACE INTO usage_stats VALUES (?, ?, ?)",
+                               (uid, activity, stats.get(activity, 0)))
+
+    # ----- 운동 기록 -----
+    def append_history(self, uid: str, rec: Dict[str, Any]) -> None:
+        with self.lock:
+            self._conn.execute("INSERT INTO history (uid, date, type, duration) VALUES (?, ?, ?, ?)",
+                               (uid, rec["date"], rec["type"], rec.get("duration")))
+
+    def read_history(self, uid: str, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        with self.lock:
+            rows = self._conn.execute(
+                "SELECT date, type, duration FROM history WHERE uid = ? AND date >= ? ORDER BY id",
+                (uid, since or "")).fetchall()
+        for d, t, dur in rows:
+            yield {"date": d, "type": t, **({"duration": dur} if dur else {})}
+
+    def import_history(self, records: Iterable[Dict[str, Any]],
+                       daily: Iterable[tuple] = ()) -> None:
+        """ActivityLog에서 옮겨 오는 원본 기록({uid, date, type, duration})과
+        일별 집계((uid, date, type, count, minutes))를 한 트랜잭션으로"""
+        with self.transaction():
+            self._conn.executemany(
+                "INSERT INTO history (uid, date, type, duration) VALUES (?, ?, ?, ?)",
+                ((r["uid"], r["date"], r["type"], r.get("duration")) for r in records))
+            self._conn.executemany(
+                "INSERT INTO history_daily (uid, date, type, count, minutes) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(uid, date, type) DO UPDATE SET "
+                "count = count + excluded.count, minutes = minutes + excluded.minutes", daily)
+
+    def compact_history(self, before: str) -> None:
+        """before('YYYY-MM-DD') 이전 기록을 history_daily 일별 집계로 옮기고 삭제"""
+        with self.lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "INSERT INTO history_daily (uid, date, type, count, minutes) "
+                "SELECT uid, date, type, COUNT(*), COALESCE(SUM(duration), 0) FROM history "
+                "WHERE date < ? GROUP BY uid, date, type "
+                "ON CONFLICT(uid, date, type) DO UPDATE SET "
+                "count = count + excluded.count, minutes = minutes + excluded.minutes", (before,))
+            self._conn.execute("DELETE FROM history WHERE date < ?", (before,))
+
+    # ----- 마이그레이션 -----
+    def _upgrade_all(self) -> None:
+        """DB 오픈 시 한 번: 구버전 레코드를 최신 스키마로"""
+        with self.lock:
+            stale = [r[0] for r in self._conn.execute(
+                "SELECT uid FROM users WHERE schema_version < ?", (um.SCHEMA_VERSION,))]
+            for uid in stale:
+                u = self.get(uid)
+                if u["schema_version"] < 2:     # v1까지는 history가 레코드 소속 → 집계 재계산용
+                    u["history"] = list(self.read_history(uid))
+                um._upgrade_record(u, uid)      # 기록은 이미 history 테이블에 있음
+                self.put(uid, u)
+
+
+# ===== users.json → SQLite 일회성 이전 =====
+def import_from_json(json_path: str = um.USERS_DB, db_path: str = None) -> int:
+    """기존 users.json을 SQLite로 옮김. 옮긴 유저 수 반환.
+    운동 기록: v1 레코드 안의 history + 옆 history/ 폴더의 기록 로그(v2, 원본과 일별 집계) 모두."""
+    from config.env import USERS_SQLITE_PATH
+    store = SqliteUserStore(db_path or USERS_SQLITE_PATH)
+    try:
+        db = um._read_db(json_path)
+        for uid, u in db.items():
+            um._upgrade_record(u, uid, lambda rec, uid=uid: store.append_history(uid, rec))
+            store.put(uid, u)
+        log = ActivityLog(os.path.join(os.path.dirname(json_path) or ".", "history"))
+        store.import_history(log.read(), log.daily_rows())
+        return len(db)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    n = import_from_json(*sys.argv[1:3])
+    print(f"✅ users.json → SQLite 이전 완료: {n}명")
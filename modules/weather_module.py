@@ -1,21 +1,59 @@
 # -------------------------------
 # modules/weather_module.py
+# PIL·requests는 처음 쓰는 함수 안에서 import (봇/서버 기동 시간 단축)
 # -------------------------------
-import os, requests, random
-from datetime import datetime, timedelta
-from PIL import Image, ImageDraw, ImageFont
-from config.env import WEATHER_KEY
-from modules.youtube_module import get_random_video
+import os, time, asyncio, random, threading
+from bisect import bisect_left, bisect_right
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone, time as dt_time
+from zoneinfo import ZoneInfo
+from urllib.parse import quote
+from config.env import TIMEZONE, WEATHER_KEY, OWM_BASE_URL, WEATHER_CACHE_TTL, FORECAST_CACHE_TTL, WEATHER_CACHE_SIZE
+from modules.cache_module import TTLCache
+from modules import http_module
+from modules.metrics_module import UPSTREAM, OUTFIT_CARD
+from modules.geo_module import geocode, ageocode
+from modules.youtube_module import get_random_video, aget_random_video
 
 OUTFIT_DIR = "data/outfits"
-TEMP_DIR = "temp"
-os.makedirs(TEMP_DIR, exist_ok=True)
+_TZ = ZoneInfo(TIMEZONE)     # "내일 정오" 기준 (기본 Asia/Seoul)
 
-CITY_MAP = {
-    "성남시 수정구": "Seongnam", "성남시 중원구": "Seongnam", "성남시 분당구": "Seongnam",
-    "서울": "Seoul", "부산": "Busan", "대구": "Daegu", "인천": "Incheon",
-    "광주": "Gwangju", "대전": "Daejeon", "울산": "Ulsan", "제주": "Jeju"
-}
+# ===== 도시별 응답 캐시 =====
+# 같은 도시 요청은 TTL 동안 재사용, 동시 miss는 upstream 호출 1번으로 합침
+# 현재 날씨는 OWM 응답 그대로, 예보는 파싱한 Forecast로 보관
+_weather_cache = TTLCache(WEATHER_CACHE_TTL, WEATHER_CACHE_SIZE, name="weather")
+_forecast_cache = TTLCache(FORECAST_CACHE_TTL, WEATHER_CACHE_SIZE, name="forecast")
+
+def weather_cache_stats() -> dict:
+    """캐시 크기 조정용 hit/miss 카운터"""
+    return {"weather": _weather_cache.stats(), "forecast": _forecast_cache.stats()}
+
+def _location(city_kr: str, place) -> tuple:
+    """(캐시 키, OWM 위치 파라미터) — 좌표를 찾았으면 lat/lon, 못 찾으면 지역명 그대로 q="""
+    if place is not None:
+        lat, lon = round(place.lat, 2), round(place.lon, 2)   # 약 1km 격자 → 가까운 동네끼리 캐시 공유
+        return (lat, lon), f"lat={lat}&lon={lon}"
+    city = city_kr.strip()
+    return city, f"q={quote(city)}"
+
+def _owm_url(kind: str, loc: str) -> str:
+    """kind: 'weather'(현재) | 'forecast'(5일/3시간), loc: _location()의 위치 파라미터"""
+    return f"{OWM_BASE_URL}/data/2.5/{kind}?{loc}&appid={WEATHER_KEY}&units=metric&lang=kr"
+
+def _fetch_json(url: str) -> dict:
+    import requests
+    res = requests.get(url, timeout=5)
+    res.raise_for_status()
+    return res.json()
+
+def _fetch_owm(kind: str, url: str) -> dict:
+    with UPSTREAM.time("owm", kind):
+        return _fetch_json(url)
+
+async def _afetch_owm(kind: str, url: str) -> dict:
+    with UPSTREAM.time("owm", kind):
+        return await http_module.get_json(url)
 
 # ===== 날씨 이모지 매핑 =====
 def get_weather_icon(desc: str) -> str:
@@ -30,34 +68,134 @@ def get_weather_icon(desc: str) -> str:
 
 # ===== 오늘 날씨 =====
 def get_weather(city_kr: str) -> dict:
-    city_en = CITY_MAP.get(city_kr.strip(), city_kr)
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city_en}&appid={WEATHER_KEY}&units=metric&lang=kr"
-    res = requests.get(url, timeout=5)
-    data = res.json()
+    key, loc = _location(city_kr, geocode(city_kr))
+    url = _owm_url("weather", loc)
+    return _parse_weather(_weather_cache.get_or_load(key, lambda: _fetch_owm("weather", url)), city_kr)
+
+async def aget_weather(city_kr: str) -> dict:
+    """get_weather의 비동기 버전 (이벤트 루프를 막지 않음)"""
+    key, loc = _location(city_kr, await ageocode(city_kr))
+    url = _owm_url("weather", loc)
+    return _parse_weather(await _weather_cache.aget_or_load(key, lambda: _afetch_owm("weather", url)), city_kr)
+
+def _parse_weather(data: dict, city_kr: str) -> dict:
     desc = data["weather"][0]["description"]
     return {
         "city": city_kr,
+        "main": data["weather"][0].get("main", ""),
         "temp": round(data["main"]["temp"], 1),
         "feels": round(data["main"]["feels_like"], 1),
         "desc": desc,
         "icon": get_weather_icon(desc)
     }
 
+# ===== 예보 모델 =====
+class Forecast:
+    """
+    OWM 5일/3시간 예보(40칸)를 한 번만 파싱한 시각 배열 — 도시별로 _forecast_cache에 보관.
+    times: 각 칸의 UTC epoch 초 (오름차순), slots: 같은 순서의 {dt, temp, feels, desc, main, icon}
+    조회는 모두 bisect: now() / tomorrow_noon() (TIMEZONE 기준 내일 12시) / next_hours(n)
+    """
+    __slots__ = ("times", "slots")
+
+    def __init__(self, times: list, slots: list):
+        self.times = times
+        self.slots = slots
+
+    @classmethod
+    def parse(cls, data: dict) -> "Forecast":
+        rows = sorted((_forecast_ts(item), item) for item in data.get("list") or [])
+        if not rows:
+            raise ValueError("예보 목록이 비어 있음")       # 캐시하지 않고 호출한 쪽으로
+        slots = []
+        for ts, item in rows:
+            desc = item["weather"][0]["description"]
+            slots.append({
+                "dt": ts,
+                "main": item["weather"][0].get("main", ""),
+                "temp": round(item["main"]["temp"], 1),
+                "feels": round(item["main"].get("feels_like", item["main"]["temp"]), 1),
+                "desc": desc,
+                "icon": get_weather_icon(desc),
+            })
+        return cls([ts for ts, _ in rows], slots)
+
+    def nearest(self, ts: float) -> dict:
+        """ts에 가장 가까운 칸 (범위 밖이면 처음/마지막 칸)"""
+        i = bisect_left(self.times, ts)
+        if i == 0:
+            return self.slots[0]
+        if i == len(self.times):
+            return self.slots[-1]
+        return self.slots[i] if self.times[i] - ts < ts - self.times[i - 1] else self.slots[i - 1]
+
+    def now(self, now: float = None) -> dict:
+        return self.nearest(time.time() if now is None else now)
+
+    def tomorrow_noon(self, now: float = None) -> dict:
+        local = datetime.fromtimestamp(time.time() if now is None else now, _TZ)
+        noon = datetime.combine(local.date() + timedelta(days=1), dt_time(12), _TZ)
+        return self.nearest(noon.timestamp())
+
+    def next_hours(self, hours: float, now: float = None) -> list:
+        """지금이 속한 칸부터 hours시간 뒤까지의 칸들"""
+        now = time.time() if now is None else now
+        start = max(0, bisect_right(self.times, now) - 1)
+        return self.slots[start:bisect_right(self.times, now + hours * 3600)]
+
+def _forecast_ts(item: dict) -> int:
+    if "dt" in item:
+        return int(item["dt"])
+    # dt 없는 응답: dt_txt는 UTC 기준
+    return int(datetime.strptime(item["dt_txt"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp())
+
+def get_forecast(city_kr: str) -> Forecast:
+    key, loc = _location(city_kr, geocode(city_kr))
+    return _forecast_cache.get_or_load(key, lambda: Forecast.parse(_fetch_owm("forecast", _owm_url("forecast", loc))))
+
+async def aget_forecast(city_kr: str) -> Forecast:
+    key, loc = _location(city_kr, await ageocode(city_kr))
+    url = _owm_url("forecast", loc)
+    return await _forecast_cache.aget_or_load(key, lambda: _aparse_forecast(url))
+
+async def _aparse_forecast(url: str) -> Forecast:
+    return Forecast.parse(await _afetch_owm("forecast", url))
+
 # ===== 내일 예보 =====
 def get_tomorrow_weather(city_kr: str) -> dict:
-    city_en = CITY_MAP.get(city_kr.strip(), city_kr)
-    url = f"http://api.openweathermap.org/data/2.5/forecast?q={city_en}&appid={WEATHER_KEY}&units=metric&lang=kr"
-    res = requests.get(url, timeout=5)
-    data = res.json()
-    target = next((item for item in data["list"] if "12:00:00" in item["dt_txt"]), None)
-    if not target:
-        target = data["list"][8] if len(data["list"]) > 8 else data["list"][0]
-    desc = target["weather"][0]["description"]
-    return {
-        "temp": round(target["main"]["temp"], 1),
-        "desc": desc,
-        "icon": get_weather_icon(desc)
-    }
+    return dict(get_forecast(city_kr).tomorrow_noon())
+
+async def aget_tomorrow_weather(city_kr: str) -> dict:
+    return dict((await aget_forecast(city_kr)).tomorrow_noon())
+
+# ===== 오늘 + 내일 (복장 카드용, 외부 호출 최대 1번) =====
+# 예보가 없으면 예보만 받고, 현재 날씨가 오래됐으면 예보의 지금 칸으로 대신
+# 예보가 있으면 현재 날씨가 오래됐을 때만 현재 날씨를 다시 받음
+def get_today_and_tomorrow(city_kr: str) -> tuple:
+    key, loc = _location(city_kr, geocode(city_kr))
+    current, forecast = _weather_cache.peek(key), _forecast_cache.peek(key)
+    if forecast is None:
+        forecast = _forecast_cache.get_or_load(
+            key, lambda: Forecast.parse(_fetch_owm("forecast", _owm_url("forecast", loc))))
+    elif current is None:
+        current = _weather_cache.get_or_load(key, lambda: _fetch_owm("weather", _owm_url("weather", loc)))
+    return _today(current, forecast, city_kr), dict(forecast.tomorrow_noon())
+
+async def aget_today_and_tomorrow(city_kr: str) -> tuple:
+    key, loc = _location(city_kr, await ageocode(city_kr))
+    current, forecast = _weather_cache.peek(key), _forecast_cache.peek(key)
+    if forecast is None:
+        url = _owm_url("forecast", loc)
+        forecast = await _forecast_cache.aget_or_load(key, lambda: _aparse_forecast(url))
+    elif current is None:
+        url = _owm_url("weather", loc)
+        current = await _weather_cache.aget_or_load(key, lambda: _afetch_owm("weather", url))
+    return _today(current, forecast, city_kr), dict(forecast.tomorrow_noon())
+
+def _today(current, forecast: Forecast, city_kr: str) -> dict:
+    if current is not None:
+        return _parse_weather(current, city_kr)
+    return {"city": city_kr, **forecast.now()}
 
 # ===== 복장 + 운동 추천 =====
 def recommend_outfit(temp: float, desc: str) -> dict:
@@ -83,40 +221,90 @@ def select_outfit_image(temp: float, desc: str) -> str:
     if 5 <= temp < 15: return os.path.join(OUTFIT_DIR, "winter.png")
     return os.path.join(OUTFIT_DIR, "heavy_winter.png")
 
-# ===== 카드 생성 =====
-def build_outfit_card(user_name: str, city: str):
-    today = get_weather(city)
-    tomorrow = get_tomorrow_weather(city)
-    reco = recommend_outfit(today["temp"], today["desc"])
-    category = "요가" if not reco["is_outdoor"] else "스트레칭"
-    video = get_random_video(category)
+# ===== 카드 렌더러 =====
+class OutfitCardRenderer:
+    """
+    복장 카드 렌더러 — 템플릿 6장과 폰트를 한 번만 로드해서 재사용.
+    render(): 템플릿 복사본에 글자를 그려 PNG BytesIO 반환 (디스크 쓰기 없음)
+    arender(): 같은 작업을 작은 스레드풀에서 실행 (이벤트 루프 안 막음)
+    """
+    TEMPLATES = ("rain", "snow", "summer", "autumn", "winter", "heavy_winter")
+    BLANK_SIZE = (800, 800)
+
+    def __init__(self, outfit_dir: str = OUTFIT_DIR, workers: int = 2):
+        self.outfit_dir = outfit_dir
+        self.workers = workers
+        self._templates = {}
+        self._fonts = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._fonts is not None:
+                return
+            from PIL import Image, ImageFont
+            for name in self.TEMPLATES:
+                path = os.path.join(self.outfit_dir, f"{name}.png")
+                try:
+                    with Image.open(path) as im:
+                        self._templates[name] = im.convert("RGBA")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ [weather_module] 템플릿 로드 실패 → 기본 배경 사용: {path} ({e})")
+                    self._templates[name] = Image.new("RGBA", self.BLANK_SIZE, (200, 220, 240, 255))
+            try:
+                self._fonts = (ImageFont.truetype("arialbd.ttf", 40), ImageFont.truetype("arial.ttf", 26))
+            except OSError:
+                self._fonts = (ImageFont.load_default(), ImageFont.load_default())
+
+    def template(self, img_path: str):
+        """select_outfit_image() 경로 → 미리 디코딩된 템플릿 (파일명 기준)"""
+        self._load()
+        name = os.path.splitext(os.path.basename(img_path))[0]
+        tpl = self._templates.get(name)
+        if tpl is None:                     # 목록 밖 경로 → 한 번 읽어서 캐시
+            from PIL import Image
+            with Image.open(img_path) as im:
+                tpl = self._templates[name] = im.convert("RGBA")
+        return tpl
 
-    img_path = select_outfit_image(today["temp"], today["desc"])
-    img = Image.open(img_path).convert("RGBA")
-    draw = ImageDraw.Draw(img)
-    try:
-        font_title = ImageFont.truetype("arialbd.ttf", 40)
-        font_info = ImageFont.truetype("arial.ttf", 26)
-    except:
-        font_title = ImageFont.load_default()
-        font_info = ImageFont.load_default()
-
-    title = f"{user_name}'s Weather & Workout 🩵"
-    info = f"{today['icon']} {today['temp']}°C / {today['desc']} / 체감 {today['feels']}°C"
-    outfit_line = reco["outfit"]
-    exercise_line = reco["exercise"]
-    tomorrow_line = f"{tomorrow['icon']} 내일: {tomorrow['temp']}°C / {tomorrow['desc']}"
-
-    draw.rectangle([(30, 30), (img.width - 30, 240)], fill=(255, 255, 255, 230))
-    draw.text((50, 50), title, fill=(40, 40, 60), font=font_title)
-    draw.text((50, 100), info, fill=(40, 40, 60), font=font_info)
-    draw.text((50, 140), outfit_line, fill=(20, 20, 20), font=font_info)
-    draw.text((50, 180), exercise_line, fill=(20, 40, 80), font=font_info)
-    draw.text((50, 215), tomorrow_line, fill=(70, 60, 100), font=font_info)
-
-    output_path = os.path.join(TEMP_DIR, f"{user_name}_outfit.png")
-    img.save(output_path)
+    @OUTFIT_CARD.wrap("render")
+    def render(self, img_path: str, lines: list) -> BytesIO:
+        """lines: [제목, 날씨, 복장, 운동, 내일] 순서"""
+        from PIL import ImageDraw
+        img = self.template(img_path).copy()
+        font_title, font_info = self._fonts
+        title, info, outfit_line, exercise_line, tomorrow_line = lines
+        draw = ImageDraw.Draw(img)
+        draw.rectangle([(30, 30), (img.width - 30, 240)], fill=(255, 255, 255, 230))
+        draw.text((50, 50), title, fill=(40, 40, 60), font=font_title)
+        draw.text((50, 100), info, fill=(40, 40, 60), font=font_info)
+        draw.text((50, 140), outfit_line, fill=(20, 20, 20), font=font_info)
+        draw.text((50, 180), exercise_line, fill=(20, 40, 80), font=font_info)
+        draw.text((50, 215), tomorrow_line, fill=(70, 60, 100), font=font_info)
+        out = BytesIO()
+        img.save(out, format="PNG", compress_level=1)
+        out.seek(0)
+        out.name = "outfit.png"             # reply_photo 업로드 파일명
+        return out
 
+    async def arender(self, img_path: str, lines: list) -> BytesIO:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="outfit-card")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.render, img_path, lines)
+
+
+card_renderer = OutfitCardRenderer()
+
+# ===== 카드 생성 =====
+def _card_content(user_name: str, city: str, today: dict, tomorrow: dict, video: dict, reco: dict, category: str):
+    lines = [
+        f"{user_name}'s Weather & Workout 🩵",
+        f"{today['icon']} {today['temp']}°C / {today['desc']} / 체감 {today['feels']}°C",
+        reco["outfit"],
+        reco["exercise"],
+        f"{tomorrow['icon']} 내일: {tomorrow['temp']}°C / {tomorrow['desc']}",
+    ]
     caption = (
         f"{today['icon']} 오늘의 날씨 ({city})\n"
         f"🌡 {today['temp']}°C / {today['desc']} / 체감 {today['feels']}°C\n\n"
@@ -126,4 +314,26 @@ def build_outfit_card(user_name: str, city: str):
         f"{video['title']}\n👉 {video['link']}\n\n"
         f"{tomorrow['icon']} 내일: {tomorrow['temp']}°C / {tomorrow['desc']}"
     )
-    return output_path, caption
+    return lines, caption
+
+@OUTFIT_CARD.wrap("build")
+def build_outfit_card(user_name: str, city: str):
+    """(PNG BytesIO, 캡션) — reply_photo(photo=..., caption=...)에 그대로 전달"""
+    today, tomorrow = get_today_and_tomorrow(city)
+    reco = recommend_outfit(today["temp"], today["desc"])
+    category = "요가" if not reco["is_outdoor"] else "스트레칭"
+    video = get_random_video(category)
+    lines, caption = _card_content(user_name, city, today, tomorrow, video, reco, category)
+    return card_renderer.render(select_outfit_image(today["temp"], today["desc"]), lines), caption
+
+@OUTFIT_CARD.wrap("build")
+async def abuild_outfit_card(user_name: str, city: str, weather: tuple = None):
+    """build_outfit_card의 비동기 버전 (HTTP는 aiohttp, 렌더링은 스레드풀)
+    weather: 이미 받아 둔 aget_today_and_tomorrow() 결과 (없으면 여기서 조회)"""
+    today, tomorrow = weather or await aget_today_and_tomorrow(city)
+    reco = recommend_outfit(today["temp"], today["desc"])
+    category = "요가" if not reco["is_outdoor"] else "스트레칭"
+    video = await aget_random_video(category)
+    lines, caption = _card_content(user_name, city, today, tomorrow, video, reco, category)
+    photo = await card_renderer.arender(select_outfit_image(today["temp"], today["desc"]), lines)
+    return photo, caption
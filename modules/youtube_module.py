@@ -1,7 +1,12 @@
 # -------------------------------
 # modules/youtube_module.py
 # -------------------------------
-import os, requests, random
+import os, time, asyncio, random, threading
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from modules import http_module
+from modules.metrics_module import UPSTREAM
+from config.env import YOUTUBE_API_BASE, YOUTUBE_DAILY_QUOTA, YOUTUBE_POOL_REFRESH, YOUTUBE_POOL_SIZE
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
@@ -9,14 +14,22 @@ YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 YOUTUBE_KEYWORDS = {
     "상체": ["상체운동", "팔운동", "어깨운동"],
     "하체": ["하체운동", "스쿼트", "엉덩이운동"],
-    "코어": ["복근운동", "코어운동", "플랭크"],
+    "전신": ["전신운동", "다이어트운동", "홈트전신"],
+    "코어": ["코어운동", "플랭크", "코어강화"],
     "유산소": ["유산소운동", "홈트유산소", "살빼는운동"],
     "스트레칭": ["전신스트레칭", "아침스트레칭", "저녁스트레칭"],
     "요가": ["요가", "홈요가", "다이어트요가"],
-    "전신": ["전신운동", "다이어트운동", "홈트전신"],
+    "HIIT": ["HIIT", "타바타", "인터벌운동"],
+    "필라테스": ["필라테스", "홈필라테스", "매트필라테스"],
+    "복근": ["복근운동", "뱃살운동", "11자복근"],
+    "스트렝스": ["근력운동", "덤벨운동", "맨몸근력운동"],
     "기타": ["홈트레이닝", "건강운동", "다이어트운동"]
 }
 
+# ✅ 사용자에게 보여주는 카테고리 (main.py 키보드/매칭용) — "상관없음"은 랜덤 카테고리
+ANY_CATEGORY = "상관없음"
+YT_CATEGORIES = [c for c in YOUTUBE_KEYWORDS if c != "기타"] + [ANY_CATEGORY]
+
 # ✅ fallback 기본 추천 영상 (API 오류 시)
 FALLBACK_VIDEOS = [
     {
@@ -31,38 +44,201 @@ FALLBACK_VIDEOS = [
     }
 ]
 
-def fetch_youtube_videos(category="전신", max_results=15):
-    """카테고리별 실시간 유튜브 인기 영상 가져오기"""
+def _search_url(category: str, max_results: int) -> str:
     keyword = random.choice(YOUTUBE_KEYWORDS.get(category, ["홈트"]))
-    url = (
-        f"https://www.googleapis.com/youtube/v3/search"
+    return (
+        f"{YOUTUBE_API_BASE}/search"
         f"?part=snippet&maxResults={max_results}"
         f"&q={keyword}&regionCode=KR&type=video&order=viewCount"
         f"&key={YOUTUBE_API_KEY}"
     )
+
+def _parse_videos(data: dict) -> list:
+    videos = []
+    for item in data.get("items", []):
+        video_id = item["id"]["videoId"]
+        title = item["snippet"]["title"]
+        thumb = item["snippet"]["thumbnails"]["medium"]["url"]
+        link = f"https://www.youtube.com/watch?v={video_id}"
+        videos.append({
+            "title": title,
+            "link": link,
+            "thumbnail": thumb
+        })
+    return videos
+
+def fetch_youtube_videos(category="전신", max_results=15):
+    """카테고리별 실시간 유튜브 인기 영상 가져오기"""
+    import requests
     try:
-        res = requests.get(url, timeout=5)
-        res.raise_for_status()
-        data = res.json().get("items", [])
-        videos = []
-        for item in data:
-            video_id = item["id"]["videoId"]
-            title = item["snippet"]["title"]
-            thumb = item["snippet"]["thumbnails"]["medium"]["url"]
-            link = f"https://www.youtube.com/watch?v={video_id}"
-            videos.append({
-                "title": title,
-                "link": link,
-                "thumbnail": thumb
-            })
-        return videos or FALLBACK_VIDEOS
+        with UPSTREAM.time("youtube", "search"):
+            res = requests.get(_search_url(category, max_results), timeout=5)
+            res.raise_for_status()
+        return _parse_videos(res.json()) or FALLBACK_VIDEOS
     except Exception as e:
         print(f"[YouTube] API Error: {e}")
         return FALLBACK_VIDEOS
 
+async def afetch_youtube_videos(category="전신", max_results=15):
+    """fetch_youtube_videos의 비동기 버전"""
+    try:
+        with UPSTREAM.time("youtube", "search"):
+            data = await http_module.get_json(_search_url(category, max_results))
+        return _parse_videos(data) or FALLBACK_VIDEOS
+    except Exception as e:
+        print(f"[YouTube] API Error: {e}")
+        return FALLBACK_VIDEOS
+
+def _fetch_raw(category: str, max_results: int) -> list:
+    """풀 갱신용 동기 조회 (실패 시 예외 → 기존 풀 유지)"""
+    import requests
+    with UPSTREAM.time("youtube", "search"):
+        res = requests.get(_search_url(category, max_results), timeout=5)
+        res.raise_for_status()
+    return _parse_videos(res.json())
+
+async def _afetch_raw(category: str, max_results: int) -> list:
+    with UPSTREAM.time("youtube", "search"):
+        data = await http_module.get_json(_search_url(category, max_results))
+    return _parse_videos(data)
+
+
+# ===== 카테고리별 영상 풀 =====
+class VideoPool:
+    """
+    카테고리마다 search 결과를 메모리에 모아두고 랜덤 추천은 풀에서 바로 뽑음.
+    - refresh_interval마다 백그라운드에서 오래된 카테고리만 갱신 (run())
+    - search 1회 = SEARCH_COST unit, 하루 daily_quota를 넘기면 갱신 중단
+      → 기존(오래된) 풀 또는 FALLBACK_VIDEOS로 응답
+    - 쿼터는 YouTube 기준(태평양 시간 자정)으로 초기화
+    """
+    SEARCH_COST = 100
+
+    def __init__(self, daily_quota: int = YOUTUBE_DAILY_QUOTA,
+                 refresh_interval: float = YOUTUBE_POOL_REFRESH,
+                 pool_size: int = YOUTUBE_POOL_SIZE,
+                 clock=time.monotonic):
+        self.daily_quota = daily_quota
+        self.refresh_interval = refresh_interval
+        self.pool_size = pool_size
+        self._clock = clock
+        self._pools = {}        # category → {"videos": [...], "fetched_at": t}
+        self._quota_day = None
+        self.quota_used = 0
+        self._lock = threading.Lock()
+        self._refreshing = {}   # category → asyncio.Task (동시 갱신 합치기)
+        self._retry_at = {}     # category → 실패 후 재시도 가능 시각
+
+    # ----- 쿼터 -----
+    def _today(self) -> str:
+        return datetime.now(ZoneInfo("America/Los_Angeles")).strftime("%Y-%m-%d")
+
+    def _take_quota(self) -> bool:
+        with self._lock:
+            day = self._today()
+            if day != self._quota_day:
+                self._quota_day, self.quota_used = day, 0
+            if self.quota_used + self.SEARCH_COST > self.daily_quota:
+                return False
+            self.quota_used += self.SEARCH_COST
+            return True
+
+    # ----- 조회 -----
+    def _resolve(self, category: str) -> str:
+        if category == ANY_CATEGORY:
+            return random.choice(YT_CATEGORIES[:-1])
+        return category if category in YOUTUBE_KEYWORDS else "기타"
+
+    def is_stale(self, category: str) -> bool:
+        entry = self._pools.get(category)
+        return entry is None or self._clock() - entry["fetched_at"] >= self.refresh_interval
+
+    def needs_fetch(self, category: str) -> bool:
+        """풀이 비어 있고 최근 실패 직후가 아니면 True (요청 경로의 1회 조회용)"""
+        return category not in self._pools and self._clock() >= self._retry_at.get(category, 0)
+
+    def pick(self, category: str) -> dict:
+        entry = self._pools.get(self._resolve(category))
+        return random.choice(entry["videos"] if entry else FALLBACK_VIDEOS)
+
+    def _store(self, category: str, videos: list) -> None:
+        if not videos:
+            return
+        old = self._pools.get(category, {}).get("videos", [])
+        seen, merged = set(), []
+        for v in videos + old:              # 새 결과 우선, 이전 결과로 채움
+            if v["link"] not in seen:
+                seen.add(v["link"])
+                merged.append(v)
+        self._pools[category] = {"videos": merged[:self.pool_size], "fetched_at": self._clock()}
+
+    # ----- 갱신 -----
+    def refresh_sync(self, category: str) -> bool:
+        if not self._take_quota():
+            return False
+        try:
+            self._store(category, _fetch_raw(category, self.pool_size))
+            return True
+        except Exception as e:
+            print(f"[YouTube] API Error: {e}")
+            self._retry_at[category] = self._clock() + 300
+            return False
+
+    async def refresh(self, category: str) -> bool:
+        task = self._refreshing.get(category)
+        if task is None or task.done():
+            task = self._refreshing[category] = asyncio.ensure_future(self._refresh(category))
+        return await asyncio.shield(task)
+
+    async def _refresh(self, category: str) -> bool:
+        if not self._take_quota():
+            return False
+        try:
+            self._store(category, await _afetch_raw(category, self.pool_size))
+            return True
+        except Exception as e:
+            print(f"[YouTube] API Error: {e}")
+            self._retry_at[category] = self._clock() + 300
+            return False
+
+    async def refresh_stale(self) -> int:
+        """오래된 카테고리만 갱신. 갱신한 수 반환."""
+        done = 0
+        for category in YOUTUBE_KEYWORDS:
+            if self.is_stale(category):
+                if not await self.refresh(category):
+                    break                   # 쿼터 소진/오류 → 다음 주기에 재시도
+                done += 1
+        return done
+
+    async def run(self, check_every: float = 600) -> None:
+        """백그라운드 갱신 루프 (asyncio.create_task(video_pool.run()))"""
+        while True:
+            try:
+                await self.refresh_stale()
+            except Exception as e:
+                print(f"[YouTube] 풀 갱신 실패: {e}")
+            await asyncio.sleep(check_every)
+
+    def stats(self) -> dict:
+        return {
+            "quota_used": self.quota_used,
+            "daily_quota": self.daily_quota,
+            "pools": {c: len(e["videos"]) for c, e in self._pools.items()},
+        }
+
+
+video_pool = VideoPool()
+
 def get_random_video(category="전신"):
-    """카테고리 랜덤 추천"""
-    videos = fetch_youtube_videos(category)
-    if not videos:
-        return random.choice(FALLBACK_VIDEOS)
-    return random.choice(videos)
+    """카테고리 랜덤 추천 (풀에서 뽑기, 풀이 비었을 때만 1회 조회)"""
+    category = video_pool._resolve(category)
+    if video_pool.needs_fetch(category):
+        video_pool.refresh_sync(category)
+    return video_pool.pick(category)
+
+async def aget_random_video(category="전신"):
+    category = video_pool._resolve(category)
+    if video_pool.needs_fetch(category):
+        await video_pool.refresh(category)
+    return video_pool.pick(category)
@@ -2,21 +2,25 @@
 # NYFITCOACH_BOT/server_app.py
 # -------------------------------
 import os
+import hmac
 import asyncio
+import importlib
 import logging
-import json
-from datetime import datetime, date
-import nest_asyncio
-import requests
+from datetime import datetime
 from dotenv import load_dotenv
-from fastapi import FastAPI
-from main import main  # 👈 텔레그램 봇 실행 함수 (_main.py 이름이 main.py로 되어 있음)
+from fastapi import FastAPI, HTTPException, Request, Response
+from modules.user_module import flush_users, store_disk_sig
+from modules.stats_module import user_stats
+from config.env import USER_BACKEND, BOT_MODE, WEBHOOK_SECRET, TELEGRAM_API_BASE
+from modules.http_module import post, close_http
+from modules.alert_module import AlertQueue
+from modules import metrics_module
 
 # ==============================
 # 1️⃣ 환경 설정 및 로그 포맷
 # ==============================
-load_dotenv()              
-nest_asyncio.apply()        
+load_dotenv()
+# main(텔레그램 봇)·weather_module(PIL)은 /health가 먼저 뜨도록 기동 후 백그라운드에서 import
 
 logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(message)s",
@@ -40,6 +44,11 @@ app = FastAPI(
 START_TIME = datetime.now()
 BOT_STATUS = {"running": False, "last_check": None, "users": 0}
 LAST_USER_COUNT = 0
+BACKGROUND_TASKS = []
+BOT_APP = None               # webhook 모드: 업데이트를 넣을 telegram Application
+
+STATS_REFRESH_INTERVAL = 30  # users.json 외부 변경 확인 주기(초)
+ALERT_WINDOW = 300           # 유저 증감 알림을 묶는 시간(초)
 
 ADMIN_ID = os.getenv("ADMIN_ID")  # 👈 너의 텔레그램 ID (봇이 관리자에게 알림 전송)
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -49,59 +58,50 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 # 4️⃣ 데이터 로드 유틸
 # ==============================
 def get_user_data():
-    """data/users.json을 읽어서 (유저수, 유저이름리스트, 오늘활성유저수) 반환"""
-    path = os.path.join("data", "users.json")
-    if not os.path.exists(path):
-        return 0, [], 0
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, dict):
-            return 0, [], 0
-
-        users = list(data.keys())
-        today_str = date.today().isoformat()
-        today_active = 0
-
-        # 각 유저의 마지막 활동일자 계산
-        for user_id, user_info in data.items():
-            last_time = user_info.get("last_active") or user_info.get("updated_at")
-            if last_time and str(last_time).startswith(today_str):
-                today_active += 1
+    """(유저수, 최근 가입자 리스트, 오늘활성유저수) — 메모리 통계에서 바로 반환 (파일 I/O 없음)"""
+    return user_stats.registered, user_stats.recent(), user_stats.today_active
 
-        return len(users), users, today_active
 
-    except Exception as e:
-        logger.error(f"❌ 사용자 데이터 로드 오류: {e}")
-        return 0, [], 0
+async def watch_user_file(interval: float = STATS_REFRESH_INTERVAL):
+    """다른 프로세스(web_app 등)가 users.json을 바꿨을 때만 통계 재집계
+    (파일 버전 비교 — 이 프로세스의 write-behind flush로 바뀐 건 제외)"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if USER_BACKEND == "json":
+                await asyncio.to_thread(user_stats.refresh_if_modified, own_sig=store_disk_sig())
+            elif USER_BACKEND == "sharded":     # 폴더별 _index.json (바뀐 폴더만 다시 읽음)
+                await asyncio.to_thread(user_stats.load)
+        except Exception as e:
+            logger.error(f"❌ 사용자 통계 갱신 오류: {e}")
 
 
-def send_admin_alert(message: str):
-    """관리자에게 텔레그램 알림 전송"""
+async def asend_admin_alert(message: str):
+    """관리자에게 텔레그램 알림 전송 (admin_alerts 큐가 호출, 실패는 큐에서 기록)"""
     if not (BOT_TOKEN and ADMIN_ID):
         return
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+    url = f"{TELEGRAM_API_BASE}/bot{BOT_TOKEN}/sendMessage"
     payload = {"chat_id": ADMIN_ID, "text": message}
-    try:
-        requests.post(url, data=payload)
-    except Exception as e:
-        logger.error(f"⚠️ 관리자 알림 실패: {e}")
+    status = await post(url, data=payload)
+    if status >= 400:
+        raise RuntimeError(f"Telegram HTTP {status}")
+
+
+# 핸들러는 큐에 넣기만 하고 바로 반환 — 발송은 백그라운드 태스크 (타임아웃 5초, 최대 100건)
+admin_alerts = AlertQueue(asend_admin_alert, window=ALERT_WINDOW, maxsize=100, timeout=5)
 
 
 def log_user_change():
-    """유저 수가 변하면 로그 + 관리자 알림"""
+    """유저 수가 변하면 로그 + 관리자 알림 (ALERT_WINDOW 동안 묶어서 한 번에)"""
     global LAST_USER_COUNT
     count, users, _ = get_user_data()
     if count != LAST_USER_COUNT:
         diff = count - LAST_USER_COUNT
         if diff > 0:
-            msg = f"🟢 새로운 유저 {diff}명 추가됨 (총 {count}명)"
-            logger.info(msg)
-            send_admin_alert(f"[NYFitCoach 알림]\n{msg}\n최근 가입자: {users[-1] if users else '알 수 없음'}")
-        elif diff < 0:
-            msg = f"🔴 유저 {abs(diff)}명 감소 (현재 {count}명)"
-            logger.warning(msg)
-            send_admin_alert(f"[NYFitCoach 알림]\n{msg}")
+            logger.info(f"🟢 새로운 유저 {diff}명 추가됨 (총 {count}명)")
+        else:
+            logger.warning(f"🔴 유저 {abs(diff)}명 감소 (현재 {count}명)")
+        admin_alerts.add_users(diff, count, users[-1] if users else None)
         LAST_USER_COUNT = count
 
 
@@ -126,19 +126,22 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Render 헬스체크 엔드포인트"""
-    log_user_change()
+    log_user_change()   # 네트워크 호출 없이 큐에만 기록
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
 
 @app.get("/info")
 async def info():
     """서버 상태 전체 요약"""
+    from modules.weather_module import weather_cache_stats
+    from modules.youtube_module import video_pool
     uptime = datetime.now() - START_TIME
     user_count, users, today_active = get_user_data()
     return {
         "version": "1.5.0",
         "uptime": str(uptime).split('.')[0],
         "telegram_bot": BOT_STATUS,
+        "bot_mode": BOT_MODE,
         "env_loaded": {
             "BOT_TOKEN": bool(os.getenv("BOT_TOKEN")),
             "WEATHER_KEY": bool(os.getenv("WEATHER_KEY")),
@@ -146,13 +149,60 @@ async def info():
         },
         "registered_users": user_count,
         "today_active_users": today_active,
-        "recent_users": users[-3:] if users else []
+        "recent_users": users[-3:] if users else [],
+        "weather_cache": weather_cache_stats(),
+        "youtube_pool": video_pool.stats(),
+        "admin_alerts": admin_alerts.stats(),
     }
 
 
+def _server_metrics() -> dict:
+    """scrape 때 읽는 서버 상태 (메모리 값만)"""
+    user_count, _, today_active = get_user_data()
+    values = {
+        "nyfit_uptime_seconds": ("gauge", "서버 가동 시간(초)", (datetime.now() - START_TIME).total_seconds()),
+        "nyfit_registered_users": ("gauge", "등록 유저 수", user_count),
+        "nyfit_today_active_users": ("gauge", "오늘 활동한 유저 수", today_active),
+    }
+    if BOT_APP is not None:     # webhook 모드: 채팅 순서 대기 중인 업데이트 포함
+        stats = BOT_APP.update_processor.stats()
+        values["nyfit_updates_in_flight"] = ("gauge", "처리 중인 텔레그램 업데이트 수", stats["in_flight"])
+        values["nyfit_chats_waiting"] = ("gauge", "업데이트가 대기/처리 중인 채팅 수", stats["chats_waiting"])
+    return values
+
+metrics_module.REGISTRY.collector(_server_metrics)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape 엔드포인트 (핸들러 / 저장소 I/O / 외부 API / 카드 생성 지연 히스토그램)"""
+    return Response(metrics_module.render(), media_type=metrics_module.CONTENT_TYPE)
+
+
 # ==============================
 # 6️⃣ 서버 이벤트
 # ==============================
+async def start_bot():
+    """텔레그램 봇 import(무거움)는 스레드에서 → 그동안에도 이벤트 루프는 /health에 응답"""
+    global BOT_APP
+    try:
+        bot = await asyncio.to_thread(importlib.import_module, "main")
+        if BOT_MODE != "webhook":
+            await bot.main()
+            return
+        BOT_APP, stop = await bot.start_webhook()
+        try:
+            await asyncio.Event().wait()        # 종료 시 cancel될 때까지 유지
+        finally:
+            BOT_APP = None
+            await stop()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        BOT_STATUS["running"] = False
+        logger.error(f"❌ 텔레그램 봇 실행 오류: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """서버 시작 시 텔레그램 봇 실행"""
@@ -161,14 +211,18 @@ async def startup_event():
         BOT_STATUS["running"] = True
         BOT_STATUS["last_check"] = datetime.now().isoformat()
 
+        await asyncio.to_thread(user_stats.load)   # 시작 시 1회 전체 집계, 이후엔 쓰기 경로로 갱신
+        user_stats.attach()
+        BACKGROUND_TASKS.append(asyncio.create_task(watch_user_file()))
         user_count, _, today_active = get_user_data()
         BOT_STATUS["users"] = user_count
         global LAST_USER_COUNT
         LAST_USER_COUNT = user_count
 
-        asyncio.create_task(main())
+        BACKGROUND_TASKS.append(asyncio.create_task(start_bot()))
+        BACKGROUND_TASKS.append(asyncio.create_task(admin_alerts.run()))
         logger.info(f"✅ 현재 등록된 사용자 수: {user_count}명 (오늘 활성: {today_active}명)")
-        send_admin_alert(f"✅ NYFitCoach 서버 시작됨!\n총 유저: {user_count}명\n오늘 활성: {today_active}명")
+        admin_alerts.push(f"✅ NYFitCoach 서버 시작됨!\n총 유저: {user_count}명\n오늘 활성: {today_active}명")
     except Exception as e:
         BOT_STATUS["running"] = False
         logger.error(f"❌ 텔레그램 봇 실행 오류: {e}")
@@ -178,7 +232,14 @@ async def startup_event():
 async def shutdown_event():
     """서버 종료 로그"""
     logger.warning("🛑 서버 종료됨. Telegram 봇 세션 종료 중...")
-    send_admin_alert("⚠️ NYFitCoach 서버가 종료되었습니다.")
+    flush_users()
+    for task in BACKGROUND_TASKS:
+        task.cancel()
+    if BACKGROUND_TASKS:
+        await asyncio.wait(BACKGROUND_TASKS, timeout=5)   # 봇 정리(webhook 해제 전 저장 등) 대기
+    admin_alerts.push("⚠️ NYFitCoach 서버가 종료되었습니다.")
+    await admin_alerts.close(timeout=5)
+    await close_http()
 
 
 @app.get("/status")
@@ -194,3 +255,26 @@ async def bot_status():
         "recent_users": users[-3:] if users else [],
         "uptime": str(uptime).split('.')[0]
     }
+
+
+# ==============================
+# 7️⃣ 텔레그램 webhook (BOT_MODE=webhook)
+# ==============================
+@app.post("/telegram/{secret}")
+async def telegram_webhook(secret: str, request: Request):
+    """텔레그램 → 업데이트 JSON. 큐에 넣고 바로 200 (처리는 ChatOrderedProcessor가 동시에)"""
+    if BOT_MODE != "webhook" or not WEBHOOK_SECRET or not hmac.compare_digest(secret, WEBHOOK_SECRET):
+        raise HTTPException(status_code=404)
+    token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+    if not hmac.compare_digest(token, WEBHOOK_SECRET):
+        raise HTTPException(status_code=403)
+    if BOT_APP is None:
+        raise HTTPException(status_code=503, detail="bot starting")   # 텔레그램이 나중에 재전송
+    from telegram import Update
+    try:
+        update = Update.de_json(await request.json(), BOT_APP.bot)
+    except Exception as e:
+        logger.warning(f"⚠️ 잘못된 업데이트 무시: {e}")
+        return {"ok": False}
+    await BOT_APP.update_queue.put(update)
+    return {"ok": True}
@@ -0,0 +1,30 @@
+# test/conftest.py
+import json
+
+import pytest
+
+from modules import user_module as um
+
+
+@pytest.fixture
+def seed_user():
+    """users.json에 미리 넣어 둘 유저 1의 필드 (기본값 위에 덮어씀) — 테스트 파일에서 재정의"""
+    return {}
+
+
+@pytest.fixture
+def store_options():
+    """open_store 옵션 — 기본은 자동 flush 끔 (flush_users()/close 때만 저장)"""
+    return {"flush_interval": 3600, "flush_threshold": 1000}
+
+
+@pytest.fixture
+def store(tmp_path, seed_user, store_options):
+    """임시 users.json(유저 1 포함)으로 JSON 저장소 오픈, 끝나면 닫기"""
+    path = tmp_path / "users.json"
+    u = um._default_user(1)
+    u.update(seed_user)
+    path.write_text(json.dumps({"1": u}, ensure_ascii=False), encoding="utf-8")
+    s = um.open_store(str(path), **store_options)
+    yield s
+    um.close_store()
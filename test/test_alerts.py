@@ -0,0 +1,73 @@
+# test/test_alerts.py
+import asyncio, time
+
+from modules.alert_module import AlertQueue
+
+
+def test_user_changes_coalesce_into_one_alert():
+    sent = []
+
+    async def send(text):
+        sent.append(text)
+
+    async def scenario():
+        q = AlertQueue(send, window=0.1)
+        task = asyncio.create_task(q.run())
+        for total in range(11, 16):             # 헬스체크 5번 동안 1명씩 가입
+            q.add_users(1, total, f"user{total}")
+        q.add_users(-1, 14)
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert len(sent) == 1
+    assert "새 유저 +5명 (총 14명)" in sent[0] and "최근 가입자: user15" in sent[0]
+    assert "유저 1명 감소" in sent[0]
+
+
+def test_push_never_waits_on_slow_send():
+    async def slow_send(text):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        q = AlertQueue(slow_send, maxsize=2, timeout=0.05)
+        task = asyncio.create_task(q.run())
+        start = time.perf_counter()
+        results = [q.push(f"알림 {i}") for i in range(5)]
+        assert time.perf_counter() - start < 0.01
+        await asyncio.sleep(0.3)
+        task.cancel()
+        return q, results
+
+    q, results = asyncio.run(scenario())
+    assert results == [True, True, False, False, False]     # 크기 제한
+    assert q.failed == 2 and q.sent == 0                     # 발송은 timeout으로 끊김
+
+
+def test_close_flushes_pending_summary():
+    sent = []
+
+    async def send(text):
+        sent.append(text)
+
+    async def scenario():
+        q = AlertQueue(send, window=3600)
+        q.add_users(3, 3, "나연")
+        q.push("⚠️ 종료")
+        await q.close(timeout=1)
+
+    asyncio.run(scenario())
+    assert sent[0] == "⚠️ 종료" and "+3명" in sent[1]
+
+
+def test_health_returns_without_network(monkeypatch):
+    import server_app
+
+    async def never(text):
+        raise AssertionError("health must not send")
+
+    monkeypatch.setattr(server_app, "admin_alerts", AlertQueue(never))
+    monkeypatch.setattr(server_app, "LAST_USER_COUNT", -1)
+    res = asyncio.run(server_app.health_check())
+    assert res["status"] == "ok"
+    assert server_app.admin_alerts.stats()["queued"] == 1     # 묶음 마감 시각 알림만 큐에
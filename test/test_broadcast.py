@@ -0,0 +1,94 @@
+# test/test_broadcast.py
+import asyncio, io, time
+
+from telegram.error import Forbidden, RetryAfter, TimedOut
+
+from modules.broadcast_module import Broadcaster, TokenBucket
+
+
+class FakeBot:
+    """텔레그램 대신 호출을 기록. flood=[chat_id, ...]면 그 채팅 첫 발송에 RetryAfter"""
+
+    def __init__(self, flood=(), blocked=(), flaky=()):
+        self.sent = []
+        self.flood = set(flood)
+        self.blocked = set(blocked)
+        self.flaky = set(flaky)
+
+    async def _send(self, kind, chat_id, **kw):
+        if chat_id in self.blocked:
+            raise Forbidden("bot was blocked by the user")
+        if chat_id in self.flood:
+            self.flood.discard(chat_id)
+            raise RetryAfter(1)
+        if chat_id in self.flaky:
+            self.flaky.discard(chat_id)
+            raise TimedOut()
+        if "photo" in kw:
+            kw["photo"] = kw["photo"].read()
+        self.sent.append((time.monotonic(), kind, chat_id, kw))
+
+    async def send_message(self, chat_id, **kw):
+        await self._send("message", chat_id, **kw)
+
+    async def send_photo(self, chat_id, **kw):
+        await self._send("photo", chat_id, **kw)
+
+
+async def _prepare(job):
+    await asyncio.sleep(0.01)           # 날씨/카드 준비 흉내
+    return job, [("send_photo", {"photo": io.BytesIO(b"PNG"), "caption": "오늘"}),
+                 ("send_message", {"text": "코치"})]
+
+
+def test_token_bucket_reserves_in_order():
+    now = [0.0]
+    b = TokenBucket(rate=10, capacity=2, clock=lambda: now[0])
+    assert [b.reserve() for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    now[0] = 1.0
+    assert b.reserve() == 0.0
+
+
+def test_broadcast_respects_chat_limit():
+    bot = FakeBot()
+    bc = Broadcaster(bot, global_rate=100, chat_rate=20, concurrency=50)
+    stats = asyncio.run(bc.broadcast(range(40), _prepare))
+    assert stats["sent"] == 40 and stats["messages"] == 80 and stats["failed"] == 0
+
+    for chat in (0, 39):
+        t = [t for t, _, c, _ in bot.sent if c == chat]
+        assert t[1] - t[0] >= 1 / 20 - 0.01              # 같은 채팅은 chat_rate 간격
+
+
+def test_global_limit_spreads_burst():
+    bot = FakeBot()
+    bc = Broadcaster(bot, global_rate=50, chat_rate=50, concurrency=100)
+    start = time.monotonic()
+    asyncio.run(bc.broadcast(range(50), _prepare))         # 100건 / 초당 50 (버킷 50)
+    assert time.monotonic() - start >= 0.9
+
+
+def test_retry_after_and_network_errors_are_retried():
+    bot = FakeBot(flood=[1], flaky=[2], blocked=[3])
+    bc = Broadcaster(bot, global_rate=1000, chat_rate=1000, backoff=0.01)
+    progress = []
+    start = time.monotonic()
+    stats = asyncio.run(bc.broadcast([1, 2, 3, 4], _prepare, on_progress=progress.append, progress_every=2))
+    assert (stats["sent"], stats["failed"], stats["retries"]) == (3, 1, 2)
+    assert [p["done"] for p in progress] == [2, 4]
+    photos = [kw["photo"] for _, kind, c, kw in bot.sent if kind == "photo"]
+    assert photos == [b"PNG"] * 3                          # 재시도해도 사진을 처음부터 보냄
+    assert min(t for t, *_ in bot.sent) - start >= 0.9    # RetryAfter(1) 동안 전체 발송 멈춤
+
+
+def test_persistent_flood_gives_up_after_max_retries():
+    class FloodBot(FakeBot):
+        async def _send(self, kind, chat_id, **kw):
+            self.sent.append((time.monotonic(), kind, chat_id, kw))
+            raise RetryAfter(0)
+
+    bot = FloodBot()
+    bc = Broadcaster(bot, global_rate=1000, chat_rate=1000, max_retries=2)
+    stats = asyncio.run(asyncio.wait_for(bc.broadcast([1, 2], _prepare), 5))
+    assert (stats["sent"], stats["failed"]) == (0, 2)
+    assert len(bot.sent) == 2 * 3                          # 첫 시도 + 재시도 2번에서 멈춤
@@ -0,0 +1,49 @@
+# test/test_chat_log.py
+import json
+
+from modules import chat_log as cl
+from modules.chat_log import ChatLog
+
+
+def test_append_writes_one_line_per_message(tmp_path):
+    log = ChatLog(str(tmp_path))
+    log.append("나연", "user", "홈트")
+    log.append("나연", "bot", "카테고리를 골라줘 💪")
+    lines = (tmp_path / "chat_나연.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["role"] for l in lines] == ["user", "bot"]
+
+
+def test_tail_pages_backwards_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(cl, "BLOCK", 64)            # 블록 경계를 여러 번 넘게
+    log = ChatLog(str(tmp_path))
+    for i in range(100):
+        log.append("u", "user", f"메시지 {i}")
+
+    msgs, start = log.tail("u", 10)
+    assert [m["text"] for m in msgs] == [f"메시지 {i}" for i in range(90, 100)]
+    older, start2 = log.tail("u", 10, end=start)
+    assert [m["text"] for m in older] == [f"메시지 {i}" for i in range(80, 90)]
+    rest, start3 = log.tail("u", 500, end=start2)
+    assert len(rest) == 80 and start3 == 0
+
+
+def test_tail_skips_partial_last_line(tmp_path):
+    log = ChatLog(str(tmp_path))
+    log.append("u", "user", "완료")
+    with open(log.path("u"), "a", encoding="utf-8") as f:
+        f.write('{"time": "2025-11-12T09:4')          # 쓰다 만 줄
+    msgs, start = log.tail("u", 5)
+    assert [m["text"] for m in msgs] == ["완료"] and start == 0
+
+
+def test_migrate_legacy_json_once(tmp_path):
+    legacy = [{"time": "2025-11-12T09:42:21", "role": "user", "text": "오늘 날씨 어때?"},
+              {"time": "2025-11-12T09:42:22", "role": "bot", "text": "☀️"}]
+    (tmp_path / "chat_나연.json").write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+    log = ChatLog(str(tmp_path))
+    log.append("나연", "user", "새 메시지")           # 변환 전에 새 형식으로 쌓인 것
+    assert log.migrate_all() == 1
+    assert log.migrate("나연") is False
+    msgs, _ = log.tail("나연", 10)
+    assert [m["text"] for m in msgs] == ["오늘 날씨 어때?", "☀️", "새 메시지"]
+    assert (tmp_path / "chat_나연.json.bak").exists()
@@ -0,0 +1,51 @@
+# test/test_coach.py
+import itertools, random
+
+import pytest
+
+from modules import coach_module as cm
+
+CASES = list(itertools.product(
+    ["friendly", "coach", "healing", None],
+    ["Clear", "Rain", "Clouds"],
+    [-2, 18, 33],
+    [True, False],
+    [None, "좋음", "피곤"],
+    [None, True, False],
+))
+
+
+def test_batch_matches_single_calls_for_same_seed():
+    random.seed(42)
+    single = [cm.build_coach_message(t, w, temp, o, did, cond) for t, w, temp, o, cond, did in CASES]
+    random.seed(42)
+    batch = cm.build_coach_messages_batch(CASES)
+    assert batch == single
+    assert cm.build_coach_messages_batch(CASES[:5], rng=random.Random(1)) == \
+        cm.build_coach_messages_batch(CASES[:5], rng=random.Random(1))
+
+
+def test_message_layout_per_tone():
+    random.seed(0)
+    lines = cm.build_coach_message("coach", "Rain", 12, False, condition="피곤").split("\n")
+    assert lines[0] in cm.COACH_POOL["intro"]
+    assert lines[1:4] == [cm.WEATHER_LINES["bad"], cm.CONDITION_LINES["피곤"], cm.ENV_LINES[False]]
+    assert lines[4] in cm.COACH_POOL["motivate"]
+
+    healing = cm.build_coach_message("healing", "Clear", 35, True).split("\n")
+    assert healing[1] == cm.WEATHER_LINES["hot"] and healing[3] in cm.HEALING_POOL["rest"]
+
+
+def test_pools_are_read_only():
+    with pytest.raises(TypeError):
+        cm.TONE_POOLS["friendly"] = {}
+    with pytest.raises(TypeError):
+        cm.FRIENDLY_POOL["intro"] = ()
+    assert isinstance(cm.FRIENDLY_POOL["intro"], tuple)
+
+
+def test_free_form_conditions_share_default_layout():
+    before = cm._layout.cache_info().currsize
+    msgs = [cm.build_coach_message("coach", "Clear", 20, True, condition=f"메모 {i}") for i in range(50)]
+    assert cm._layout.cache_info().currsize - before <= 1       # 입력마다 캐시가 늘지 않음
+    assert all(cm.CONDITION_DEFAULT in m for m in msgs)
@@ -0,0 +1,75 @@
+# test/test_geo.py
+import asyncio
+
+import pytest
+
+from modules import geo_module as geo
+from modules.geo_module import GeocodeCache, Place, RegionIndex
+from modules.location_module import clean_city_text
+
+
+@pytest.fixture(scope="module")
+def index():
+    return RegionIndex.load()
+
+
+# ===== 로컬 색인 =====
+@pytest.mark.parametrize("text, expected", [
+    ("서울", "서울특별시"),
+    ("성남시 수정구", "경기도 성남시 수정구"),
+    ("성남시수정구", "경기도 성남시 수정구"),
+    ("경기도 성남시 수정구 수정로 157", "경기도 성남시 수정구"),
+    ("분당", "경기도 성남시 분당구"),
+    ("해운", "부산광역시 해운대구"),                # 접두어 → 가장 상위 지역
+    ("헤운대", "부산광역시 해운대구"),              # 오타 1글자
+    ("대구 중구", "대구광역시 중구"),
+    ("중구", "서울특별시 중구"),                    # 같은 이름은 파일 순서 우선
+    ("전라북도 전주시", "전북특별자치도 전주시"),
+    ("내가 사는 곳은 부산이야", "부산광역시"),
+])
+def test_lookup(index, text, expected):
+    assert index.lookup(text).name == expected
+
+
+@pytest.mark.parametrize("text", ["", "   ", "동탄", "나연", "Tokyo"])
+def test_lookup_miss(index, text):
+    assert index.lookup(text) is None
+
+
+def test_clean_city_text():
+    assert clean_city_text(" 내 도시는 서울이야 ") == "내  서울"     # "도시는"이 "도시"보다 먼저
+    assert clean_city_text("여기는 부산입니다") == "부산"
+
+
+# ===== 원격 geocoding + 영구 캐시 =====
+def test_remote_result_is_persisted(tmp_path, monkeypatch):
+    path = tmp_path / "geocode_cache.json"
+    monkeypatch.setattr(geo, "geocode_cache", GeocodeCache(str(path)))
+    calls = []
+
+    async def fake_get_json(url, params=None, timeout=None):
+        calls.append(url)
+        return [{"name": "Hwaseong", "local_names": {"ko": "화성시"}, "lat": 37.19949, "lon": 127.0566}]
+
+    monkeypatch.setattr(geo.http_module, "get_json", fake_get_json)
+    place = asyncio.run(geo.ageocode("동탄"))
+    assert place == Place("화성시", 37.1995, 127.0566, "remote")
+    assert asyncio.run(geo.ageocode("동탄")).source == "cache"
+    assert len(calls) == 1
+
+    reloaded = GeocodeCache(str(path))                  # 재시작 후에도 원격 호출 없음
+    assert reloaded.get("동탄") == Place("화성시", 37.1995, 127.0566, "cache")
+
+
+def test_remote_miss_is_remembered(tmp_path, monkeypatch):
+    monkeypatch.setattr(geo, "geocode_cache", GeocodeCache(str(tmp_path / "c.json")))
+    calls = []
+
+    async def fake_get_json(url, params=None, timeout=None):
+        calls.append(url)
+        return []
+
+    monkeypatch.setattr(geo.http_module, "get_json", fake_get_json)
+    assert asyncio.run(geo.ageocode("없는동네")) is None
+    assert asyncio.run(geo.ageocode("없는동네")) is None
+    assert len(calls) == 1 and not (tmp_path / "c.json").exists()
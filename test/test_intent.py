@@ -0,0 +1,30 @@
+# test/test_intent.py
+import pytest
+
+from modules.intent_module import Intent, IntentRouter, route
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("도움말", Intent("help")),
+    (" Help ", Intent("help")),
+    ("도움말 좀 보여줘 요가", Intent("video", "요가")),   # help는 메시지 전체일 때만
+    ("홈트", Intent("home_workout")),
+    ("요가 말고 홈트 뭐 있어?", Intent("home_workout")),  # 홈트가 영상보다 우선
+    ("스트레칭", Intent("video", "스트레칭")),
+    ("오늘은 hiit 할래", Intent("video", "HIIT")),
+    ("오늘 날씨 어때?", Intent("weather")),
+    ("날씨", Intent("weather")),
+    ("내일날씨어때?", Intent("weather_tomorrow")),
+    ("내일 날씨 보고 하체 할까", Intent("video", "하체")),
+    ("운동하자", Intent("workout")),
+    ("오늘 날씨 좋은데 운동 하자!", Intent("weather")),
+    ("안녕", None),
+    ("", None),
+])
+def test_route(text, expected):
+    assert route(text) == expected
+
+
+def test_longest_category_wins():
+    r = IntentRouter(["코어", "코어강화"])
+    assert r.route("코어강화 영상") == Intent("video", "코어강화")
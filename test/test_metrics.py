@@ -0,0 +1,72 @@
+# test/test_metrics.py
+import asyncio
+
+import httpx
+import pytest
+
+import server_app
+from modules import metrics_module as mm
+from modules import weather_module as wm
+
+OWM_NOW = {"weather": [{"main": "Clear", "description": "맑음"}],
+           "main": {"temp": 21.34, "feels_like": 20.01}}
+
+
+def _sample(text: str, line_prefix: str) -> float:
+    for line in text.splitlines():
+        if line.startswith(line_prefix + " "):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"{line_prefix} 없음")
+
+
+def test_timer_histogram_errors_and_in_flight():
+    t = mm.Timer("t_op", "테스트 구간", ("kind",), buckets=(0.01, 0.1), registry=mm.Registry())
+
+    @t.wrap("async")
+    async def work(fail):
+        assert t.in_flight("async") >= 1
+        await asyncio.sleep(0.02)
+        if fail:
+            raise RuntimeError("x")
+
+    async def scenario():
+        await asyncio.gather(work(False), work(False), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await work(True)
+
+    asyncio.run(scenario())
+    with t.time("sync"):
+        pass
+    assert (t.count("async"), t.error_count("async"), t.in_flight("async")) == (3, 1, 0)
+
+    text = "\n".join(t.render())
+    assert '# TYPE t_op_seconds histogram' in text
+    assert _sample(text, 't_op_seconds_bucket{kind="sync",le="0.01"}') == 1
+    assert _sample(text, 't_op_seconds_bucket{kind="async",le="0.01"}') == 0       # 버킷은 누적
+    assert _sample(text, 't_op_seconds_bucket{kind="async",le="+Inf"}') == 3
+    assert _sample(text, 't_op_seconds_count{kind="async"}') == 3
+    assert _sample(text, 't_op_errors_total{kind="async"}') == 1
+    assert _sample(text, 't_op_in_flight{kind="async"}') == 0
+
+
+def test_metrics_endpoint_exposes_upstream_and_server_state(monkeypatch):
+    wm._weather_cache.clear()
+
+    async def fake_get_json(url, params=None, timeout=None):
+        return OWM_NOW
+
+    monkeypatch.setattr(wm.http_module, "get_json", fake_get_json)
+    before = mm.UPSTREAM.count("owm", "weather")
+
+    async def scenario():
+        await wm.aget_weather("서울")
+        await wm.aget_weather("서울")           # 캐시 hit → upstream 호출 아님
+        transport = httpx.ASGITransport(app=server_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics")
+
+    res = asyncio.run(scenario())
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    count = _sample(res.text, 'nyfit_upstream_seconds_count{service="owm",endpoint="weather"}')
+    assert count == before + 1
+    assert "nyfit_registered_users " in res.text and "nyfit_uptime_seconds " in res.text
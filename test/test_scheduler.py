@@ -0,0 +1,69 @@
+# test/test_scheduler.py
+import asyncio
+from datetime import datetime
+
+from modules import user_module as um
+from modules.scheduler_module import NotificationScheduler
+
+MON_0630 = datetime(2026, 10, 19, 6, 30)    # 월요일
+SAT_0700 = datetime(2026, 10, 24, 7, 0)     # 토요일
+
+
+def test_default_user_in_0630_slot(store):
+    s = NotificationScheduler()
+    assert s.load() == 1
+    assert s.due(MON_0630) == [("1", "weather_only")]
+    assert s.due(MON_0630.replace(minute=31)) == []
+
+
+def test_combo_only_on_selected_days():
+    u = um._default_user(7)
+    u["notifications"]["combo"] = {"enabled": True, "time": "07:00", "days": ["Mon", "Sat"]}
+    s = NotificationScheduler()
+    s.index_user("7", u)
+    assert ("7", "combo") in s.due(SAT_0700)
+    assert ("7", "combo") not in s.due(SAT_0700.replace(day=25))   # 일요일
+
+
+def test_changes_reindex_only_that_user(store):
+    s = NotificationScheduler()
+    s.load()
+    s.attach()
+    try:
+        um.update_notification(1, "weather_only", time="07:15")
+        assert s.due(MON_0630) == []
+        assert s.due(MON_0630.replace(hour=7, minute=15)) == [("1", "weather_only")]
+
+        um.toggle_notifications(1, "none_on")
+        assert s.stats()["users"] == 0 and s.stats()["daily_slots"] == 0
+
+        um.get_user(2)                           # 새 유저도 바로 색인
+        assert s.due(MON_0630) == [("2", "weather_only")]
+    finally:
+        s.detach()
+
+
+def test_thousands_in_one_slot():
+    s = NotificationScheduler()
+    s.load({str(i): um._default_user(i) for i in range(5000)})
+    assert len(s.due(MON_0630)) == 5000
+    assert s.stats()["daily_slots"] == 1
+
+
+def test_tick_catches_up_missed_minutes():
+    s = NotificationScheduler()
+    s.load({"1": um._default_user(1)})
+    calls = []
+
+    async def dispatch(jobs, when):
+        calls.append((when.minute, jobs))
+
+    async def scenario():
+        await s.tick(dispatch, MON_0630.replace(minute=28))
+        await s.tick(dispatch, MON_0630.replace(minute=32, second=5))   # 29~32분을 한 번에 처리
+        await s.tick(dispatch, MON_0630.replace(minute=32, second=40))  # 같은 분은 다시 안 보냄
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert calls == [(30, [("1", "weather_only")])]
+    assert s.dispatched == 1
@@ -0,0 +1,64 @@
+# test/test_stats.py
+import json, os
+
+import pytest
+
+from modules import user_module as um
+from modules.stats_module import UserStats
+
+
+def test_write_path_updates_counts(store):
+    stats = UserStats()
+    assert stats.load() == 1
+    stats.attach()
+    try:
+        um.get_user(2)
+        um.get_user(3)
+        um.get_user(2)                          # 기존 유저 재조회는 가입 아님
+        assert stats.registered == 3 and stats.recent() == ["1", "2", "3"]
+        assert stats.today_active == 0
+        um.record_activity(3, "요가", 20)
+        um.record_activity(3, "요가", 10)
+        assert stats.today_active == 1
+    finally:
+        stats.detach()
+
+
+def test_endpoints_do_no_file_io(store, monkeypatch):
+    import builtins
+    import server_app
+    monkeypatch.setattr(server_app, "user_stats", UserStats())
+    server_app.user_stats.load()
+    monkeypatch.setattr(builtins, "open", lambda *a, **k: pytest.fail("file opened"))
+    assert server_app.get_user_data() == (1, ["1"], 0)
+
+
+def test_refresh_only_when_file_changes(tmp_path):
+    path = tmp_path / "users.json"
+    path.write_text(json.dumps({"a": {}, "b": {}}), encoding="utf-8")
+    stats = UserStats(recent_size=2)
+    assert stats.refresh_if_modified(str(path)) is True
+    assert stats.refresh_if_modified(str(path)) is False      # 그대로면 읽지 않음
+
+    path.write_text(json.dumps({"a": {}, "b": {}, "c": {"last_activity": {"date": stats._day}}}), encoding="utf-8")
+    os.utime(path, (1, 1))
+    assert stats.refresh_if_modified(str(path)) is True
+    assert (stats.registered, stats.today_active, stats.recent(5)) == (3, 1, ["b", "c"])
+
+
+def test_refresh_skips_own_flush(tmp_path):
+    path = tmp_path / "users.json"
+    s = um.open_store(str(path), flush_interval=3600, flush_threshold=1000)
+    try:
+        stats = UserStats()
+        um.update_user(1, "name", "나연")
+        um.flush_users()                                           # 이 프로세스의 write-behind
+        assert stats.refresh_if_modified(str(path), own_sig=um.store_disk_sig()) is False
+        assert stats.registered == 0                               # 다시 읽지 않음 (쓰기 경로 몫)
+
+        path.write_text(json.dumps({"1": {}, "2": {}}), encoding="utf-8")   # 외부 프로세스
+        os.utime(path, (1, 1))
+        assert stats.refresh_if_modified(str(path), own_sig=um.store_disk_sig()) is True
+        assert stats.registered == 2
+    finally:
+        um.close_store()
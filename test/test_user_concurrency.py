@@ -0,0 +1,89 @@
+# test/test_user_concurrency.py
+import asyncio, json, os, subprocess, sys, threading
+
+import pytest
+
+from modules import user_module as um
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def store_options():
+    return {"flush_interval": 0.05, "flush_threshold": 20}     # flush 스레드가 계속 도는 상태로
+
+
+# ===== 프로세스 안 =====
+def test_parallel_record_activity_threads(store):
+    threads = [threading.Thread(target=um.record_activity, args=(1, "요가")) for _ in range(300)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    u = um.get_user_data(1)
+    assert u["usage_stats"]["요가"] == 300 and u["activity"]["count_30d"] == 300
+    um.flush_users()
+    assert len(um.get_history(1)) == 300
+
+
+def test_async_handlers_increment_inside_mutate_user(store):
+    def bump(u):                                # 읽기와 쓰기가 같은 fn 안 → 사이에 끼어들 수 없음
+        u["temp_limit"] += 1
+
+    async def handler():
+        await asyncio.sleep(0)                  # 핸들러의 다른 await (외부 API 등)
+        um.mutate_user(1, bump, ("profile",))
+        await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(*(handler() for _ in range(200)),
+                             *(asyncio.to_thread(um.mutate_user, 1, bump) for _ in range(50)))
+
+    um.update_user(1, "temp_limit", 0)
+    asyncio.run(scenario())
+    assert um.get_user_data(1, "temp_limit") == 250
+
+
+def test_write_through_and_flush_threads_do_not_deadlock(tmp_path):
+    um.open_store(str(tmp_path / "users.json"), flush_interval=0)
+    try:
+        writer = threading.Thread(target=lambda: [um.update_user(1, "temp_limit", i) for i in range(200)], daemon=True)
+        flusher = threading.Thread(target=lambda: [um.flush_users() for _ in range(200)], daemon=True)
+        writer.start(); flusher.start()
+        writer.join(10); flusher.join(10)
+        assert not writer.is_alive() and not flusher.is_alive()
+        assert um.get_user_data(1, "temp_limit") == 199
+    finally:
+        um.close_store()
+
+
+# ===== 프로세스 간 =====
+WORKER = """
+import sys
+from modules import user_module as um
+path, backend, n = sys.argv[1], sys.argv[2], int(sys.argv[3])
+um.open_store(path, backend=backend, flush_interval=0.01, flush_threshold=5)
+for i in range(n):
+    um.record_activity(1, "요가")
+    um.update_notification(1, "combo", time=f"0{i % 10}:00")
+um.close_store()
+"""
+
+
+@pytest.mark.parametrize("backend, name", [("json", "users.json"), ("sqlite", "users.db"), ("sharded", "users")])
+def test_parallel_processes_do_not_lose_updates(tmp_path, backend, name):
+    path = str(tmp_path / name)
+    procs = [subprocess.Popen([sys.executable, "-c", WORKER, path, backend, "100"], cwd=ROOT)
+             for _ in range(4)]
+    assert [p.wait(60) for p in procs] == [0] * 4
+
+    s = um.open_store(path, backend=backend, flush_interval=0)
+    try:
+        u = um.get_user_data(1)
+        assert u["usage_stats"]["요가"] == 400
+        assert u["activity"]["count_30d"] == 400
+        assert u["notifications"]["combo"]["enabled"] is True
+        assert len(um.get_history(1)) == 400
+    finally:
+        um.close_store()
+    if backend == "json":
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["1"]["usage_stats"]["요가"] == 400
@@ -0,0 +1,91 @@
+# test/test_user_context.py
+import asyncio
+
+import pytest
+
+from modules import user_module as um
+from modules.user_context import UserContext, install_user_context, user_ctx
+
+
+@pytest.fixture
+def seed_user():
+    return {"name": "나연", "location": "성남시 수정구", "tone": "coach"}
+
+
+def test_reads_once_and_commits_once(store, monkeypatch):
+    ctx = UserContext(1)
+    monkeypatch.setattr(store, "get", lambda uid: pytest.fail("store read after load"))
+    assert (ctx.name, ctx.location, ctx.tone, ctx.temp_limit) == ("나연", "성남시 수정구", "coach", 5)
+    monkeypatch.undo()
+
+    saves = []
+    listener = lambda uid, u, parts: saves.append(parts)
+    um.on_user_change(listener)
+    try:
+        ctx.set("tone", "healing")
+        ctx.update(location="부산", temp_limit=3)
+        assert ctx.tone == "healing" and um.get_user_data(1, "tone") == "coach"   # commit 전엔 저장소 그대로
+        assert ctx.commit() is True
+        assert ctx.commit() is False
+    finally:
+        um.remove_user_listener(listener)
+    assert saves == [{"profile"}]
+    assert um.get_user_data(1, "location") == "부산"
+
+
+def test_telegram_handler_groups(store, monkeypatch):
+    from telegram import Update
+    from telegram.ext import ApplicationBuilder, ExtBot, MessageHandler, filters
+
+    async def offline(self):        # get_me 등 네트워크 호출 없이 초기화
+        pass
+    monkeypatch.setattr(ExtBot, "initialize", offline)
+    monkeypatch.setattr(ExtBot, "shutdown", offline)
+    app = ApplicationBuilder().token("123:TEST").build()
+    install_user_context(app)
+    seen = []
+
+    async def handler(update, context):
+        ctx = user_ctx(update, context)
+        seen.append(ctx.location)
+        ctx.set("name", "새이름")
+
+    app.add_handler(MessageHandler(filters.TEXT, handler))
+    update = Update.de_json({
+        "update_id": 1,
+        "message": {"message_id": 1, "date": 0, "text": "날씨",
+                    "chat": {"id": 1, "type": "private"},
+                    "from": {"id": 1, "is_bot": False, "first_name": "N"}},
+    }, app.bot)
+
+    async def scenario():
+        await app.initialize()
+        await app.process_update(update)
+        await app.shutdown()
+
+    asyncio.run(scenario())
+    assert seen == ["성남시 수정구"]
+    assert um.get_user_data(1, "name") == "새이름"              # 그룹 1에서 commit
+    assert app.user_data[1] == {}
+
+
+def test_same_user_concurrent_updates_keep_own_context(store):
+    from types import SimpleNamespace
+    from modules.user_context import _commit_context, _open_context
+
+    user_data = {}                  # PTB는 같은 유저면 채팅이 달라도 같은 dict
+    context = SimpleNamespace(user_data=user_data)
+    private, group = (SimpleNamespace(update_id=i, effective_user=SimpleNamespace(id=1)) for i in (10, 11))
+
+    async def scenario():
+        await _open_context(private, context)
+        await _open_context(group, context)              # 개인 채팅 처리 중 그룹 업데이트 도착
+        user_ctx(private, context).set("tone", "healing")
+        user_ctx(group, context).set("location", "부산")
+        await _commit_context(private, context)
+        assert um.get_user_data(1, "tone") == "healing" and um.get_user_data(1, "location") == "성남시 수정구"
+        await _commit_context(group, context)
+
+    asyncio.run(scenario())
+    assert (um.get_user_data(1, "tone"), um.get_user_data(1, "location")) == ("healing", "부산")
+    assert user_data == {}
@@ -0,0 +1,258 @@
+# test/test_user_module.py
+import json
+
+import pytest
+
+from modules import user_module as um
+
+
+def _on_disk(store):
+    with open(store.path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_writes_stay_in_memory_until_flush(store):
+    um.update_user(1, "name", "나연")
+    um.record_activity(2, "달리기", 30)
+    assert um.get_user(1)["name"] == "나연"
+    assert "2" not in _on_disk(store)           # 아직 파일엔 없음
+
+    assert um.flush_users() is True
+    disk = _on_disk(store)
+    assert disk["1"]["name"] == "나연"
+    assert disk["2"]["usage_stats"] == {"달리기": 1}
+    assert um.flush_users() is False            # dirty 없으면 쓰기 생략
+
+
+def test_flush_writes_outside_store_lock(store, monkeypatch):
+    import threading
+    writing, release = threading.Event(), threading.Event()
+    original = um._write_encoded
+
+    def slow_write(entries, path):
+        writing.set()
+        release.wait(5)
+        original(entries, path)
+
+    monkeypatch.setattr(um, "_write_encoded", slow_write)
+    um.update_user(1, "name", "나연")
+    t = threading.Thread(target=um.flush_users)
+    t.start()
+    assert writing.wait(5)
+    um.update_user(1, "name", "하늘")           # 파일 쓰는 중에도 막히지 않음
+    release.set()
+    t.join()
+    assert _on_disk(store)["1"]["name"] == "나연"   # 스냅샷 시점 값
+    assert um.flush_users() is True and _on_disk(store)["1"]["name"] == "하늘"
+
+
+def test_threshold_wakes_flusher(tmp_path):
+    path = tmp_path / "users.json"
+    s = um.open_store(str(path), flush_interval=3600, flush_threshold=3)
+    try:
+        for uid in range(3):
+            um.set_basic_profile(uid, name=f"u{uid}")   # 3명째에서 flush 스레드 깨움
+        for _ in range(100):
+            if s.flush_count:
+                break
+            s._closed.wait(0.01)
+        assert s.flush_count == 1
+        assert set(_on_disk(s)) == {"0", "1", "2"}
+    finally:
+        um.close_store()
+
+
+def test_close_flushes_pending(store):
+    um.update_notification(1, "combo", time="07:00", days=["월", "수"])
+    um.close_store()
+    combo = _on_disk(store)["1"]["notifications"]["combo"]
+    assert combo == {"enabled": True, "time": "07:00", "days": ["Mon", "Wed"]}
+
+
+def test_schema_upgrade_runs_once_at_open(tmp_path):
+    path = tmp_path / "users.json"
+    legacy = {"8534318866": {"name": "나연", "location": "성남시 수정구", "tone": "coach"}}
+    path.write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+    s = um.open_store(str(path), flush_interval=3600)
+    try:
+        u = s.get("8534318866")
+        assert u["schema_version"] == um.SCHEMA_VERSION
+        assert u["notifications"]["weather_only"]["time"] == "06:30"
+        assert u["location"] == "성남시 수정구"            # 기존 값 보존
+        assert s.dirty_count == 1                            # 업그레이드분만 저장 대기
+    finally:
+        um.close_store()
+    assert "routine" in json.loads(path.read_text(encoding="utf-8"))["8534318866"]
+
+
+def test_read_paths_do_not_write(store, monkeypatch):
+    um.flush_users()
+    writes = []
+    monkeypatch.setattr(um, "_write_db", lambda db, path=um.USERS_DB: writes.append(path))
+    store.flush_interval = 0                                 # write-through여도
+    for _ in range(10):
+        um.get_user(1)
+        um.get_user_data(1, "location")
+        um.get_user_data(1, "tone")
+        um.get_user_data(999, "tone")                        # 없는 유저도 생성 안 함
+    assert writes == []
+    assert store.get("999") is None
+
+
+# ===== SQLite 백엔드 =====
+@pytest.fixture
+def sqlite_store(tmp_path):
+    s = um.open_store(str(tmp_path / "users.db"), backend="sqlite")
+    yield s
+    um.close_store()
+
+
+def test_sqlite_round_trip(sqlite_store):
+    um.set_basic_profile(7, name="나연", location="부산", temp_limit="3")
+    um.update_favorites(7, ["요가", " 요가", "러닝"])
+    um.update_routine(7, "화요일", [{"type": "러닝", "minutes": "30"}])
+    um.update_notification(7, "combo", time="07:10", days=["sat"])
+    um.record_activity(7, "러닝", 30)
+
+    u = um.get_user(7)
+    assert (u["name"], u["location"], u["temp_limit"]) == ("나연", "부산", 3)
+    assert u["favorites"] == ["요가", "러닝"]
+    assert u["routine"]["Tue"] == [{"type": "러닝", "minutes": 30}]
+    assert u["notifications"]["combo"] == {"enabled": True, "time": "07:10", "days": ["Sat"]}
+    assert u["usage_stats"] == {"러닝": 1}
+    assert u["last_activity"]["type"] == "러닝"
+
+
+def test_sqlite_updates_touch_single_row(sqlite_store):
+    um.get_user(7)
+    conn = sqlite_store._conn
+    before = conn.total_changes
+    um.update_routine(7, "Mon", [{"type": "요가"}])
+    assert conn.total_changes - before == 1
+    before = conn.total_changes
+    um.toggle_notifications(7, "none_off")
+    assert conn.total_changes - before == 1
+
+
+def test_import_from_json(tmp_path):
+    from modules.user_sqlite import import_from_json, SqliteUserStore
+
+    src = tmp_path / "users.json"
+    src.write_text(json.dumps({
+        "1": {"name": "나연", "location": "성남시 수정구", "exercise": "달리기"},
+        "나연": {"name": None, "tone": "healing"},
+    }, ensure_ascii=False), encoding="utf-8")
+    assert import_from_json(str(src), str(tmp_path / "users.db")) == 2
+
+    s = SqliteUserStore(str(tmp_path / "users.db"))
+    try:
+        u = s.get("1")
+        assert u["exercise"] == "달리기"                     # 알 수 없는 필드도 보존
+        assert u["notifications"]["weather_only"]["time"] == "06:30"
+        assert s.get("나연")["tone"] == "healing"
+    finally:
+        s.close()
+
+
+def test_import_from_json_copies_v2_history(tmp_path):
+    from modules.user_sqlite import import_from_json, SqliteUserStore
+
+    src = tmp_path / "users.json"
+    store = um.open_store(str(src), flush_interval=3600)
+    try:
+        um.record_activity(1, "러닝", 30)
+        um.record_activity(1, "요가")
+        store.append_history("1", {"date": "2020-01-05", "type": "요가", "duration": 15})
+        store.compact_history("2021-01-01")     # 집계로 넘어간 옛 기록
+    finally:
+        um.close_store()
+    assert import_from_json(str(src), str(tmp_path / "users.db")) == 1
+
+    s = SqliteUserStore(str(tmp_path / "users.db"))
+    try:
+        assert [r["type"] for r in s.read_history("1")] == ["러닝", "요가"]
+        assert s.get("1")["usage_stats"] == {"러닝": 1, "요가": 1}
+        daily = s._conn.execute("SELECT uid, date, type, count, minutes FROM history_daily").fetchall()
+        assert daily == [("1", "2020-01-05", "요가", 1, 15)]
+    finally:
+        s.close()
+
+
+# ===== 운동 기록 로그 =====
+def test_record_size_stays_constant(store):
+    um.record_activity(1, "요가", 20)
+    size = len(json.dumps(um.get_user(1)))
+    for _ in range(200):
+        um.record_activity(1, "요가", 20)
+    assert len(json.dumps(um.get_user(1))) <= size + 10    # 숫자 자릿수만 늘어남
+    assert "history" not in um.get_user(1)
+    assert len(um.get_history(1)) == 201
+    assert um.get_user(1)["usage_stats"] == {"요가": 201}
+
+
+def test_rolling_aggregates():
+    act = {"days": {}, "count_7d": 0, "count_30d": 0, "streak": 0}
+    for d in ["2025-10-01", "2025-11-08", "2025-11-09", "2025-11-10", "2025-11-10"]:
+        um._roll_activity(act, d)
+    assert act["streak"] == 3
+    assert act["count_7d"] == 4 and act["count_30d"] == 4   # 10/01은 30일 창 밖
+    assert "2025-10-01" not in act["days"]
+
+
+def test_v2_migration_moves_history_to_log(tmp_path):
+    path = tmp_path / "users.json"
+    legacy = {"5": {**um._default_user(5), "schema_version": 1,
+                    "history": [{"date": "2025-09-01", "type": "러닝", "duration": 30},
+                                {"date": "2025-09-02", "type": "요가"}]}}
+    path.write_text(json.dumps(legacy, ensure_ascii=False), encoding="utf-8")
+    um.open_store(str(path), flush_interval=3600)
+    try:
+        assert "history" not in um.get_user(5)
+        assert um.get_user(5)["activity"]["streak"] == 2
+        assert [r["type"] for r in um.get_history(5)] == ["러닝", "요가"]
+    finally:
+        um.close_store()
+    assert (tmp_path / "history" / "2025-09.jsonl").exists()
+
+
+def test_compaction_to_daily_rollups(store):
+    log = store.history
+    log.append("1", {"date": "2025-01-03", "type": "러닝", "duration": 30})
+    log.append("1", {"date": "2025-01-03", "type": "러닝", "duration": 10})
+    log.append("1", {"date": "2025-02-01", "type": "요가"})
+    assert log.compact("2025-02") == ["2025-01"]
+    assert log.rollups("1") == {"2025-01-03": {"러닝": {"count": 2, "minutes": 40}}}
+    assert [r["date"] for r in um.get_history(1)] == ["2025-02-01"]
+
+
+def test_sqlite_history_table(sqlite_store):
+    um.record_activity(7, "러닝", 30)
+    sqlite_store.append_history("7", {"date": "2020-01-01", "type": "요가"})
+    sqlite_store.compact_history("2021-01-01")
+    assert [r["type"] for r in um.get_history(7)] == ["러닝"]
+    daily = sqlite_store._conn.execute("SELECT date, type, count FROM history_daily").fetchall()
+    assert daily == [("2020-01-01", "요가", 1)]
+
+
+def test_compaction_is_daily_on_every_backend(tmp_path):
+    recs = [("2025-03-30", "러닝", 30), ("2025-03-31", "요가", None), ("2025-04-09", "러닝", 20),
+            ("2025-04-10", "요가", None), ("2025-04-11", "러닝", 10)]
+    results = []
+    for backend, name in (("json", "users.json"), ("sqlite", "users.db")):
+        s = um.open_store(str(tmp_path / backend / name), backend=backend, flush_interval=3600)
+        try:
+            for date, kind, minutes in recs:
+                s.append_history("1", {"date": date, "type": kind, **({"duration": minutes} if minutes else {})})
+            s.compact_history("2025-04-10")                 # 같은 달 안의 날짜에서 잘라도
+            s.compact_history("2025-04-10")                 # 두 번 불러도 그대로
+            kept = [r["date"] for r in um.get_history(1)]
+            if backend == "json":
+                daily = {(d, t): v["count"] for d, types in s.history.rollups("1").items() for t, v in types.items()}
+            else:
+                daily = {(d, t): c for d, t, c in s._conn.execute("SELECT date, type, count FROM history_daily")}
+            results.append((kept, daily))
+        finally:
+            um.close_store()
+    assert results[0] == results[1]
+    assert results[0][0] == ["2025-04-10", "2025-04-11"]
+    assert set(results[0][1]) == {("2025-03-30", "러닝"), ("2025-03-31", "요가"), ("2025-04-09", "러닝")}
@@ -0,0 +1,67 @@
+# test/test_user_shards.py
+import json, os
+
+import pytest
+
+from modules import user_module as um
+from modules.stats_module import UserStats
+from modules.user_shards import ShardedUserStore, import_from_json, shard_of
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = um.open_store(str(tmp_path / "users"), backend="sharded")
+    yield s
+    um.close_store()
+
+
+def test_one_file_per_user(store, tmp_path):
+    um.set_basic_profile(12345, name="나연", location="부산")
+    um.record_activity(12345, "요가", 30)
+    um.get_user("나연")                                  # 웹 유저 (이름이 uid)
+
+    path = tmp_path / "users" / shard_of("12345") / "12345.json"
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["location"] == "부산"
+    assert (tmp_path / "users" / shard_of("나연") / "%EB%82%98%EC%97%B0.json").exists()
+    assert um.get_user_data(12345, "usage_stats") == {"요가": 1}
+    assert um.get_history(12345)[0]["duration"] == 30
+    assert store.count() == 2 and list(store.all()) == ["12345", "나연"]
+
+
+def test_history_is_on_disk_when_record_activity_returns(store, tmp_path):
+    rec = um.record_activity(7, "러닝", 20)
+    segment = tmp_path / "history" / f"{rec['date'][:7]}.jsonl"
+    lines = segment.read_text(encoding="utf-8").splitlines()      # flush_users() 없이
+    assert [json.loads(line)["type"] for line in lines] == ["러닝"]
+    assert store.history._buf == []
+
+
+def test_index_feeds_stats_without_reading_user_files(store, monkeypatch):
+    for uid in (3, 1, 2):
+        um.get_user(uid)
+    um.record_activity(1, "걷기")
+    writes = store.write_count
+    um.update_user(1, "temp_limit", 3)                  # 요약 필드가 아니면 _index.json은 그대로
+    assert store.write_count == writes + 1
+
+    monkeypatch.setattr(store, "get", lambda uid: pytest.fail("user file read"))
+    stats = UserStats()
+    assert stats.load() == 3
+    assert stats.recent(3) == ["3", "1", "2"] and stats.today_active == 1
+
+
+def test_migrate_from_json(tmp_path):
+    old = um._default_user(2)
+    old.pop("activity"); old["schema_version"] = 1
+    old["history"] = [{"date": "2025-01-02", "type": "요가"}]
+    db = {"1": um._default_user(1), "2": old, "민수": um._default_user("민수")}
+    src = tmp_path / "users.json"
+    src.write_text(json.dumps(db, ensure_ascii=False), encoding="utf-8")
+
+    assert import_from_json(str(src), str(tmp_path / "users")) == 3
+    s = ShardedUserStore(str(tmp_path / "users"))
+    assert list(s.index()) == ["1", "2", "민수"]         # 가입 순서 유지
+    assert "history" not in s.get("2") and s.get("2")["activity"]["count_30d"] == 1
+    assert [r["type"] for r in s.read_history("2")] == ["요가"]
+    assert src.exists()                                 # 원본은 그대로
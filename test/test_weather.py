@@ -0,0 +1,302 @@
+# test/test_weather.py
+import asyncio, threading, time
+
+import pytest
+
+from modules import weather_module as wm
+from modules.cache_module import TTLCache
+
+OWM_NOW = {"weather": [{"main": "Clear", "description": "맑음"}],
+           "main": {"temp": 21.34, "feels_like": 20.01}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+# ===== TTLCache =====
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    c = TTLCache(ttl=10, clock=clock)
+    calls = []
+    load = lambda: calls.append(1) or len(calls)
+    assert c.get_or_load("Seoul", load) == 1
+    assert c.get_or_load("Seoul", load) == 1
+    clock.now = 11
+    assert c.get_or_load("Seoul", load) == 2
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_lru_bound():
+    c = TTLCache(ttl=60, maxsize=2)
+    c.set("a", 1); c.set("b", 2)
+    c.get("a")                      # a 최근 사용 → b가 밀려남
+    c.set("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+
+
+def test_concurrent_misses_share_one_fetch():
+    c = TTLCache(ttl=60)
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        time.sleep(0.05)
+        return "data"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(c.get_or_load("Seoul", slow_load)))
+               for _ in range(20)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert calls == [1] and results == ["data"] * 20
+    assert c.coalesced == 19
+
+
+def test_failures_are_not_cached():
+    c = TTLCache(ttl=60)
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        c.get_or_load("Seoul", boom)
+    assert c.get_or_load("Seoul", lambda: "ok") == "ok"
+
+
+def test_cancelled_owner_does_not_cancel_waiters():
+    c = TTLCache(ttl=60)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario():
+        owner = asyncio.create_task(c.aget_or_load("Seoul", load))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(c.aget_or_load("Seoul", load))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await waiter             # 기다리던 쪽이 이어받아 다시 불러옴
+
+    assert asyncio.run(scenario()) == 2 and calls == [1, 1]
+    assert c.get("Seoul") == 2
+
+
+# ===== get_weather =====
+def test_get_weather_hits_cache_per_place(monkeypatch):
+    wm._weather_cache.clear()
+    urls = []
+    monkeypatch.setattr(wm, "_fetch_json", lambda url: urls.append(url) or OWM_NOW)
+    a = wm.get_weather("성남시 수정구")
+    b = wm.get_weather("경기도 성남시 수정구")     # 같은 좌표 → 캐시 재사용
+    c = wm.get_weather("성남시 분당구")            # 다른 구 → 자기 좌표로 조회
+    assert len(urls) == 2
+    assert "lat=37.45&lon=127.15" in urls[0] and "q=" not in urls[0]
+    assert urls[0] != urls[1]
+    assert (a["city"], b["city"], c["city"]) == ("성남시 수정구", "경기도 성남시 수정구", "성남시 분당구")
+    assert a["temp"] == 21.3 and a["icon"] == "☀️"
+    assert wm.weather_cache_stats()["weather"]["hits"] >= 1
+
+
+def test_get_weather_unknown_place_falls_back_to_name(monkeypatch):
+    wm._weather_cache.clear()
+    urls = []
+    monkeypatch.setattr(wm, "geocode", lambda text: None)
+    monkeypatch.setattr(wm, "_fetch_json", lambda url: urls.append(url) or OWM_NOW)
+    wm.get_weather("Tokyo")
+    assert "q=Tokyo" in urls[0]
+
+
+# ===== 비동기 경로 =====
+def test_async_misses_share_one_fetch(monkeypatch):
+    wm._weather_cache.clear()
+    calls = []
+
+    async def fake_get_json(url, params=None, timeout=None):
+        calls.append(url)
+        await asyncio.sleep(0.02)
+        return OWM_NOW
+
+    monkeypatch.setattr(wm.http_module, "get_json", fake_get_json)
+
+    async def burst():
+        return await asyncio.gather(*(wm.aget_weather("서울") for _ in range(50)))
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1 and all(r["desc"] == "맑음" for r in results)
+
+
+def test_http_client_params_and_timeout():
+    from aiohttp import web
+    from modules.http_module import AsyncHttpClient
+
+    async def scenario():
+        async def ok(request):
+            return web.json_response({"q": request.query.get("q")})
+
+        async def slow(request):
+            await asyncio.sleep(1)
+            return web.json_response({})
+
+        app = web.Application()
+        app.router.add_get("/ok", ok)
+        app.router.add_get("/slow", slow)
+        app.router.add_post("/slow", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        client = AsyncHttpClient(timeout=5, max_concurrency=4)
+        try:
+            data = await client.get_json(f"http://127.0.0.1:{port}/ok", params={"q": "서울"})
+            assert data == {"q": "서울"}
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_json(f"http://127.0.0.1:{port}/slow", timeout=0.1)
+            short = AsyncHttpClient(timeout=0.1)                # 호출별 값이 없으면 기본 타임아웃
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await short.get_json(f"http://127.0.0.1:{port}/slow")
+                with pytest.raises(asyncio.TimeoutError):
+                    await short.post(f"http://127.0.0.1:{port}/slow")
+            finally:
+                await short.close()
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
+
+
+# ===== 복장 카드 =====
+def test_http_client_closes_session_of_finished_loop():
+    from aiohttp import web
+    from modules.http_module import AsyncHttpClient
+
+    async def ok(request):
+        return web.json_response({})
+
+    loop = asyncio.new_event_loop()              # 서버는 따로 계속 도는 루프에
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    async def serve():
+        app = web.Application()
+        app.router.add_get("/ok", ok)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        return runner, site._server.sockets[0].getsockname()[1]
+
+    runner, port = asyncio.run_coroutine_threadsafe(serve(), loop).result(5)
+    client = AsyncHttpClient()
+    sessions = []
+    try:
+        for _ in range(2):                      # asyncio.run마다 새 루프 → 새 세션
+            asyncio.run(client.get_json(f"http://127.0.0.1:{port}/ok"))
+            sessions.append(client._session)
+        assert sessions[0] is not sessions[1]
+        assert all(s.closed for s in sessions)  # 루프가 끝날 때 자기 루프에서 닫힘
+    finally:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def test_renderer_loads_templates_once(tmp_path, monkeypatch):
+    from PIL import Image
+    for name in wm.OutfitCardRenderer.TEMPLATES:
+        Image.new("RGB", (400, 300), (10, 20, 30)).save(tmp_path / f"{name}.png")
+    r = wm.OutfitCardRenderer(str(tmp_path))
+    lines = ["title", "info", "outfit", "exercise", "tomorrow"]
+    r.render(str(tmp_path / "rain.png"), lines)
+
+    opened = []
+    monkeypatch.setattr(Image, "open", lambda *a, **k: opened.append(a) or None)
+    out = r.render(str(tmp_path / "summer.png"), lines)
+    monkeypatch.undo()
+    assert opened == []                                     # 두 번째부터는 디코딩 없음
+    assert out.getvalue()[:8] == b"\x89PNG\r\n\x1a\n"
+    assert Image.open(out).size == (400, 300)
+
+
+def test_outfit_card_in_memory(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)                              # temp/ 등 파일이 생기면 안 됨
+    monkeypatch.setattr(wm, "card_renderer", wm.OutfitCardRenderer(str(tmp_path / "missing")))
+    monkeypatch.setattr(wm, "get_today_and_tomorrow", lambda c: (
+        {"city": c, "temp": 21.3, "feels": 20.0, "desc": "맑음", "icon": "☀️"},
+        {"temp": 17.0, "desc": "비", "icon": "🌧️"}))
+    monkeypatch.setattr(wm, "get_random_video", lambda c: {"title": "스트레칭", "link": "https://youtu.be/x"})
+    photo, caption = wm.build_outfit_card("나연", "서울")
+    assert photo.getvalue().startswith(b"\x89PNG")          # 템플릿이 비어 있어도 기본 배경으로 렌더
+    assert "오늘의 날씨 (서울)" in caption and "내일: 17.0°C" in caption
+    assert list(tmp_path.iterdir()) == []
+
+
+# ===== 예보 모델 =====
+# 2026-10-18 00:00 UTC = 같은 날 09:00 KST
+T0 = 1792281600
+
+
+def _owm_forecast(start=T0, n=40, with_dt=True):
+    items = []
+    for i in range(n):
+        ts = start + i * 3 * 3600
+        item = {"dt_txt": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
+                "weather": [{"main": "Clear", "description": "맑음"}],
+                "main": {"temp": float(i), "feels_like": float(i) - 1}}
+        if with_dt:
+            item["dt"] = ts
+        items.append(item)
+    return {"list": items[::-1]}                    # 순서가 섞여 와도 정렬
+
+
+def test_forecast_tomorrow_noon_is_kst():
+    fc = wm.Forecast.parse(_owm_forecast(with_dt=False))
+    assert fc.times == sorted(fc.times) and fc.times[0] == T0
+    # KST 10/18 10:00 — UTC 12:00 칸(= 오늘 KST 21:00)이 아니라 10/19 KST 12:00(= UTC 03:00) 칸
+    now = T0 + 3600
+    assert fc.tomorrow_noon(now)["dt"] == T0 + 27 * 3600
+    # KST 23:00 (UTC 14:00) — 날짜가 바뀌기 직전이어도 기준은 KST 내일
+    assert fc.tomorrow_noon(T0 + 14 * 3600)["dt"] == T0 + 27 * 3600
+    assert fc.now(now)["temp"] == 0.0 and fc.now(T0 + 2 * 3600)["temp"] == 1.0
+
+
+def test_forecast_next_hours_and_empty():
+    fc = wm.Forecast.parse(_owm_forecast())
+    slots = fc.next_hours(9, now=T0 + 3600)
+    assert [s["dt"] for s in slots] == [T0 + h * 3600 for h in (0, 3, 6, 9)]
+    assert fc.next_hours(6, now=T0 - 3600)[0]["dt"] == T0
+    with pytest.raises(ValueError):
+        wm.Forecast.parse({"list": []})
+
+
+def test_outfit_weather_costs_one_upstream_call(monkeypatch):
+    wm._weather_cache.clear(); wm._forecast_cache.clear()
+    urls = []
+    forecast = _owm_forecast(start=int(time.time()) // 10800 * 10800)
+
+    async def fake_get_json(url, params=None, timeout=None):
+        urls.append(url)
+        return forecast if "/forecast" in url else OWM_NOW
+
+    monkeypatch.setattr(wm.http_module, "get_json", fake_get_json)
+    today, tomorrow = asyncio.run(wm.aget_today_and_tomorrow("서울"))
+    assert len(urls) == 1 and "/forecast" in urls[0]         # 처음엔 예보 1번으로 오늘/내일 모두
+    assert today["city"] == "서울" and "temp" in tomorrow
+
+    wm._weather_cache.set(wm._location("서울", wm.geocode("서울"))[0], OWM_NOW)
+    today, _ = asyncio.run(wm.aget_today_and_tomorrow("서울"))
+    assert len(urls) == 1 and today["temp"] == 21.3          # 둘 다 신선 → 호출 없음, 현재 날씨 우선
+
+    wm._weather_cache.clear()
+    asyncio.run(wm.aget_today_and_tomorrow("서울"))
+    assert len(urls) == 2 and "/weather" in urls[1]          # 현재 날씨만 오래됨 → 그것만
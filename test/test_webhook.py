@@ -0,0 +1,118 @@
+# test/test_webhook.py
+import asyncio
+
+import httpx
+import pytest
+from telegram import User
+from telegram.ext import ApplicationBuilder, ExtBot, MessageHandler, filters
+
+import server_app
+from modules import user_module as um
+from modules.update_processor import ChatOrderedProcessor
+
+SECRET = "test-secret_123"
+
+
+def _update(update_id: int, chat_id: int, text: str, user_id: int = None) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": 0, "text": text,
+            "chat": {"id": chat_id, "type": "private" if user_id is None else "group"},
+            "from": {"id": chat_id if user_id is None else user_id, "is_bot": False, "first_name": "u"},
+        },
+    }
+
+
+@pytest.fixture
+def offline_bot(monkeypatch):
+    async def offline(self):        # get_me 등 네트워크 호출 없이 초기화
+        self._bot_user = User(123, "test", True, username="test_bot")
+
+    async def noop(self):
+        pass
+    monkeypatch.setattr(ExtBot, "initialize", offline)
+    monkeypatch.setattr(ExtBot, "shutdown", noop)
+    monkeypatch.setattr(server_app, "BOT_MODE", "webhook")
+    monkeypatch.setattr(server_app, "WEBHOOK_SECRET", SECRET)
+
+
+def _run_webhook(monkeypatch, processor, updates, delay=0.03):
+    """합성 업데이트 JSON을 /telegram/{secret}로 POST → (처리 로그, 응답 코드들)"""
+    log = []
+
+    async def handler(update, context):
+        chat, text = update.effective_chat.id, update.message.text
+        log.append(("start", chat, text))
+        await asyncio.sleep(delay)
+        log.append(("end", chat, text))
+
+    async def scenario():
+        app = ApplicationBuilder().token("123:TEST").concurrent_updates(processor).build()
+        app.add_handler(MessageHandler(filters.TEXT, handler))
+        await app.initialize()
+        await app.start()
+        monkeypatch.setattr(server_app, "BOT_APP", app)
+        transport = httpx.ASGITransport(app=server_app.app)
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                codes = [(await client.post(f"/telegram/{SECRET}", json=u, headers=headers)).status_code
+                         for u in updates]
+            for _ in range(200):
+                if len(log) == 2 * len(updates):
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await app.stop()
+            await app.shutdown()
+        return codes
+
+    return log, asyncio.run(scenario())
+
+
+def test_same_chat_in_order_other_chats_concurrent(offline_bot, monkeypatch):
+    updates = [_update(i, chat_id=100 + i % 4, text=str(i)) for i in range(12)]
+    processor = ChatOrderedProcessor(max_running=2)
+    log, codes = _run_webhook(monkeypatch, processor, updates)
+
+    assert codes == [200] * 12 and len(log) == 24
+    for chat in range(100, 104):
+        events = [(kind, text) for kind, c, text in log if c == chat]
+        texts = [str(i) for i in range(12) if 100 + i % 4 == chat]
+        # 같은 채팅: 앞 업데이트가 끝난 뒤에 다음 업데이트 시작, 도착 순서 그대로
+        assert events == [(k, t) for t in texts for k in ("start", "end")]
+    assert processor.peak == 2                          # 다른 채팅은 동시에, 그러나 상한 2
+    assert processor.stats()["chats_waiting"] == 0
+
+
+def test_same_user_across_chats_runs_one_at_a_time(offline_bot, monkeypatch):
+    # 유저 7: 개인 채팅(7) + 그룹(-50) / 유저 8: 개인 채팅(8)
+    updates = [_update(1, 7, "개인"), _update(2, -50, "그룹", user_id=7), _update(3, 8, "다른 유저")]
+    log, _ = _run_webhook(monkeypatch, ChatOrderedProcessor(max_running=4), updates, delay=0.05)
+    order = [(kind, text) for kind, _, text in log]
+    assert order.index(("end", "개인")) < order.index(("start", "그룹"))       # 같은 유저 → 차례로
+    assert order.index(("start", "다른 유저")) < order.index(("end", "개인"))   # 다른 유저 → 동시에
+    assert um._user_locks == {}                                                 # 다 쓴 잠금은 남지 않음
+
+
+def test_busy_chat_does_not_block_others(offline_bot, monkeypatch):
+    # 채팅 1이 먼저 여러 건을 보내도 채팅 2는 첫 번째 업데이트 끝나기 전에 시작
+    updates = [_update(i, chat_id=1, text=f"a{i}") for i in range(4)] + [_update(9, chat_id=2, text="b")]
+    log, _ = _run_webhook(monkeypatch, ChatOrderedProcessor(max_running=2), updates)
+    assert log.index(("start", 2, "b")) < log.index(("end", 1, "a0"))
+
+
+def test_rejects_wrong_secret(offline_bot, monkeypatch):
+    async def scenario():
+        transport = httpx.ASGITransport(app=server_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            wrong_path = await client.post("/telegram/nope", json=_update(1, 1, "x"),
+                                           headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+            no_header = await client.post(f"/telegram/{SECRET}", json=_update(1, 1, "x"))
+            not_ready = await client.post(f"/telegram/{SECRET}", json=_update(1, 1, "x"),
+                                          headers={"X-Telegram-Bot-Api-Secret-Token": SECRET})
+        return wrong_path.status_code, no_header.status_code, not_ready.status_code
+
+    monkeypatch.setattr(server_app, "BOT_APP", None)
+    assert asyncio.run(scenario()) == (404, 403, 503)
@@ -0,0 +1,58 @@
+# test/test_youtube.py
+import asyncio
+
+from modules import youtube_module as yt
+
+
+def _videos(prefix, n=3):
+    return [{"title": f"{prefix}{i}", "link": f"https://youtu.be/{prefix}{i}", "thumbnail": ""} for i in range(n)]
+
+
+def test_categories_match_keywords():
+    assert set(yt.YT_CATEGORIES) - {yt.ANY_CATEGORY} <= set(yt.YOUTUBE_KEYWORDS)
+    assert {"HIIT", "필라테스", "복근", "스트렝스"} <= set(yt.YT_CATEGORIES)
+
+
+def test_pool_serves_from_memory(monkeypatch):
+    calls = []
+    monkeypatch.setattr(yt, "_fetch_raw", lambda c, n: calls.append(c) or _videos(c))
+    pool = yt.VideoPool(daily_quota=1000)
+    monkeypatch.setattr(yt, "video_pool", pool)
+    picks = [yt.get_random_video("요가") for _ in range(30)]
+    assert calls == ["요가"]                                  # search는 한 번만
+    assert all(p["title"].startswith("요가") for p in picks)
+    assert pool.quota_used == yt.VideoPool.SEARCH_COST
+
+
+def test_quota_exhaustion_falls_back(monkeypatch):
+    monkeypatch.setattr(yt, "_fetch_raw", lambda c, n: _videos(c))
+    pool = yt.VideoPool(daily_quota=100)
+    monkeypatch.setattr(yt, "video_pool", pool)
+    assert yt.get_random_video("상체")["title"].startswith("상체")
+    assert yt.get_random_video("하체") in yt.FALLBACK_VIDEOS   # 쿼터 소진 → fallback
+    assert yt.get_random_video("상체")["title"].startswith("상체")  # 기존 풀은 계속 사용
+
+
+def test_background_refresh_only_stale(monkeypatch):
+    now = [0.0]
+    fetched = []
+
+    async def fake_fetch(c, n):
+        fetched.append(c)
+        return _videos(c)
+
+    monkeypatch.setattr(yt, "_afetch_raw", fake_fetch)
+    pool = yt.VideoPool(daily_quota=100_000, refresh_interval=60, clock=lambda: now[0])
+
+    async def scenario():
+        await pool.refresh_stale()
+        first = len(fetched)
+        await pool.refresh_stale()                  # 아직 신선 → 호출 없음
+        assert len(fetched) == first
+        now[0] = 61
+        await asyncio.gather(*(pool.refresh("요가") for _ in range(5)))   # 동시 갱신 합치기
+        return first
+
+    first = asyncio.run(scenario())
+    assert first == len(yt.YOUTUBE_KEYWORDS)
+    assert fetched.count("요가") == 2
@@ -2,7 +2,6 @@
 # NYFITCOACH_BOT/web_app.py
 # -------------------------------
 import os
-import json
 import random
 from datetime import datetime
 import streamlit as st
@@ -11,6 +10,8 @@ import streamlit as st
 from modules.user_module import get_user, update_user, get_user_data
 from modules.weather_module import get_weather
 from modules.coach_module import build_coach_message
+from modules.chat_log import chat_log
+from modules.intent_module import route
 
 # ====== 데이터 경로 ======
 USER_DATA_PATH = os.path.join("data", "users.json")
@@ -42,24 +43,16 @@ def random_youtube_link(category):
     links = YOUTUBE_HOME_TRAINING.get(category, [])
     return random.choice(links) if links else random.choice(sum(YOUTUBE_HOME_TRAINING.values(), []))
 
-# ====== 대화 기록 저장 ======
+# ====== 대화 기록 저장 (data/chat_{이름}.jsonl, 한 줄 = 메시지 1건) ======
+CHAT_PAGE = 30  # 처음 보여줄 메시지 수 / "이전 대화 더 보기" 1회당 추가 수
+
 def save_chat(user_name, role, text):
-    history_path = os.path.join("data", f"chat_{user_name}.json")
-    data = []
-    if os.path.exists(history_path):
-        with open(history_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    data.append({"time": datetime.now().isoformat(), "role": role, "text": text})
-    with open(history_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    return data
-
-def load_chat(user_name):
-    path = os.path.join("data", f"chat_{user_name}.json")
-    if not os.path.exists(path):
-        return []
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return chat_log.append(user_name, role, text)
+
+def load_chat(user_name, limit=CHAT_PAGE):
+    """최근 limit개 메시지와 더 이전 기록이 있는지 여부"""
+    msgs, start = chat_log.tail(user_name, limit)
+    return msgs, start > 0
 
 # ====== UI 시작 ======
 st.set_page_config(page_title="NY FitCoach Bot", page_icon="💪", layout="centered")
@@ -82,7 +75,14 @@ else:
     st.success(f"{user_name}님, 환영합니다! 🎉")
 
     # ====== 대화 기록 ======
-    chat_history = load_chat(user_name)
+    if st.session_state.get("chat_migrated") != user_name:
+        chat_log.migrate(user_name)      # 예전 chat_{이름}.json → JSONL (1회)
+        st.session_state["chat_migrated"] = user_name
+    window = st.session_state.setdefault("chat_window", CHAT_PAGE)
+    chat_history, has_older = load_chat(user_name, window)
+    if has_older and st.button("⬆️ 이전 대화 더 보기"):
+        st.session_state["chat_window"] = window + CHAT_PAGE
+        st.rerun()
     for msg in chat_history:
         role = msg["role"]
         text = msg["text"]
@@ -100,14 +100,14 @@ else:
         if user_input.strip():
             save_chat(user_name, "user", user_input)
             # ---- 챗봇 응답 로직 ----
-            lower = user_input.lower()
-            if "홈트" in lower:
+            intent = route(user_input)   # 텔레그램 봇과 같은 의도 라우터
+            if intent and intent.name == "home_workout":
                 bot_reply = "홈트 카테고리를 골라줘 💪 상체 / 하체 / 코어 / 유산소 / 스트레칭 / 요가 중에서!"
-            elif any(k in lower for k in YOUTUBE_HOME_TRAINING.keys()):
-                key = next((k for k in YOUTUBE_HOME_TRAINING if k in lower), None)
+            elif intent and intent.name == "video":
+                key = intent.arg
                 link = random_youtube_link(key)
                 bot_reply = f"🎥 {key} 추천 영상!\n👉 {link}"
-            elif "날씨" in lower:
+            elif intent and intent.name in ("weather", "weather_tomorrow"):
                 bot_reply = "☀️ 날씨 기능은 텔레그램 버전에서 작동 중이에요!"
             else:
                 bot_reply = random.choice([
@@ -118,7 +118,8 @@ else:
 
     # ====== 초기화 버튼 ======
     if st.button("대화 초기화"):
-        os.remove(os.path.join("data", f"chat_{user_name}.json"))
+        chat_log.clear(user_name)
+        st.session_state["chat_window"] = CHAT_PAGE
         st.experimental_rerun()
 
 st.markdown("<hr><p style='text-align:center;color:gray;'>© 2025 NYFitCoach WebBot</p>", unsafe_allow_html=True)